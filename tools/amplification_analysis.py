@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Load amplification of inbound requests through fan-out and retries.
+
+One request to an entry point makes its service call every dependency in
+the call graph (call_graph.py), synchronous or not, and each of those calls
+its own. A call whose contract has a retry_policy can be attempted up to
+1 + max_retries times, so retries at successive layers multiply. For every
+entry point this analysis reports, per downstream service, how many calls
+one inbound request produces:
+
+    worst case   every attempt fails until the last: 1 + max_retries per call
+    expected     each attempt fails independently with --failure-rate p:
+                 1 + p + ... + p**max_retries per call
+
+Volumes are propagated over the SCC condensation in topological order, for
+all entry points at once (one row per entry point). Services that call each
+other in a cycle are treated as one unit, as in latency_analysis.py: every
+member is listed with the calls into its component, and the per-entry
+totals count each component once. The cycle is flagged, since a loop of
+retries has no bound. A service whose worst-case amplification passes
+--threshold is flagged as a retry-storm risk.
+
+    python3 amplification_analysis.py /path/to/index.json --threshold 10 --failure-rate 0.05
+"""
+
+import json
+import argparse
+from typing import Dict, Iterable, List
+
+import numpy as np
+import networkx as nx
+
+from call_graph import add_call_graph_arguments, find_entry_points, load_call_graph
+from compact_graph import CompactGraph
+from issue_report import ANALYSIS_TIMESTAMP
+
+DEFAULT_FAILURE_RATE = 0.01
+DEFAULT_AMPLIFICATION_THRESHOLD = 10.0
+
+
+def attempt_multipliers(max_retries: np.ndarray, failure_rate: float):
+    """(worst-case, expected) attempts per call for calls allowing max_retries retries each."""
+    worst = 1.0 + max_retries
+    if failure_rate >= 1.0:
+        return worst, worst.copy()
+    expected = (1.0 - failure_rate ** (max_retries + 1)) / (1.0 - failure_rate)
+    return worst, expected
+
+
+def call_volumes(C: nx.DiGraph, entries: List, failure_rate: float = DEFAULT_FAILURE_RATE,
+                 default_retries: int = 0):
+    """Calls per inbound request reaching every service, from each entry point.
+
+    Returns (compact graph, worst-case volumes, expected volumes, cyclic
+    component flag per node, SCC label per node); the volume arrays have one
+    row per entry point and one column per node of the compact graph, and
+    the members of a component share its column values.
+    """
+    compact = CompactGraph.from_networkx(C)
+    labels, _, _, order = compact.condensation()
+    count = len(order)
+
+    sources, targets = [], []
+    retries = []
+    for u, v, max_retries in C.edges(data='max_retries'):
+        sources.append(compact.index[u])
+        targets.append(compact.index[v])
+        retries.append(default_retries if max_retries is None else max_retries)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    worst_each, expected_each = attempt_multipliers(np.asarray(retries, dtype=np.float64), failure_rate)
+
+    # Calls between components, grouped by the calling component
+    cross = labels[sources] != labels[targets]
+    from_component, to_component = labels[sources[cross]], labels[targets[cross]]
+    worst_each, expected_each = worst_each[cross], expected_each[cross]
+    by_component = np.argsort(from_component, kind='stable')
+    starts = np.searchsorted(from_component[by_component], np.arange(count + 1))
+
+    worst = np.zeros((len(entries), count))
+    expected = np.zeros((len(entries), count))
+    rows = np.arange(len(entries))
+    entry_components = labels[[compact.index[entry] for entry in entries]]
+    worst[rows, entry_components] = 1.0
+    expected[rows, entry_components] = 1.0
+    for c in order:
+        calls = by_component[starts[c]:starts[c + 1]]
+        if len(calls) == 0 or not worst[:, c].any():
+            continue
+        # Every call out of the component carries the component's volume, times its attempts
+        np.add.at(worst.T, to_component[calls], np.outer(worst_each[calls], worst[:, c]))
+        np.add.at(expected.T, to_component[calls], np.outer(expected_each[calls], expected[:, c]))
+
+    sizes = np.bincount(labels, minlength=count)
+    self_loops = np.zeros(count, dtype=bool)
+    self_loops[labels[sources[sources == targets]]] = True
+    cyclic = (sizes > 1) | self_loops
+    return compact, worst[:, labels], expected[:, labels], cyclic[labels], labels
+
+
+def amplification_report(C: nx.DiGraph, entries: Iterable = None, failure_rate: float = DEFAULT_FAILURE_RATE,
+                         threshold: float = DEFAULT_AMPLIFICATION_THRESHOLD, default_retries: int = 0,
+                         top: int = 20) -> Dict:
+    """Amplification report of a call graph for the given entry points (see find_entry_points)."""
+    entry_points = find_entry_points(C, entries)
+    compact, worst, expected, cyclic, labels = call_volumes(C, entry_points, failure_rate, default_retries)
+    nodes = compact.nodes
+    # One column per component, so a cycle's calls count once in the totals
+    _, representatives = np.unique(labels, return_index=True)
+
+    results, risks = [], []
+    for row, entry in enumerate(entry_points):
+        reached = np.flatnonzero(worst[row] > 0)
+        reached = reached[np.argsort(-worst[row, reached], kind='stable')]
+        downstream = [{'service': nodes[i], 'worst_case_calls': float(worst[row, i]),
+                       'expected_calls': float(expected[row, i]), 'in_cycle': bool(cyclic[i])}
+                      for i in reached.tolist() if nodes[i] != entry]
+        entry_index = compact.index[entry]
+        results.append({
+            'entry': entry,
+            'services_reached': len(downstream),
+            # Calls into downstream components; nothing calls back into the entry's own component
+            'worst_case_total_calls': float(worst[row, representatives].sum() - worst[row, entry_index]),
+            'expected_total_calls': float(expected[row, representatives].sum() - expected[row, entry_index]),
+            'max_worst_case_amplification': max((item['worst_case_calls'] for item in downstream), default=0.0),
+            'downstream': downstream[:top]
+        })
+        for item in downstream:
+            if item['worst_case_calls'] > threshold:
+                risks.append({
+                    'type': 'retry_storm_risk',
+                    'severity': 'critical' if item['expected_calls'] > threshold else 'warning',
+                    'entry': entry,
+                    'service': item['service'],
+                    'worst_case_calls': item['worst_case_calls'],
+                    'expected_calls': item['expected_calls'],
+                    'description': f"One request to {entry} can reach {item['service']} "
+                                   f"{item['worst_case_calls']:.0f} times"
+                })
+        cycles = sorted({str(item['service']) for item in downstream if item['in_cycle']})
+        if cycles:
+            risks.append({
+                'type': 'cyclic_calls',
+                'severity': 'warning',
+                'entry': entry,
+                'services': cycles,
+                'description': f"Requests to {entry} reach services that call each other in a cycle; "
+                               f"retries inside it are unbounded"
+            })
+
+    return {
+        'analysis_timestamp': ANALYSIS_TIMESTAMP,
+        'parameters': {'failure_rate': failure_rate, 'threshold': threshold, 'default_retries': default_retries},
+        'summary': {
+            'services': C.number_of_nodes(),
+            'calls': C.number_of_edges(),
+            'calls_with_retries': sum(1 for _, _, r in C.edges(data='max_retries')
+                                      if (default_retries if r is None else r) > 0),
+            'entry_points': len(results),
+            'max_worst_case_amplification': max((r['max_worst_case_amplification'] for r in results), default=0.0),
+            'retry_storm_risks': sum(1 for risk in risks if risk['type'] == 'retry_storm_risk')
+        },
+        'entry_points': sorted(results, key=lambda r: -r['max_worst_case_amplification']),
+        'risks': risks
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Downstream call volume per inbound request through fan-out and retries")
+    add_call_graph_arguments(parser)
+    parser.add_argument('--entry', action='append',
+                        help='Entry point service (repeatable; default: gateway services, else services nothing calls)')
+    parser.add_argument('--failure-rate', type=float, default=DEFAULT_FAILURE_RATE,
+                        help='Probability that one call attempt fails, for the expected volume')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_AMPLIFICATION_THRESHOLD,
+                        help='Worst-case calls per request above which a service is flagged')
+    parser.add_argument('--default-retries', type=int, default=0, help='Retries assumed for calls without a contract')
+    parser.add_argument('--top', type=int, default=20, help='Downstream services listed per entry point')
+    parser.add_argument('--out', default='amplification_report.json', help='Output report filename')
+    args = parser.parse_args()
+
+    report = amplification_report(load_call_graph(args), args.entry, args.failure_rate, args.threshold,
+                                  args.default_retries, args.top)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    summary = report['summary']
+    print(f"Amplification report saved to {args.out}")
+    print(f"Worst-case amplification {summary['max_worst_case_amplification']:.0f}x, "
+          f"{summary['retry_storm_risks']} retry-storm risks above {args.threshold:g}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the system-of-systems graph tooling on synthetic systems.
+
+Usage:
+    python3 benchmark_graph.py memory --components 10000
+    python3 benchmark_graph.py reachability --components 10000 --queries 5000
+    python3 benchmark_graph.py issues --components 3400
+    python3 benchmark_graph.py issues --components 20000 --jobs 4 --check-cost-us 50
+    python3 benchmark_graph.py path-load --components 8400 --budget 10
+    python3 benchmark_graph.py layout --components 20000
+
+Synthetic components are generated in memory and round-tripped through JSON,
+so every string is a separate object exactly as it would be after parsing
+real service_architecture.json files.
+"""
+
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from typing import Dict
+
+import numpy as np
+import networkx as nx
+
+from compact_graph import CompactGraph
+from component_model import node_has_auth
+from force_layout import DEFAULT_LAYOUT_BUDGET, multilevel_layout
+from issue_rules import NodeRule, default_rules
+from parallel_issues import detect_issues_parallel
+from reachability import ReachabilityIndex
+from system_of_systems_graph import detect_architectural_issues, graph_from_components
+
+TIERS = ['tier_1_systems', 'tier_2_components', 'tier_2_components', 'tier_3_internal_modules']
+STATUSES = ['existing', 'recommended', 'hypothetical']
+PATTERNS = ['synchronous', 'synchronous', 'asynchronous']
+
+
+def make_synthetic_components(count: int, seed: int = 42, avg_dependencies: int = 3,
+                              interfaces_per_service: int = 3, schema_fields: int = 25) -> Dict[str, dict]:
+    """Generate count parsed-looking component documents with a random dependency structure."""
+    rng = random.Random(seed)
+    ids = [f"svc_{i}" for i in range(count)]
+    components = {}
+    for i, service_id in enumerate(ids):
+        dependencies = [ids[j] for j in rng.sample(range(count), min(avg_dependencies, count)) if j != i]
+        interfaces = []
+        for k in range(interfaces_per_service):
+            interfaces.append({
+                'name': f"{'auth_' if rng.random() < 0.2 else ''}endpoint_{k}",
+                'interface_type': 'http_endpoint',
+                'communication_pattern': rng.choice(PATTERNS),
+                'auth_required': rng.random() < 0.3,
+                'timeout': rng.choice([50, 100, 250, 1000]),
+                'rate_limit': rng.choice([100, 500, 1000]),
+                'dependencies': [rng.choice(ids)],
+                'description': f"Endpoint {k} of {service_id} " * 4,
+                'request_schema': {f"field_{f}": rng.choice(['string', 'integer', 'object']) for f in range(schema_fields)},
+                'response_schema': {f"result_{f}": rng.choice(['string', 'number', 'array']) for f in range(schema_fields)},
+                'implementation_status': rng.choice(STATUSES)
+            })
+        doc = {
+            'service_name': service_id.replace('_', ' '),
+            'service_id': service_id,
+            'hierarchical_tier': rng.choice(TIERS),
+            'parent_system': f"system_{i % 50}",
+            'purpose': f"Synthetic component {service_id} " * 8,
+            'dependencies': dependencies,
+            'interfaces': interfaces,
+            'implementation_status': rng.choice(STATUSES)
+        }
+        components[service_id] = json.loads(json.dumps(doc))
+    return components
+
+
+def _measure_graph(count: int, seed: int, lean: bool):
+    """Return (retained bytes, build seconds, export bytes, nodes, edges) for one graph build."""
+    gc.collect()
+    tracemalloc.start()
+    components = make_synthetic_components(count, seed)
+    sources = {sid: f"/synthetic/{sid}/service_architecture.json" for sid in components} if lean else None
+    start = time.perf_counter()
+    G = graph_from_components(components, lean=lean, sources=sources)
+    elapsed = time.perf_counter() - start
+    del components, sources
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    export_size = len(json.dumps(nx.node_link_data(G)))
+    return retained, elapsed, export_size, G.number_of_nodes(), G.number_of_edges()
+
+
+def benchmark_memory(args):
+    print(f"Graph memory on a synthetic system of {args.components} components (seed {args.seed})")
+    rows = []
+    for lean in (False, True):
+        retained, elapsed, export_size, nodes, edges = _measure_graph(args.components, args.seed, lean)
+        rows.append(('lean' if lean else 'raw', retained, elapsed, export_size))
+    print(f"  {nodes} nodes, {edges} edges")
+    print(f"  {'mode':<6} {'retained MB':>12} {'build s':>9} {'export MB':>10}")
+    for mode, retained, elapsed, export_size in rows:
+        print(f"  {mode:<6} {retained / 1e6:>12.1f} {elapsed:>9.2f} {export_size / 1e6:>10.1f}")
+    print(f"  lean/raw retained memory: {rows[1][1] / rows[0][1]:.2f}x")
+
+
+def benchmark_reachability(args):
+    print(f"Transitive dependency queries on a synthetic system of {args.components} components (seed {args.seed})")
+    G = graph_from_components(make_synthetic_components(args.components, args.seed), lean=True)
+    rng = random.Random(args.seed)
+    nodes = list(G)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(args.queries)]
+    print(f"  {G.number_of_nodes()} nodes, {G.number_of_edges()} edges, {len(queries)} queries")
+
+    start = time.perf_counter()
+    index = ReachabilityIndex(G)
+    build = time.perf_counter() - start
+    print(f"  index build: {build:.2f}s, {len(index.members)} condensed components")
+
+    rows = []
+    for name, traverse, indexed in [
+        ('reaches', lambda u, v: nx.has_path(G, u, v), index.reaches),
+        ('descendants', lambda u, v: len(nx.descendants(G, u)), lambda u, v: len(index.descendants(u))),
+        ('ancestors', lambda u, v: len(nx.ancestors(G, v)), lambda u, v: len(index.ancestors(v)))
+    ]:
+        timings = []
+        for query in (traverse, indexed):
+            start = time.perf_counter()
+            for u, v in queries:
+                query(u, v)
+            timings.append(time.perf_counter() - start)
+        rows.append((name, *timings))
+    print(f"  {'query':<12} {'networkx s':>11} {'index s':>9} {'speedup':>8}")
+    for name, traverse_s, indexed_s in rows:
+        print(f"  {name:<12} {traverse_s:>11.2f} {indexed_s:>9.2f} {traverse_s / indexed_s:>7.1f}x")
+
+
+def _per_check_issues(G: nx.DiGraph) -> Dict[str, list]:
+    """The node checks as detect_architectural_issues ran them before the rule engine: one graph scan per check."""
+    issues = {'orphaned_nodes': [], 'performance_bottlenecks': [], 'security_gaps': [], 'inconsistent_protocols': []}
+    for node in G.nodes():
+        if G.in_degree(node) == 0 and G.out_degree(node) == 0:
+            issues['orphaned_nodes'].append(node)
+    avg_degree = sum(dict(G.degree()).values()) / len(G.nodes()) if len(G.nodes()) > 0 else 0
+    for node in G.nodes():
+        if G.in_degree(node) + G.out_degree(node) > max(avg_degree * 2, 5):
+            issues['performance_bottlenecks'].append(node)
+    for node in G.nodes():
+        if G.in_degree(node) > 0 and not node_has_auth(G, node):
+            issues['security_gaps'].append(node)
+    for node in G.nodes():
+        incoming, outgoing = set(), set()
+        for u, v, data in G.edges(data=True):
+            protocol = data.get('type', 'unknown')
+            if v == node:
+                incoming.add(protocol)
+            if u == node:
+                outgoing.add(protocol)
+        if len(incoming) > 2 or len(outgoing) > 2:
+            issues['inconsistent_protocols'].append(node)
+    return issues
+
+
+class CostlyCheck:
+    """Stand-in for an expensive custom node check: busy for cost_us microseconds per node, reports nothing."""
+
+    def __init__(self, cost_us: float):
+        self.cost_us = cost_us
+
+    def __call__(self, tables, i: int):
+        deadline = time.perf_counter() + self.cost_us / 1e6
+        while time.perf_counter() < deadline:
+            pass
+        return None
+
+
+def benchmark_parallel_issues(G: nx.DiGraph, args):
+    """Time the single pass against detect_issues_parallel with the pool on and with its fallback."""
+    rules = default_rules()
+    if args.check_cost_us:
+        rules.append(NodeRule('costly_check', CostlyCheck(args.check_cost_us)))
+    start = time.perf_counter()
+    serial = detect_architectural_issues(G, rules=rules)
+    single = time.perf_counter() - start
+    print(f"  --jobs {args.jobs}, partition by {args.partition_by}, custom check {args.check_cost_us}us per node")
+    print(f"  single pass:      {single:.2f}s")
+    for label, min_seconds in (('pool', 0.0), ('adaptive', None)):
+        kwargs = {} if min_seconds is None else {'min_seconds': min_seconds}
+        start = time.perf_counter()
+        issues = detect_issues_parallel(G, args.jobs, args.partition_by, rules, **kwargs)
+        elapsed = time.perf_counter() - start
+        status = 'match' if issues == serial else 'MISMATCH'
+        print(f"  {label + ':':<17} {elapsed:.2f}s  speedup {single / elapsed:.2f}x  {status}")
+
+
+def benchmark_issues(args):
+    print(f"Issue detection on a synthetic system of {args.components} components (seed {args.seed})")
+    G = graph_from_components(make_synthetic_components(args.components, args.seed), lean=True)
+    print(f"  {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+    if args.jobs > 1:
+        return benchmark_parallel_issues(G, args)
+
+    start = time.perf_counter()
+    expected = _per_check_issues(G)
+    per_check = time.perf_counter() - start
+    start = time.perf_counter()
+    issues = detect_architectural_issues(G)
+    engine = time.perf_counter() - start
+
+    for category, nodes in expected.items():
+        found = [issue['node'] for issue in issues[category]]
+        status = 'match' if found == nodes else 'MISMATCH'
+        print(f"  {category:<24} {len(found):>6} issues  {status}")
+    print(f"  per-check scans: {per_check:.2f}s, rule engine: {engine:.2f}s, speedup {per_check / engine:.1f}x")
+
+
+def benchmark_path_load(args):
+    print(f"Sampled betweenness on a synthetic system of {args.components} components (seed {args.seed})")
+    compact = CompactGraph.from_networkx(graph_from_components(make_synthetic_components(args.components, args.seed),
+                                                               lean=True))
+    print(f"  {compact.number_of_nodes} nodes, {compact.number_of_edges} edges")
+    start = time.perf_counter()
+    scores, used = compact.approximate_betweenness(args.samples, args.seed, args.budget)
+    elapsed = time.perf_counter() - start
+    print(f"  {used}/{args.samples} sources sampled in {elapsed:.2f}s (budget {args.budget}s)")
+    top = np.argsort(-scores, kind='stable')[:args.top]
+    for i in top.tolist():
+        print(f"  {compact.nodes[i]:<12} {scores[i]:.4f}")
+    if args.exact:
+        start = time.perf_counter()
+        exact, _ = compact.approximate_betweenness(compact.number_of_nodes, args.seed, float('inf'))
+        elapsed = time.perf_counter() - start
+        overlap = len(set(top.tolist()) & set(np.argsort(-exact, kind='stable')[:args.top].tolist()))
+        print(f"  exact: {elapsed:.2f}s; top-{args.top} overlap with the estimate: {overlap}/{args.top}")
+
+
+def _layout_spread(G: nx.Graph, pos: Dict, rng: np.random.Generator, pairs: int = 100000) -> float:
+    """Mean edge length over mean distance between random node pairs (lower keeps neighbours closer)."""
+    nodes = list(G)
+    index = {node: i for i, node in enumerate(nodes)}
+    coords = np.array([pos[node] for node in nodes], dtype=float)
+    edges = np.array([(index[u], index[v]) for u, v in G.edges() if u != v], dtype=np.int64).reshape(-1, 2)
+    if not len(edges):
+        return float('nan')
+    edge_length = np.linalg.norm(coords[edges[:, 0]] - coords[edges[:, 1]], axis=1).mean()
+    i, j = rng.integers(len(nodes), size=(2, pairs))
+    return float(edge_length / np.linalg.norm(coords[i] - coords[j], axis=1).mean())
+
+
+def benchmark_layout(args):
+    print(f"Layouts of a synthetic system of {args.components} components (seed {args.seed})")
+    G = graph_from_components(make_synthetic_components(args.components, args.seed), lean=True)
+    print(f"  {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+    rng = np.random.default_rng(args.seed)
+    layouts = [('multilevel', lambda: multilevel_layout(G, seed=args.seed, time_budget=args.budget))]
+    if G.number_of_nodes() <= args.baseline_max:
+        layouts += [('spring', lambda: nx.spring_layout(G, seed=args.seed, k=3.0, iterations=100, scale=2.0)),
+                    ('kamada', lambda: nx.kamada_kawai_layout(G, scale=2.0))]
+    else:
+        print(f"  spring and kamada skipped above --baseline-max {args.baseline_max} nodes")
+    for name, compute in layouts:
+        start = time.perf_counter()
+        pos = compute()
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<12} {elapsed:>8.2f}s  edge/pair distance {_layout_spread(G, pos, rng):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark system-of-systems graph tooling on synthetic systems")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    memory = subparsers.add_parser('memory', help='Compare graph memory with raw documents vs lean nodes')
+    memory.add_argument('--components', type=int, default=10000)
+    memory.add_argument('--seed', type=int, default=42)
+    memory.set_defaults(func=benchmark_memory)
+
+    reach = subparsers.add_parser('reachability', help='Compare NetworkX traversals with the reachability index')
+    reach.add_argument('--components', type=int, default=10000)
+    reach.add_argument('--queries', type=int, default=2000)
+    reach.add_argument('--seed', type=int, default=42)
+    reach.set_defaults(func=benchmark_reachability)
+
+    issues = subparsers.add_parser('issues', help='Compare per-check issue scans with the single-pass rule engine')
+    issues.add_argument('--components', type=int, default=3400, help='3400 components give about 20k edges')
+    issues.add_argument('--seed', type=int, default=42)
+    issues.add_argument('--jobs', type=int, default=1, help='Compare the single pass with this many processes instead')
+    issues.add_argument('--partition-by', choices=['component', 'parent_system'], default='component')
+    issues.add_argument('--check-cost-us', type=float, default=0,
+                        help='Add a custom node check costing this many microseconds per node to the --jobs runs')
+    issues.set_defaults(func=benchmark_issues)
+
+    load = subparsers.add_parser('path-load', help='Time sampled betweenness within a budget')
+    load.add_argument('--components', type=int, default=8400, help='8400 components give about 50k edges')
+    load.add_argument('--samples', type=int, default=256)
+    load.add_argument('--budget', type=float, default=10.0)
+    load.add_argument('--top', type=int, default=10)
+    load.add_argument('--exact', action='store_true', help='Also compute exact betweenness to check the ranking')
+    load.add_argument('--seed', type=int, default=42)
+    load.set_defaults(func=benchmark_path_load)
+
+    layout = subparsers.add_parser('layout', help='Time the multilevel layout against spring and kamada')
+    layout.add_argument('--components', type=int, default=20000)
+    layout.add_argument('--budget', type=float, default=DEFAULT_LAYOUT_BUDGET, help='Multilevel layout time budget (s)')
+    layout.add_argument('--baseline-max', type=int, default=1000,
+                        help='Largest graph (nodes) on which spring and kamada are also timed')
+    layout.add_argument('--seed', type=int, default=42)
+    layout.set_defaults(func=benchmark_layout)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
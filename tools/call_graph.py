@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Call graph of a system: which services call which, how, and how slowly.
+
+The system graph only records that one service depends on another. The
+performance analyses need more per call: whether the caller waits for it
+(the interface's communication_pattern), how long the callee takes
+(Interface.timeout, a contract's timing_constraints.max_latency, or an
+observed measurement) and how many requests per second it accepts
+(Interface.rate_limit, BaseICD.rate_limits, a contract's rate limit), how
+many it serves at once (scaling_requirements), and how often a failed call
+is retried (a contract's retry_policy).
+build_call_graph derives all of that once into a DiGraph with the same nodes
+and edges.
+
+Latency sources, strongest first:
+    observed   --latencies file: {"service_id": ms, "caller->callee": ms}; a list
+               of measurements ([ms, ...]) counts as its mean and is kept as
+               the latency_samples of the service or call
+    contract   interfaces/*.json from generate_interface_contracts.py
+    timeout    the largest Interface.timeout the callee declares
+    default    default_latency_ms for services that declare nothing
+"""
+
+import os
+import re
+import json
+import glob
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import networkx as nx
+
+from component_bundle import ComponentBundle, is_bundle
+from component_loader import ComponentCache
+from component_model import ServiceNameIndex, get_interfaces, load_node_document
+from system_of_systems_graph import build_bundle_graph, build_system_graph, load_service_architecture_index
+
+# An observed latency: one value or a list of measurements, in ms
+Observed = Union[float, List[float]]
+
+SYNCHRONOUS_PATTERNS = ('synchronous', 'bidirectional')
+
+# Contract interaction types a caller does not wait for
+ASYNCHRONOUS_INTERACTIONS = ('asynchronous', 'broadcast')
+
+_DURATION = re.compile(r'^\s*([0-9]*\.?[0-9]+)\s*(ms|s|us|µs)?\s*$', re.IGNORECASE)
+_DURATION_SCALE = {None: 1.0, 'ms': 1.0, 's': 1000.0, 'us': 0.001, 'µs': 0.001}
+
+# Rate limit periods in seconds, matched against BaseICD.rate_limits keys; anything else is per second
+_RATE_PERIODS = (('minute', 60.0), ('hour', 3600.0), ('day', 86400.0))
+# scaling_requirements keys, in order of preference: instances of the service and requests each serves at once
+_INSTANCE_KEYS = ('replicas', 'instances', 'max_instances', 'min_instances')
+_CONCURRENCY_KEYS = ('max_concurrency', 'concurrency', 'workers', 'threads')
+_CONTRACT_RATE_LIMIT = re.compile(r'^Rate limit:\s*([0-9]*\.?[0-9]+)\s*$')
+
+
+def parse_latency_ms(value) -> Optional[float]:
+    """A latency in milliseconds from a number (ms) or a string like '250ms', '1.5s'; None if not given."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value >= 0 else None
+    if isinstance(value, str):
+        match = _DURATION.match(value)
+        if match:
+            return float(match.group(1)) * _DURATION_SCALE[match.group(2) and match.group(2).lower()]
+    return None
+
+
+def parse_rate_limit(value) -> Optional[float]:
+    """A rate limit in requests per second from a positive number; None if not given."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return None
+    if isinstance(value, (int, float)) and value > 0:
+        return float(value)
+    return None
+
+
+def load_contracts(contracts_dir: str) -> Dict[Tuple[str, str], dict]:
+    """Interface contracts keyed by (provider_component, consumer_component)."""
+    contracts = {}
+    for path in sorted(glob.glob(os.path.join(contracts_dir, '*.json'))):
+        try:
+            with open(path) as f:
+                contract = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Skipping contract {path}: {e}")
+            continue
+        provider, consumer = contract.get('provider_component'), contract.get('consumer_component')
+        if provider and consumer:
+            contracts.setdefault((provider, consumer), contract)
+    return contracts
+
+
+def load_observed_latencies(path: str) -> Tuple[Dict[str, Observed], Dict[Tuple[str, str], Observed]]:
+    """Observed latencies as (per service, per 'caller->callee' call), in milliseconds.
+
+    Each value is one latency or a list of measured latencies.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    services, calls = {}, {}
+    for key, value in data.items():
+        if isinstance(value, list):
+            latency = [ms for ms in map(parse_latency_ms, value) if ms is not None] or None
+        else:
+            latency = parse_latency_ms(value)
+        if latency is None:
+            continue
+        if '->' in key:
+            caller, callee = (part.strip() for part in key.split('->', 1))
+            calls[caller, callee] = latency
+        else:
+            services[key] = latency
+    return services, calls
+
+
+def _observed(value: Optional[Observed]) -> Tuple[Optional[float], Optional[List[float]]]:
+    """(latency, measured samples) of an observed value."""
+    if isinstance(value, list):
+        return sum(value) / len(value), value
+    return value, None
+
+
+def _contract_for(contracts: Dict[Tuple[str, str], dict], caller: str, callee: str) -> Optional[dict]:
+    # generate_interface_contracts.py pairs each component (as provider) with its dependencies
+    # (as consumers), so a call may be filed under either orientation
+    return contracts.get((callee, caller)) or contracts.get((caller, callee))
+
+
+def _declared_latency(interfaces: List[dict]) -> Optional[float]:
+    latencies = [parse_latency_ms(iface.get('timeout')) for iface in interfaces if isinstance(iface, dict)]
+    latencies = [latency for latency in latencies if latency is not None]
+    return max(latencies) if latencies else None
+
+
+def _declared_capacity(doc: dict, interfaces: List[dict]) -> Optional[float]:
+    # Every BaseICD.rate_limits entry caps the service; so does the sum of the interface limits,
+    # but only when each interface declares one (an unlimited interface leaves the service unlimited)
+    limits = []
+    for key, value in doc.get('icd', doc).get('rate_limits', {}).items():
+        rate = parse_rate_limit(value)
+        if rate is not None:
+            period = next((seconds for word, seconds in _RATE_PERIODS if word in key.lower()), 1.0)
+            limits.append(rate / period)
+    interface_limits = [parse_rate_limit(iface.get('rate_limit')) for iface in interfaces if isinstance(iface, dict)]
+    if interface_limits and None not in interface_limits:
+        limits.append(sum(interface_limits))
+    return min(limits) if limits else None
+
+
+def _declared_concurrency(doc: dict) -> Optional[int]:
+    scaling = doc.get('srd', doc).get('scaling_requirements', {})
+    if not isinstance(scaling, dict):
+        return None
+    def first(keys):
+        for key in keys:
+            value = scaling.get(key)
+            if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+                return value
+        return None
+    instances, per_instance = first(_INSTANCE_KEYS), first(_CONCURRENCY_KEYS)
+    if instances is None and per_instance is None:
+        return None
+    return (instances or 1) * (per_instance or 1)
+
+
+def _contract_capacity(contract: dict) -> Optional[float]:
+    # generate_interface_contracts.py records the interface's rate_limit among the input constraints
+    spec = contract.get('contract', {})
+    rate = parse_rate_limit(spec.get('timing_constraints', {}).get('throughput_requirements'))
+    if rate is not None:
+        return rate
+    for constraint in spec.get('input_specification', {}).get('constraints', []):
+        match = _CONTRACT_RATE_LIMIT.match(str(constraint))
+        if match:
+            return parse_rate_limit(match.group(1))
+    return None
+
+
+def _contract_retries(contract: dict) -> int:
+    policy = contract.get('contract', {}).get('error_handling', {}).get('retry_policy', {})
+    if policy.get('applicable') not in ('yes', True):
+        return 0
+    retries = policy.get('max_retries', 0)
+    return retries if isinstance(retries, int) and not isinstance(retries, bool) and retries > 0 else 0
+
+
+def build_call_graph(G: nx.DiGraph, contracts: Dict[Tuple[str, str], dict] = None,
+                     observed: Tuple[Dict[str, Observed], Dict[Tuple[str, str], Observed]] = None,
+                     default_latency_ms: float = 0.0) -> nx.DiGraph:
+    """Derive the call graph of a system graph.
+
+    Nodes get latency_ms / latency_source / latency_samples (the service's
+    own handling time, and its measurements if any),
+    capacity_rps (requests per second it accepts, None if unlimited) and
+    concurrency (requests it serves at once, None if not declared).
+    Edges get pattern ('synchronous' or 'asynchronous'), latency_ms /
+    latency_source / latency_samples (the time of that call, callee
+    included), capacity_rps
+    (the rate limit of the contract's interface), max_retries (None without
+    a contract) and the contract used, if any. A call is synchronous unless every interface of the caller
+    that names the callee is asynchronous, or its contract says so.
+    """
+    contracts = contracts or {}
+    observed_services, observed_calls = observed or ({}, {})
+    documents = {node: load_node_document(G, node) for node in G}
+    names = ServiceNameIndex(documents)
+
+    C = nx.DiGraph()
+    for node, doc in documents.items():
+        interfaces = get_interfaces(doc)
+        (latency, samples), source = _observed(observed_services.get(node)), 'observed'
+        if latency is None:
+            latency, source = _declared_latency(interfaces), 'timeout'
+        if latency is None:
+            latency, source = default_latency_ms, 'default'
+        C.add_node(node, latency_ms=latency, latency_source=source, latency_samples=samples,
+                   capacity_rps=_declared_capacity(doc, interfaces), concurrency=_declared_concurrency(doc),
+                   label=G.nodes[node].get('label', node))
+
+    for caller in G:
+        # Communication patterns of the caller's interfaces, by the service each one names
+        patterns: Dict[str, set] = {}
+        for iface in get_interfaces(documents[caller]):
+            if isinstance(iface, dict):
+                for dep in iface.get('dependencies', []):
+                    patterns.setdefault(names.resolve(dep), set()).add(iface.get('communication_pattern', 'synchronous'))
+        for callee in G.successors(caller):
+            _add_call(C, caller, callee, patterns.get(callee), contracts, observed_calls)
+    return C
+
+
+def _add_call(C: nx.DiGraph, caller: str, callee: str, patterns: Optional[set],
+              contracts: Dict[Tuple[str, str], dict], observed_calls: Dict[Tuple[str, str], Observed]):
+    synchronous = not patterns or bool(patterns & set(SYNCHRONOUS_PATTERNS))
+
+    contract = _contract_for(contracts, caller, callee)
+    (latency, samples), source = _observed(observed_calls.get((caller, callee))), 'observed'
+    if contract is not None:
+        if contract.get('interaction_type') in ASYNCHRONOUS_INTERACTIONS:
+            synchronous = False
+        if latency is None:
+            timing = contract.get('contract', {}).get('timing_constraints', {})
+            latency, source = parse_latency_ms(timing.get('max_latency')), 'contract'
+    if latency is None:
+        callee_attrs = C.nodes[callee]
+        latency, source, samples = callee_attrs['latency_ms'], callee_attrs['latency_source'], callee_attrs['latency_samples']
+    C.add_edge(caller, callee, pattern='synchronous' if synchronous else 'asynchronous',
+               latency_ms=latency, latency_source=source, latency_samples=samples,
+               capacity_rps=_contract_capacity(contract) if contract is not None else None,
+               max_retries=_contract_retries(contract) if contract is not None else None, contract=contract)
+
+
+def synchronous_subgraph(C: nx.DiGraph) -> nx.DiGraph:
+    """The calls a caller waits for, over every service of the call graph."""
+    S = nx.DiGraph()
+    S.add_nodes_from(C.nodes(data=True))
+    S.add_edges_from((u, v, data) for u, v, data in C.edges(data=True) if data['pattern'] == 'synchronous')
+    return S
+
+
+def find_entry_points(C: nx.DiGraph, requested: Iterable[str] = None) -> List[str]:
+    """Entry points of the call graph.
+
+    requested names (service ids or names) if given; otherwise services named
+    like gateways; otherwise services nothing calls.
+    """
+    if requested:
+        lookup = {str(node).lower(): node for node in C}
+        lookup.update({str(attrs.get('label', node)).lower(): node for node, attrs in C.nodes(data=True)})
+        entries = []
+        for name in requested:
+            node = lookup.get(name.lower())
+            if node is None:
+                print(f"Warning: entry point '{name}' is not in the call graph")
+            elif node not in entries:
+                entries.append(node)
+        return entries
+    gateways = [node for node, attrs in C.nodes(data=True)
+                if 'gateway' in f"{node} {attrs.get('label', '')}".lower()]
+    if gateways:
+        return gateways
+    return [node for node in C if C.in_degree(node) == 0]
+
+
+def add_call_graph_arguments(parser):
+    """The index and latency-source options shared by the call-graph analyses."""
+    parser.add_argument('index', help='Path to index.json or to a packed component bundle')
+    parser.add_argument('--levels', nargs='+', default=['package'],
+                        help='Hierarchy levels whose components make up the call graph')
+    parser.add_argument('--contracts', help='Interface contracts directory (default: interfaces/ next to the index)')
+    parser.add_argument('--latencies', help='JSON file of observed latencies: {"service": ms, "caller->callee": [ms, ...]}')
+    parser.add_argument('--default-latency', type=float, default=0.0,
+                        help='Latency in ms of services that declare no timeout')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the parsed-component cache next to index.json')
+
+
+def load_call_graph(args) -> nx.DiGraph:
+    """Build the call graph described by add_call_graph_arguments options."""
+    index_path = os.path.abspath(args.index)
+    index_dir = os.path.dirname(index_path)
+    if is_bundle(index_path):
+        G = build_bundle_graph(ComponentBundle(index_path), args.levels)
+    else:
+        cache = None if args.no_cache else ComponentCache.for_index(index_path)
+        G = build_system_graph(load_service_architecture_index(index_path, args.levels), args.levels,
+                               index_dir, cache=cache)
+    contracts_dir = args.contracts or os.path.join(index_dir, 'interfaces')
+    contracts = load_contracts(contracts_dir) if os.path.isdir(contracts_dir) else {}
+    observed = load_observed_latencies(args.latencies) if args.latencies else None
+    C = build_call_graph(G, contracts, observed, args.default_latency)
+    print(f"Call graph: {C.number_of_nodes()} services, {C.number_of_edges()} calls, {len(contracts)} contracts")
+    return C
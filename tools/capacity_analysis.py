@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput capacity by max-flow over declared rate limits.
+
+Each service of the synchronous call graph (call_graph.py) becomes a pair of
+flow nodes joined by its capacity_rps, and each call an arc capped by the
+rate limit of the interface it uses. A request entering at an entry point
+travels down call chains until it reaches a service that answers without
+calling further (a service in a sink component of the SCC condensation), so
+the maximum sustainable request rate of the entry point is the maximum flow
+from it to those services. Unlimited services and calls have infinite
+capacity; an entry point with no limit on some path is reported as
+unbounded.
+
+The minimum cut names the services and interfaces that saturate. Each cut
+element is then lifted to unlimited on its own to measure what scaling it
+gains: a service whose gain is zero shares the limit with another one, and
+adding replicas to it alone does not raise system throughput.
+
+Max-flow treats the calls leaving a service as alternative routes that
+share its flow, while one request really calls every dependency. Wherever
+there is fan-out the flow value overestimates throughput and its cut can
+name the wrong bottleneck. Each entry point therefore also gets a fan-out
+bound: the lowest capacity / calls per request over the limited services
+and calls it reaches, counting calls per request as call_volumes
+(amplification_analysis.py) does without retries. throughput_rps is the
+lower of the two and is what --demand is checked against.
+
+    python3 capacity_analysis.py /path/to/index.json --entry api-gateway --demand 500
+"""
+
+import json
+import argparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import networkx as nx
+from networkx.algorithms.flow import preflow_push
+
+from amplification_analysis import call_volumes
+from call_graph import add_call_graph_arguments, find_entry_points, load_call_graph, synchronous_subgraph
+from compact_graph import CompactGraph
+from issue_report import ANALYSIS_TIMESTAMP
+
+_SINK = ('__sink__', 'in')
+
+FAN_OUT_NOTE = ("max_throughput_rps is a max-flow value, which splits a service's outgoing calls as alternative "
+                "routes; fan_out_bound_rps accounts for every call a request makes, and throughput_rps is the "
+                "lower of the two")
+
+
+def flow_network(S: nx.DiGraph) -> nx.DiGraph:
+    """The flow network of a synchronous call graph: (service, 'in') -> (service, 'out') arcs and call arcs.
+
+    Arcs carry 'capacity' only when limited (networkx treats a missing
+    capacity as infinite). Services of sink components drain into _SINK.
+    """
+    N = nx.DiGraph()
+    for node, capacity in S.nodes(data='capacity_rps'):
+        N.add_edge((node, 'in'), (node, 'out'), **({'capacity': capacity} if capacity is not None else {}))
+    for u, v, capacity in S.edges(data='capacity_rps'):
+        if u != v:
+            N.add_edge((u, 'out'), (v, 'in'), **({'capacity': capacity} if capacity is not None else {}))
+
+    compact = CompactGraph.from_networkx(S)
+    labels, dag_sources, _, _ = compact.condensation()
+    has_exit = set(dag_sources.tolist())
+    for i, label in enumerate(labels.tolist()):
+        if label not in has_exit:
+            N.add_edge((compact.nodes[i], 'out'), _SINK)
+    return N
+
+
+def _max_flow(N: nx.DiGraph, source) -> Tuple[Optional[float], Optional[nx.DiGraph]]:
+    """(flow value, residual network) from source to the sink; (None, None) if unbounded."""
+    try:
+        R = preflow_push(N, source, _SINK)
+    except nx.NetworkXUnbounded:
+        return None, None
+    return float(R.graph['flow_value']), R
+
+
+def _min_cut(N: nx.DiGraph, R: nx.DiGraph, source) -> List[Tuple]:
+    """Limited arcs from the source side of the residual network to the rest."""
+    reachable = {source}
+    stack = [source]
+    while stack:
+        u = stack.pop()
+        for v, attrs in R[u].items():
+            if v not in reachable and attrs['flow'] < attrs['capacity']:
+                reachable.add(v)
+                stack.append(v)
+    return [(u, v) for u in reachable for v in N[u] if v not in reachable]
+
+
+def _describe_arc(S: nx.DiGraph, u, v) -> Dict:
+    if u[0] == v[0]:
+        return {'service': u[0], 'capacity_rps': S.nodes[u[0]]['capacity_rps']}
+    return {'from': u[0], 'to': v[0], 'capacity_rps': S.edges[u[0], v[0]]['capacity_rps']}
+
+
+def fan_out_bounds(S: nx.DiGraph, entries: List) -> List[Dict]:
+    """Per entry point, the tightest capacity / calls per request over the limited services and calls it reaches.
+
+    Each item has fan_out_bound_rps (None if nothing reached is limited) and
+    fan_out_limit, the service or call that sets it.
+    """
+    compact, _, volumes, _, _ = call_volumes(S, entries, failure_rate=0.0)
+    nodes = compact.nodes
+    service_capacity = np.array([np.nan if S.nodes[node].get('capacity_rps') is None else S.nodes[node]['capacity_rps']
+                                 for node in nodes], dtype=np.float64)
+    calls = [(compact.index[u], compact.index[v], capacity) for u, v, capacity in S.edges(data='capacity_rps')
+             if capacity is not None and u != v]
+    callers = np.array([u for u, _, _ in calls], dtype=np.int64)
+    call_capacity = np.array([capacity for _, _, capacity in calls], dtype=np.float64)
+
+    results = []
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for row in volumes:
+            # A limit nobody reaches bounds nothing: its rate per request is 0, giving an infinite bound
+            service_bound = np.where(row > 0, service_capacity / row, np.inf)
+            call_bound = np.where(row[callers] > 0, call_capacity / row[callers], np.inf)
+            service_bound[np.isnan(service_bound)] = np.inf
+            best_service = int(np.argmin(service_bound)) if len(service_bound) else None
+            best_call = int(np.argmin(call_bound)) if len(call_bound) else None
+            bound, limit = np.inf, None
+            if best_service is not None and service_bound[best_service] < bound:
+                bound = service_bound[best_service]
+                limit = {'service': nodes[best_service], 'capacity_rps': float(service_capacity[best_service]),
+                         'calls_per_request': float(row[best_service])}
+            if best_call is not None and call_bound[best_call] < bound:
+                bound = call_bound[best_call]
+                u, v, capacity = calls[best_call]
+                limit = {'from': nodes[u], 'to': nodes[v], 'capacity_rps': capacity,
+                         'calls_per_request': float(row[u])}
+            results.append({'fan_out_bound_rps': float(bound) if np.isfinite(bound) else None,
+                            'fan_out_limit': limit})
+    return results
+
+
+def entry_capacity(S: nx.DiGraph, N: nx.DiGraph, entry, demand_rps: float = None, fan_out: Dict = None) -> Dict:
+    """Maximum sustainable request rate of one entry point, its saturating services and what scaling each gains.
+
+    fan_out is the entry's item of fan_out_bounds; throughput_rps is the lower of it and the flow value.
+    """
+    source = (entry, 'in')
+    value, R = _max_flow(N, source)
+    result = {'entry': entry, 'max_throughput_rps': value, 'bounded': value is not None}
+    if value is None:
+        result['saturating'] = []
+    else:
+        saturating = []
+        for u, v in _min_cut(N, R, source):
+            capacity = N.edges[u, v]['capacity']
+            del N.edges[u, v]['capacity']
+            lifted, _ = _max_flow(N, source)
+            N.edges[u, v]['capacity'] = capacity
+            saturating.append({**_describe_arc(S, u, v),
+                               'throughput_if_unlimited_rps': lifted,
+                               'gain_rps': lifted - value if lifted is not None else None})
+        saturating.sort(key=lambda item: -(item['gain_rps'] if item['gain_rps'] is not None else float('inf')))
+        result['saturating'] = saturating
+    if fan_out is not None:
+        result.update(fan_out)
+        bounds = [b for b in (value, fan_out['fan_out_bound_rps']) if b is not None]
+        value = min(bounds) if bounds else None
+    result['throughput_rps'] = value
+    if demand_rps is not None:
+        result['demand_rps'] = demand_rps
+        result['headroom_rps'] = value - demand_rps if value is not None else None
+        result['sustainable'] = value is None or value >= demand_rps
+    return result
+
+
+def capacity_report(C: nx.DiGraph, entries: Iterable = None, demand_rps: float = None) -> Dict:
+    """Throughput capacity report of a call graph for the given entry points (see find_entry_points)."""
+    S = synchronous_subgraph(C)
+    N = flow_network(S)
+    entry_points = find_entry_points(S, entries)
+    results = [entry_capacity(S, N, entry, demand_rps, fan_out)
+               for entry, fan_out in zip(entry_points, fan_out_bounds(S, entry_points))]
+    limited = [r['throughput_rps'] for r in results if r['throughput_rps'] is not None]
+    return {
+        'analysis_timestamp': ANALYSIS_TIMESTAMP,
+        'note': FAN_OUT_NOTE,
+        'summary': {
+            'services': S.number_of_nodes(),
+            'rate_limited_services': sum(1 for _, capacity in S.nodes(data='capacity_rps') if capacity is not None),
+            'rate_limited_calls': sum(1 for _, _, capacity in S.edges(data='capacity_rps') if capacity is not None),
+            'entry_points': len(results),
+            'unbounded_entry_points': len(results) - len(limited),
+            'lowest_throughput_rps': min(limited, default=None)
+        },
+        'entry_points': sorted(results, key=lambda r: r['throughput_rps']
+                               if r['throughput_rps'] is not None else float('inf'))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maximum sustainable request rate of each entry point by max-flow")
+    add_call_graph_arguments(parser)
+    parser.add_argument('--entry', action='append',
+                        help='Entry point service (repeatable; default: gateway services, else services nothing calls)')
+    parser.add_argument('--demand', type=float, help='Expected request rate per entry point (requests per second)')
+    parser.add_argument('--out', default='capacity_report.json', help='Output report filename')
+    args = parser.parse_args()
+
+    report = capacity_report(load_call_graph(args), args.entry, args.demand)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Capacity report saved to {args.out}")
+    print(f"Note: {FAN_OUT_NOTE}")
+    for result in report['entry_points'][:10]:
+        if result['throughput_rps'] is None:
+            print(f"  {result['entry']}: unbounded (no rate limit on some call chain)")
+            continue
+        limits = [item.get('service') or f"{item['from']}->{item['to']}" for item in result['saturating'][:3]]
+        fan_out = result.get('fan_out_limit')
+        if fan_out is not None and result['throughput_rps'] == result['fan_out_bound_rps']:
+            name = fan_out['service'] if 'service' in fan_out else f"{fan_out['from']}->{fan_out['to']}"
+            limits = [f"{name} ({fan_out['calls_per_request']:g} calls per request)"]
+        print(f"  {result['entry']}: {result['throughput_rps']:.1f} req/s, limited by {', '.join(limits)}")
+
+
+if __name__ == "__main__":
+    main()
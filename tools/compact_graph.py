@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Compact, array-backed graph core for architecture analysis.
+
+A NetworkX DiGraph stores every node and edge as nested dicts, which costs
+hundreds of bytes per edge and makes whole-graph checks slow Python loops.
+CompactGraph numbers the nodes 0..n-1 and stores the edges twice, as CSR
+(outgoing) and CSC (incoming) NumPy arrays, with per-edge type codes and
+per-node attribute columns. Degree, orphan, bottleneck, security and SCC
+checks then run as array operations. The NetworkX graph is still what gets
+exported and drawn.
+"""
+
+import sys
+import time
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import networkx as nx
+
+from component_model import (
+    ServiceNameIndex, classify_node, has_auth_interface, iter_component_references, node_has_auth
+)
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+except ImportError:  # scipy is optional; SCCs fall back to an iterative Tarjan over the CSR arrays
+    csr_matrix = None
+
+# Default edge type, as read by the analysis when an edge has no 'type'
+UNKNOWN_EDGE_TYPE = 'unknown'
+
+# Defaults for representative cycle reporting: longest cycle searched and cycles kept per SCC
+DEFAULT_MAX_CYCLE_LENGTH = 10
+DEFAULT_MAX_CYCLES = 5
+
+# Defaults for sampled betweenness: BFS sources sampled, RNG seed and wall-clock budget in seconds
+DEFAULT_BETWEENNESS_SAMPLES = 256
+DEFAULT_BETWEENNESS_SEED = 0
+DEFAULT_BETWEENNESS_BUDGET = 10.0
+
+
+class CompactGraph:
+    """Directed graph as CSR/CSC integer arrays plus attribute columns.
+
+    Attributes:
+        nodes: node ids in graph order; node i is nodes[i]
+        index: node id -> integer id
+        indptr, indices: CSR out-adjacency (successors of i are indices[indptr[i]:indptr[i+1]])
+        in_indptr, in_indices: CSC in-adjacency (predecessors of i)
+        edge_types: type code of each CSR edge; type_names maps codes to strings
+        in_edge_types: type code of each CSC edge
+        has_auth: bool column, True if the node has an authentication interface
+    """
+
+    def __init__(self, nodes: Sequence, sources: np.ndarray, targets: np.ndarray, types: np.ndarray,
+                 type_names: List[str], has_auth: np.ndarray = None):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.type_names = list(type_names)
+        n = len(self.nodes)
+        sources = np.asarray(sources, dtype=np.int32)
+        targets = np.asarray(targets, dtype=np.int32)
+        types = np.asarray(types, dtype=np.int16)
+
+        # Stable sorts keep each node's neighbours in edge insertion order, as NetworkX iterates them
+        order = np.argsort(sources, kind='stable')
+        self.indices = targets[order]
+        self.edge_types = types[order]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=self.indptr[1:])
+
+        order = np.argsort(targets, kind='stable')
+        self.in_indices = sources[order]
+        self.in_edge_types = types[order]
+        self.in_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=n), out=self.in_indptr[1:])
+
+        self.has_auth = np.zeros(n, dtype=bool) if has_auth is None else np.asarray(has_auth, dtype=bool)
+
+    @classmethod
+    def from_networkx(cls, G: nx.DiGraph) -> 'CompactGraph':
+        """Build from a system graph (raw or lean nodes)."""
+        index = {node: i for i, node in enumerate(G.nodes())}
+        type_codes: Dict[str, int] = {}
+        m = G.number_of_edges()
+        sources = np.empty(m, dtype=np.int32)
+        targets = np.empty(m, dtype=np.int32)
+        types = np.empty(m, dtype=np.int16)
+        for k, (u, v, edge_type) in enumerate(G.edges(data='type', default=UNKNOWN_EDGE_TYPE)):
+            sources[k] = index[u]
+            targets[k] = index[v]
+            types[k] = type_codes.setdefault(edge_type, len(type_codes))
+        has_auth = np.fromiter((node_has_auth(G, node) for node in G.nodes()), dtype=bool, count=len(index))
+        return cls(list(index), sources, targets, types, list(type_codes), has_auth)
+
+    @classmethod
+    def from_components(cls, service_info: Mapping[str, dict], include_levels: List[str] = None) -> 'CompactGraph':
+        """Build directly from loaded components, with the nodes and edges graph_from_components would give."""
+        kept = [sid for sid, data in service_info.items()
+                if include_levels is None or classify_node(sid, data)[0] in include_levels]
+        index = {sid: i for i, sid in enumerate(kept)}
+        names = ServiceNameIndex(service_info)
+        type_codes: Dict[str, int] = {}
+        edges: Dict[Tuple[int, int], int] = {}  # like DiGraph.add_edge: first insertion fixes order, last type wins
+        for sid in kept:
+            u = index[sid]
+            for dep, edge_type in iter_component_references(service_info[sid]):
+                v = index.get(names.resolve(dep))
+                if v is not None:
+                    edges[u, v] = type_codes.setdefault(edge_type, len(type_codes))
+        pairs = np.array(list(edges), dtype=np.int32).reshape(-1, 2)
+        has_auth = [has_auth_interface(service_info[sid].get('interfaces', [])) for sid in kept]
+        return cls(kept, pairs[:, 0], pairs[:, 1], np.fromiter(edges.values(), dtype=np.int16, count=len(edges)),
+                   list(type_codes), has_auth)
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def number_of_edges(self) -> int:
+        return len(self.indices)
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.diff(self.in_indptr)
+
+    def degree(self) -> np.ndarray:
+        return self.out_degree() + self.in_degree()
+
+    def successors(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def predecessors(self, i: int) -> np.ndarray:
+        return self.in_indices[self.in_indptr[i]:self.in_indptr[i + 1]]
+
+    def edge_sources(self) -> np.ndarray:
+        """Source node of every CSR edge (the row index expanded)."""
+        return np.repeat(np.arange(len(self.nodes), dtype=np.int32), self.out_degree())
+
+    def orphans(self) -> np.ndarray:
+        """Integer ids of nodes with no incoming or outgoing edges."""
+        return np.flatnonzero(self.degree() == 0)
+
+    def bottlenecks(self, factor: float = 2, minimum: int = 5) -> np.ndarray:
+        """Integer ids of nodes whose degree exceeds max(average degree * factor, minimum)."""
+        degree = self.degree()
+        average = degree.mean() if len(degree) else 0
+        return np.flatnonzero(degree > max(average * factor, minimum))
+
+    def security_gaps(self) -> np.ndarray:
+        """Integer ids of nodes that receive connections but have no authentication interface."""
+        return np.flatnonzero((self.in_degree() > 0) & ~self.has_auth)
+
+    def protocol_matrix(self, incoming: bool) -> np.ndarray:
+        """Bool matrix [node, type code]: True if the node has an incoming (or outgoing) edge of that type."""
+        n, t = len(self.nodes), max(len(self.type_names), 1)
+        matrix = np.zeros((n, t), dtype=bool)
+        if incoming:
+            matrix[self.indices, self.edge_types] = True
+        else:
+            matrix[self.edge_sources(), self.edge_types] = True
+        return matrix
+
+    def scc_labels(self) -> Tuple[int, np.ndarray]:
+        """Strongly connected components as (count, component label of every node)."""
+        n = len(self.nodes)
+        if csr_matrix is not None:
+            adjacency = csr_matrix((np.ones(len(self.indices), dtype=np.int8), self.indices, self.indptr), shape=(n, n))
+            return connected_components(adjacency, directed=True, connection='strong')
+        return self._tarjan()
+
+    def condensation(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[int]]:
+        """The SCC condensation DAG as (labels, dag_sources, dag_targets, topological order of the labels).
+
+        dag_sources/dag_targets are the distinct edges between different components.
+        """
+        count, labels = self.scc_labels()
+        sources = labels[self.edge_sources()]
+        targets = labels[self.indices]
+        keep = sources != targets
+        dag = np.unique(np.stack([sources[keep], targets[keep]], axis=1), axis=0) if keep.any() \
+            else np.empty((0, 2), dtype=np.int64)
+
+        # Kahn's algorithm
+        successors: List[List[int]] = [[] for _ in range(count)]
+        for u, v in dag.tolist():
+            successors[u].append(v)
+        pending = np.bincount(dag[:, 1], minlength=count).tolist()
+        order = [c for c in range(count) if pending[c] == 0]
+        for c in order:
+            for s in successors[c]:
+                pending[s] -= 1
+                if pending[s] == 0:
+                    order.append(s)
+        return labels, dag[:, 0], dag[:, 1], order
+
+    def weak_labels(self) -> Tuple[int, np.ndarray]:
+        """Weakly connected components as (count, component label of every node)."""
+        n = len(self.nodes)
+        if csr_matrix is not None:
+            adjacency = csr_matrix((np.ones(len(self.indices), dtype=np.int8), self.indices, self.indptr), shape=(n, n))
+            return connected_components(adjacency, directed=True, connection='weak')
+        # Label propagation: every node takes the smallest label among its neighbours until nothing changes
+        labels = np.arange(n)
+        sources, targets = self.edge_sources(), self.indices
+        while True:
+            previous = labels.copy()
+            np.minimum.at(labels, sources, labels[targets])
+            np.minimum.at(labels, targets, labels[sources])
+            labels = labels[labels]
+            if np.array_equal(labels, previous):
+                break
+        roots, labels = np.unique(labels, return_inverse=True)
+        return len(roots), labels.astype(np.int32)
+
+    def _tarjan(self) -> Tuple[int, np.ndarray]:
+        """Iterative Tarjan SCC over the CSR arrays (no recursion limit on deep graphs)."""
+        n = len(self.nodes)
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        order = [-1] * n
+        low = [0] * n
+        labels = [-1] * n
+        stack, on_stack = [], [False] * n
+        counter = count = 0
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            work = [(root, indptr[root])]
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                v, pos = work[-1]
+                if pos < indptr[v + 1]:
+                    work[-1] = (v, pos + 1)
+                    w = indices[pos]
+                    if order[w] == -1:
+                        order[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, indptr[w]))
+                    elif on_stack[w] and order[w] < low[v]:
+                        low[v] = order[w]
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[v] < low[parent]:
+                        low[parent] = low[v]
+                if low[v] == order[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        labels[w] = count
+                        if w == v:
+                            break
+                    count += 1
+        return count, np.array(labels, dtype=np.int32)
+
+    def cyclic_components(self) -> List[np.ndarray]:
+        """Node ids of every SCC that contains a cycle (more than one node, or a self-loop).
+
+        Members are in node order and components are ordered by their first
+        member, so the result does not depend on how the SCCs were labelled.
+        """
+        count, labels = self.scc_labels()
+        sizes = np.bincount(labels, minlength=count)
+        cyclic = sizes > 1
+        sources = self.edge_sources()
+        cyclic[labels[sources[sources == self.indices]]] = True
+        order = np.argsort(labels, kind='stable')
+        bounds = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(sizes, out=bounds[1:])
+        components = [order[bounds[c]:bounds[c + 1]] for c in np.flatnonzero(cyclic)]
+        return sorted(components, key=lambda members: members[0])
+
+    def has_cycle(self) -> bool:
+        return bool(self.cyclic_components())
+
+    def shortest_cycle_through(self, start: int, inside: np.ndarray, max_length: int) -> List[int]:
+        """Shortest cycle through start over nodes where inside is True, or [] if none has at most max_length nodes.
+
+        Breadth-first search from start back to itself, cut off at depth max_length.
+        """
+        parent = {start: None}
+        frontier = [start]
+        for _ in range(max_length):
+            next_frontier = []
+            for v in frontier:
+                for w in self.successors(v).tolist():
+                    if w == start:
+                        cycle = [v]
+                        while parent[cycle[-1]] is not None:
+                            cycle.append(parent[cycle[-1]])
+                        return cycle[::-1]
+                    if inside[w] and w not in parent:
+                        parent[w] = v
+                        next_frontier.append(w)
+            frontier = next_frontier
+            if not frontier:
+                break
+        return []
+
+    def representative_cycles(self, members: np.ndarray, max_length: int = DEFAULT_MAX_CYCLE_LENGTH,
+                              max_cycles: int = DEFAULT_MAX_CYCLES,
+                              degree: np.ndarray = None) -> Tuple[List[List[int]], bool]:
+        """A few shortest cycles of one strongly connected component, without enumerating them all.
+
+        Takes the shortest cycle through each member in turn, highest degree
+        first, until max_cycles distinct cycles are found. Returns
+        (cycles, truncated); truncated is True when the count cap stopped the
+        search or some member lies on no cycle of at most max_length nodes.
+        degree (per node) replaces this graph's degrees when it is part of a
+        larger graph whose degrees should rank the members.
+        """
+        members = np.asarray(members)
+        degree = (self.degree() if degree is None else degree)[members]
+        cycles: List[List[int]] = []
+        seen = set()
+        inside = np.zeros(len(self.nodes), dtype=bool)
+        inside[members] = True
+        covered = np.zeros(len(self.nodes), dtype=bool)
+        truncated = False
+        for start in members[np.argsort(-degree, kind='stable')].tolist():
+            if covered[start]:
+                continue
+            if len(cycles) >= max_cycles:
+                truncated = True
+                break
+            cycle = self.shortest_cycle_through(start, inside, max_length)
+            if not cycle:
+                truncated = True
+                continue
+            covered[cycle] = True
+            # Rotate to the smallest id so the same cycle found from another member is recognised
+            pivot = cycle.index(min(cycle))
+            key = tuple(cycle[pivot:] + cycle[:pivot])
+            if key not in seen:
+                seen.add(key)
+                cycles.append(cycle)
+        return cycles, truncated
+
+    def _out_edges_of(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(sources, targets) of every CSR edge leaving the frontier nodes."""
+        counts = self.indptr[frontier + 1] - self.indptr[frontier]
+        total = int(counts.sum())
+        offsets = np.repeat(self.indptr[frontier] - np.cumsum(counts) + counts, counts)
+        return np.repeat(frontier, counts), self.indices[offsets + np.arange(total)]
+
+    def _source_dependencies(self, source: int) -> np.ndarray:
+        """Brandes dependency of every node on the shortest paths from source (unweighted).
+
+        Level-synchronous BFS: each level's edges are gathered from the CSR
+        arrays at once, path counts and dependencies are scattered with np.add.at.
+        """
+        n = len(self.nodes)
+        dist = np.full(n, -1, dtype=np.int64)
+        sigma = np.zeros(n)
+        delta = np.zeros(n)
+        dist[source] = 0
+        sigma[source] = 1.0
+        frontier = np.array([source], dtype=np.int64)
+        levels = []
+        depth = 0
+        while len(frontier):
+            sources, targets = self._out_edges_of(frontier)
+            unseen = targets[dist[targets] == -1]
+            dist[unseen] = depth + 1
+            on_path = dist[targets] == depth + 1
+            sources, targets = sources[on_path], targets[on_path]
+            np.add.at(sigma, targets, sigma[sources])
+            levels.append((sources, targets))
+            frontier = np.unique(unseen)
+            depth += 1
+        for sources, targets in reversed(levels):
+            np.add.at(delta, sources, sigma[sources] / sigma[targets] * (1.0 + delta[targets]))
+        delta[source] = 0.0
+        return delta
+
+    def approximate_betweenness(self, samples: int = DEFAULT_BETWEENNESS_SAMPLES, seed: int = DEFAULT_BETWEENNESS_SEED,
+                                time_budget: float = DEFAULT_BETWEENNESS_BUDGET) -> Tuple[np.ndarray, int]:
+        """Betweenness centrality estimated from a random sample of BFS sources.
+
+        Normalized like nx.betweenness_centrality on a directed graph, so a
+        value is the estimated fraction of shortest paths through the node.
+        Sampling stops early, after at least one source, once time_budget
+        seconds have passed. Returns (scores, sources actually used).
+        """
+        n = len(self.nodes)
+        scores = np.zeros(n)
+        if n < 3:
+            return scores, 0
+        rng = np.random.default_rng(seed)
+        sources = rng.permutation(n)[:min(samples, n)] if samples < n else np.arange(n)
+        deadline = time.perf_counter() + time_budget
+        used = 0
+        for source in sources.tolist():
+            if used and time.perf_counter() > deadline:
+                break
+            scores += self._source_dependencies(source)
+            used += 1
+        return scores * (n / used) / ((n - 1) * (n - 2)), used
+
+    def nbytes(self) -> int:
+        """Memory held by the arrays (excluding the node id list)."""
+        arrays = (self.indptr, self.indices, self.edge_types, self.in_indptr, self.in_indices,
+                  self.in_edge_types, self.has_auth)
+        return sum(a.nbytes for a in arrays) + sys.getsizeof(self.index)
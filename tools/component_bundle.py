@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Packed system bundles: every component of a system in one file.
+
+Loading a large system means opening thousands of small service_architecture.json
+files. A bundle stores them all in a single file that is read through a memory
+map, so a tool opens one file and only decodes the records it actually uses.
+
+Layout (all integers little-endian):
+    header   magic b'SAABNDL1', uint32 version, uint32 record count,
+             uint64 table offset, uint64 table length,
+             uint64 metadata offset, uint64 metadata length
+    records  one zlib-compressed compact JSON document per component
+    table    JSON list of [service_id, source_path, offset, length, summary]
+    metadata JSON object with the non-component fields of index.json
+
+The summary of each record holds the fields needed to classify the component
+and resolve dependency names (hierarchical_tier, service_name, package_name),
+so a graph restricted to some levels never decodes the other records.
+
+Usage:
+    python3 component_bundle.py pack /path/to/systems/<system_name>/index.json [-o system.saabundle]
+    python3 component_bundle.py info /path/to/system.saabundle
+"""
+
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import argparse
+from functools import lru_cache
+from collections.abc import Mapping
+from typing import Dict, Iterator
+
+MAGIC = b'SAABNDL1'
+BUNDLE_VERSION = 1
+BUNDLE_EXTENSION = '.saabundle'
+HEADER = struct.Struct('<8sIIQQQQ')
+SUMMARY_FIELDS = ('hierarchical_tier', 'service_name', 'package_name')
+
+
+def is_bundle(path: str) -> bool:
+    """True if path is a component bundle (checked by magic bytes)."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def component_summary(data: dict) -> dict:
+    """The fields of a component kept in the bundle table."""
+    return {field: data[field] for field in SUMMARY_FIELDS if field in data}
+
+
+def write_bundle(out_path: str, components: Dict[str, dict], sources: Dict[str, str] = None,
+                 metadata: dict = None):
+    """Write components (service_id -> document) to a bundle file, atomically."""
+    sources = sources or {}
+    tmp_path = f"{out_path}.tmp.{os.getpid()}"
+    table = []
+    with open(tmp_path, 'wb') as f:
+        f.write(b'\0' * HEADER.size)
+        for service_id, data in components.items():
+            record = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+            table.append([service_id, sources.get(service_id), f.tell(), len(record), component_summary(data)])
+            f.write(record)
+        table_bytes = json.dumps(table, separators=(',', ':')).encode('utf-8')
+        table_offset = f.tell()
+        f.write(table_bytes)
+        metadata_bytes = json.dumps(metadata or {}, separators=(',', ':')).encode('utf-8')
+        metadata_offset = f.tell()
+        f.write(metadata_bytes)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, BUNDLE_VERSION, len(table), table_offset, len(table_bytes),
+                            metadata_offset, len(metadata_bytes)))
+    os.replace(tmp_path, out_path)
+
+
+class ComponentBundle(Mapping):
+    """Read-only, memory-mapped view of a bundle as a service_id -> document mapping.
+
+    Records are decoded on access; iteration order is the order they were packed in.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Not a component bundle: {path}")
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"Not a component bundle: {path}")
+        magic, version, count, table_offset, table_length, metadata_offset, metadata_length = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a component bundle: {path}")
+        if version != BUNDLE_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported bundle version {version} in {path}")
+        table = json.loads(self._map[table_offset:table_offset + table_length])
+        self.metadata = json.loads(self._map[metadata_offset:metadata_offset + metadata_length])
+        self._records = {sid: (offset, length) for sid, _, offset, length, _ in table}
+        self.sources = {sid: source for sid, source, _, _, _ in table if source is not None}
+        self.summaries = {sid: summary for sid, _, _, _, summary in table}
+
+    def __getitem__(self, service_id: str) -> dict:
+        offset, length = self._records[service_id]
+        return json.loads(zlib.decompress(self._map[offset:offset + length]))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, service_id) -> bool:
+        return service_id in self._records
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@lru_cache(maxsize=8)
+def open_bundle(path: str) -> ComponentBundle:
+    """Open a bundle once per process and reuse it (e.g. for lazy document loads)."""
+    return ComponentBundle(path)
+
+
+def pack_system(index_path: str, out_path: str = None, workers: int = None) -> str:
+    """Pack every component listed in index_path into a bundle; returns the bundle path."""
+    # Imported here: system_of_systems_graph itself imports this module to read bundles
+    from system_of_systems_graph import INDEX_METADATA_KEYS, load_service_architecture_index
+    from component_loader import DEFAULT_WORKERS, load_components, resolve_component_path
+
+    index_path = os.path.abspath(index_path)
+    index_dir = os.path.dirname(index_path)
+    out_path = out_path or os.path.join(index_dir, 'index' + BUNDLE_EXTENSION)
+    index = load_service_architecture_index(index_path)
+    components = load_components(index, index_dir, workers=workers or DEFAULT_WORKERS)
+    sources = {sid: os.path.relpath(resolve_component_path(index[sid], index_dir), index_dir)
+               for sid in components}
+    with open(index_path, 'r') as f:
+        index_data = json.load(f)
+    metadata = {k: v for k, v in index_data.items() if k in INDEX_METADATA_KEYS} if isinstance(index_data, dict) else {}
+    write_bundle(out_path, components, sources, metadata)
+    print(f"Packed {len(components)} components into {out_path} ({os.path.getsize(out_path)} bytes)")
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack a system's component files into a single bundle")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    pack = subparsers.add_parser('pack', help='Write every component listed in index.json into one bundle')
+    pack.add_argument('index', help='Path to index.json')
+    pack.add_argument('-o', '--output', help=f'Bundle path (default: index{BUNDLE_EXTENSION} next to index.json)')
+    pack.add_argument('--workers', type=int, default=None, help='Number of threads used to read component files')
+
+    info = subparsers.add_parser('info', help='Show the contents of a bundle')
+    info.add_argument('bundle', help='Path to a bundle file')
+
+    args = parser.parse_args()
+    if args.command == 'pack':
+        pack_system(args.index, args.output, args.workers)
+    else:
+        if not is_bundle(args.bundle):
+            print(f"Error: {args.bundle} is not a component bundle")
+            sys.exit(1)
+        with ComponentBundle(args.bundle) as bundle:
+            print(json.dumps({
+                'path': bundle.path,
+                'components': len(bundle),
+                'metadata': bundle.metadata,
+                'service_ids': list(bundle)
+            }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
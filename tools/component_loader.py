@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Shared component loading for the architecture tools.
+
+Reads the service_architecture.json files listed in an index. File I/O runs
+in a thread pool; JSON parsing can optionally be moved to a process pool for
+very large documents. Results are always returned in index order, so the
+output does not depend on which file finishes first.
+
+Parsed documents can be kept in an on-disk ComponentCache stored next to
+index.json, so warm runs only re-parse files that changed. The cache sits in
+the architecture data directory, so it is written with marshal, which only
+holds plain values: loading it never runs code, unlike unpickling.
+"""
+
+import os
+import sys
+import json
+import marshal
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+CACHE_FILENAME = '.component_cache.marshal'
+CACHE_VERSION = 2
+
+
+def resolve_component_path(file_path: str, index_dir: str) -> str:
+    """Resolve a component path relative to the directory containing the index."""
+    if not os.path.isabs(file_path):
+        file_path = os.path.join(index_dir, file_path)
+    return file_path
+
+
+class ComponentCache:
+    """On-disk cache of parsed component documents.
+
+    Entries are keyed by absolute file path and fingerprinted by mtime, size
+    and SHA-256 of the file contents. A file whose mtime and size are unchanged
+    is served without being read; a file whose mtime changed but whose content
+    hash matches is served without being parsed.
+    """
+
+    def __init__(self, cache_path: str, rebuild: bool = False):
+        self.cache_path = cache_path
+        self.entries = {} if rebuild else self._read()
+        self.stats = {'hit': 0, 'revalidated': 0, 'parsed': 0, 'pruned': 0}
+        self._dirty = rebuild
+
+    @classmethod
+    def for_index(cls, index_path: str, rebuild: bool = False) -> 'ComponentCache':
+        """Create the cache stored next to the given index.json."""
+        return cls(os.path.join(os.path.dirname(os.path.abspath(index_path)), CACHE_FILENAME), rebuild=rebuild)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.cache_path, 'rb') as f:
+                payload = marshal.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable component cache {self.cache_path}: {e}", file=sys.stderr)
+            return {}
+        if not isinstance(payload, dict) or payload.get('version') != CACHE_VERSION:
+            return {}
+        return payload.get('entries', {})
+
+    def get(self, file_path: str) -> Optional[dict]:
+        return self.entries.get(os.path.abspath(file_path))
+
+    def store(self, file_path: str, mtime_ns: int, size: int, sha256: str, data):
+        self.entries[os.path.abspath(file_path)] = {
+            'mtime_ns': mtime_ns, 'size': size, 'sha256': sha256, 'data': data
+        }
+        self._dirty = True
+
+    def prune(self, seen_paths):
+        """Drop entries for files that were not loaded and no longer exist."""
+        seen = {os.path.abspath(p) for p in seen_paths}
+        for path in [p for p in self.entries if p not in seen and not os.path.exists(p)]:
+            del self.entries[path]
+            self.stats['pruned'] += 1
+            self._dirty = True
+
+    def save(self):
+        """Atomically write the cache if anything changed."""
+        if not self._dirty:
+            return
+        tmp_path = f"{self.cache_path}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_path, 'wb') as f:
+                marshal.dump({'version': CACHE_VERSION, 'entries': self.entries}, f)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Warning: Could not write component cache {self.cache_path}: {e}", file=sys.stderr)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"Component cache: {s['hit']} hits, {s['revalidated']} revalidated, "
+                f"{s['parsed']} parsed, {s['pruned']} pruned ({self.cache_path})")
+
+
+def _parse_bytes(raw: bytes):
+    """Parse a component document, returning None if it is not valid JSON."""
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def _fetch(file_path: str, entry: Optional[dict], parse: bool, fingerprint: bool):
+    """Read one component, consulting its cache entry if there is one.
+
+    Returns a (status, payload, fingerprint) tuple where status is 'missing',
+    'hit', 'revalidated', 'parsed' or 'raw' (read but left for the caller to parse).
+    """
+    try:
+        st = os.stat(file_path)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return 'hit', entry['data'], None
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return 'missing', None, None
+
+    if not fingerprint:
+        return ('parsed', _parse_bytes(raw), None) if parse else ('raw', raw, None)
+    sha256 = hashlib.sha256(raw).hexdigest()
+    key = (st.st_mtime_ns, st.st_size, sha256)
+    if entry and entry['sha256'] == sha256:
+        return 'revalidated', entry['data'], key
+    if parse:
+        return 'parsed', _parse_bytes(raw), key
+    return 'raw', raw, key
+
+
+def load_components(index: Union[Dict[str, str], Iterable[Tuple[str, str]]], index_dir: str,
+                    workers: int = DEFAULT_WORKERS, parse_processes: int = 0,
+                    cache: Optional[ComponentCache] = None) -> Dict[str, dict]:
+    """Load every component listed in the index.
+
+    Args:
+        index: Dictionary mapping service_id to file paths, or an iterable of
+            (service_id, path) pairs; reads are submitted as pairs arrive, so
+            loading overlaps with a streaming index reader
+        index_dir: Directory containing the index.json file, used for resolving relative paths
+        workers: Number of threads used to read files (1 reads sequentially)
+        parse_processes: If > 0, parse JSON in a process pool of this size
+        cache: Optional ComponentCache; only files whose fingerprint changed are parsed
+
+    Returns a mapping of service_id to parsed data in index order. Missing or
+    invalid files are reported with a warning and skipped.
+    """
+    pairs = index.items() if isinstance(index, dict) else index
+    use_cache = cache is not None
+    parse_in_threads = parse_processes <= 0
+
+    def fetch(path, entry):
+        return _fetch(path, entry, parse_in_threads, use_cache)
+
+    service_ids, paths, results = [], [], []
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for service_id, file_path in pairs:
+            file_path = resolve_component_path(file_path, index_dir)
+            entry = cache.get(file_path) if use_cache else None
+            service_ids.append(service_id)
+            paths.append(file_path)
+            results.append(pool.submit(fetch, file_path, entry) if pool else fetch(file_path, entry))
+        if pool:
+            results = [future.result() for future in results]
+    finally:
+        if pool:
+            pool.shutdown()
+
+    pending = [i for i, (status, _, _) in enumerate(results) if status == 'raw']
+    if pending:
+        raws = [results[i][1] for i in pending]
+        if len(raws) > 1:
+            chunksize = max(1, len(raws) // (parse_processes * 4))
+            with ProcessPoolExecutor(max_workers=parse_processes) as pool:
+                parsed = list(pool.map(_parse_bytes, raws, chunksize=chunksize))
+        else:
+            parsed = [_parse_bytes(raws[0])]
+        for i, data in zip(pending, parsed):
+            results[i] = ('parsed', data, results[i][2])
+
+    components = {}
+    for service_id, file_path, (status, data, fingerprint) in zip(service_ids, paths, results):
+        if status == 'missing':
+            print(f"Warning: Could not find file {file_path} for service {service_id}", file=sys.stderr)
+            continue
+        if data is None:
+            print(f"Warning: Invalid JSON in {file_path} for service {service_id}", file=sys.stderr)
+            continue
+        if use_cache:
+            cache.stats[status] += 1
+            if fingerprint is not None:
+                cache.store(file_path, *fingerprint, data)
+        components[service_id] = data
+
+    if use_cache:
+        cache.prune(paths)
+        cache.save()
+    return components
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Component documents and the system-graph nodes built from them.
+
+Classification, dependency-name resolution and node attributes shared by
+system_of_systems_graph.py, which builds and draws the graph, and by the
+analysis modules (compact_graph.py, graph_watch.py, parallel_issues.py,
+call_graph.py). It has no plotting or CLI dependencies, so the analysis
+core can import it directly.
+"""
+
+import os
+import sys
+from typing import Dict, Iterator, List, Mapping, Tuple
+
+import networkx as nx
+
+from component_bundle import open_bundle
+from component_loader import load_components
+
+
+def classify_node(service_id: str, data: dict) -> Tuple[str, str]:
+    """Return (level, display_name) based on UAF hierarchical classification and service data."""
+    
+    # Use UAF hierarchical_tier if available
+    tier = data.get('hierarchical_tier')
+    if tier == 'tier_0_system_of_systems':
+        level = 'system_of_systems'
+    elif tier == 'tier_1_systems':
+        level = 'system'
+    elif tier == 'tier_2_components':
+        level = 'package'  # Map to existing 'package' level for compatibility
+    elif tier == 'tier_3_internal_modules':
+        level = 'module'  # New level for internal modules
+    else:
+        # Fallback heuristics for non-UAF formatted data
+        if service_id.endswith('_service') and 'package_name' not in data:
+            level = 'service'
+        elif 'package_name' in data:
+            level = 'package'
+        else:
+            level = 'package'  # Default to package level
+    
+    # Get display name, preferring service_name
+    display_name = (
+        data.get('service_name') or 
+        data.get('package_name') or 
+        service_id.replace('_', '-')  # Convert underscores to hyphens for display
+    )
+    
+    return (level, display_name)
+
+
+def normalize_service_name(name: str) -> str:
+    """Normalize a service or package name for dependency matching."""
+    return name.lower().replace(' ', '_')
+
+
+def get_dependencies(data: dict) -> list:
+    """Return the component-level dependency list of a service document."""
+    if 'dependencies' in data:
+        return data['dependencies']
+    elif 'srd' in data and 'dependencies' in data['srd']:
+        return data['srd']['dependencies']
+    return []
+
+
+def get_interfaces(data: dict) -> list:
+    """Return the interface list of a service document (from its ICD if present)."""
+    icd = data.get('icd', data)
+    return icd.get('interfaces', [])
+
+
+def iter_component_references(data: dict) -> Iterator[Tuple[str, str]]:
+    """Yield (dependency name, edge type) for every service a component refers to.
+    
+    Component dependencies come first ('dependency'), then interface
+    dependencies ('interface'), so an interface edge overrides the type of a
+    dependency edge between the same pair, as it always has.
+    """
+    for dep in get_dependencies(data):
+        yield dep, 'dependency'
+    for iface in get_interfaces(data):
+        if isinstance(iface, dict):
+            for dep in iface.get('dependencies', []):
+                yield dep, 'interface'
+
+
+class ServiceNameIndex:
+    """Hash index from normalized names to service_id, built once per graph.
+
+    Each service is reachable by its service_id and by its normalized
+    service_name and package_name. When several services share a key, an exact
+    service_id match wins, otherwise the first service in index order; every
+    such collision is recorded in ``ambiguous``.
+    """
+
+    def __init__(self, service_info: Dict[str, dict]):
+        self._candidates: Dict[str, List[str]] = {}
+        for service_id, info in service_info.items():
+            self.add(service_id, info)
+
+    @staticmethod
+    def keys_for(service_id: str, info: dict) -> List[str]:
+        keys = [service_id]
+        for field in ('service_name', 'package_name'):
+            value = info.get(field)
+            if isinstance(value, str) and value:
+                keys.append(normalize_service_name(value))
+        return list(dict.fromkeys(keys))
+
+    def add(self, service_id: str, info: dict, order: Mapping[str, int] = None):
+        """Index one service; order (service_id -> index position) places a service
+        added after the initial build where index order would have put it."""
+        for key in self.keys_for(service_id, info):
+            candidates = self._candidates.setdefault(key, [])
+            if key == service_id:
+                candidates.insert(0, service_id)
+            else:
+                candidates.append(service_id)
+            if order is not None:
+                candidates.sort(key=lambda sid: (sid != key, order.get(sid, len(order))))
+
+    def remove(self, service_id: str, info: dict):
+        for key in self.keys_for(service_id, info):
+            candidates = self._candidates.get(key, [])
+            if service_id in candidates:
+                candidates.remove(service_id)
+                if not candidates:
+                    del self._candidates[key]
+
+    def resolve(self, name: str):
+        """Return the service_id a dependency name refers to, or None."""
+        candidates = self._candidates.get(normalize_service_name(name))
+        return candidates[0] if candidates else None
+
+    @property
+    def ambiguous(self) -> Dict[str, List[str]]:
+        return {key: candidates for key, candidates in self._candidates.items()
+                if len(candidates) > 1}
+
+
+# Interface fields kept on lean nodes; everything else stays in the source document
+LEAN_INTERFACE_FIELDS = ('name', 'interface_type', 'communication_pattern', 'auth_required', 'timeout', 'rate_limit')
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def has_auth_interface(interfaces) -> bool:
+    """True if any interface requires authentication or is named like an auth interface."""
+    for interface in interfaces:
+        if isinstance(interface, dict):
+            if interface.get('auth_required', False) or 'auth' in interface.get('name', '').lower():
+                return True
+    return False
+
+
+def lean_node_attributes(data: dict) -> dict:
+    """Return the node attributes analysis and rendering need, without the full document.
+    
+    Keeps implementation_status, parent_system, an auth flag and a short summary of
+    each interface. Repeated strings (statuses, interface types, patterns) are interned
+    so thousands of nodes share one copy.
+    """
+    attrs = {'has_auth': has_auth_interface(data.get('interfaces', []))}
+    for field in ('implementation_status', 'parent_system'):
+        if isinstance(data.get(field), str):
+            attrs[field] = sys.intern(data[field])
+    attrs['interfaces'] = [
+        {field: _intern(iface[field]) for field in LEAN_INTERFACE_FIELDS if field in iface}
+        for iface in get_interfaces(data) if isinstance(iface, dict)
+    ]
+    return attrs
+
+
+def make_node_attributes(data: dict, level: str, display: str, lean: bool = False, source: str = None) -> dict:
+    """Node attributes for a classified component: the full document, or lean attributes plus its source."""
+    if not lean:
+        return {'label': display, 'level': level, 'raw': data}
+    attrs = {'label': sys.intern(display), 'level': level, **lean_node_attributes(data)}
+    if source is not None:
+        attrs['source'] = source
+    return attrs
+
+
+def node_has_auth(G: nx.DiGraph, node) -> bool:
+    """Auth flag of a node, from its lean attributes or its raw document."""
+    attrs = G.nodes[node]
+    if 'has_auth' in attrs:
+        return attrs['has_auth']
+    return has_auth_interface(attrs.get('raw', {}).get('interfaces', []))
+
+
+def node_implementation_status(G: nx.DiGraph, node) -> str:
+    """implementation_status of a node, defaulting to 'existing'."""
+    attrs = G.nodes[node]
+    if 'implementation_status' in attrs:
+        return attrs['implementation_status']
+    return attrs.get('raw', {}).get('implementation_status', 'existing')
+
+
+def node_parent_system(G: nx.DiGraph, node) -> str:
+    """parent_system of a node, or None if it does not declare one."""
+    attrs = G.nodes[node]
+    if 'parent_system' in attrs:
+        return attrs['parent_system']
+    return attrs.get('raw', {}).get('parent_system')
+
+
+def load_node_document(G: nx.DiGraph, node) -> dict:
+    """Return the full document of a node, reading it from disk (or its bundle) for lean nodes."""
+    attrs = G.nodes[node]
+    if 'raw' in attrs:
+        return attrs['raw']
+    if 'bundle' in G.graph:
+        return open_bundle(G.graph['bundle'])[node]
+    source = attrs.get('source')
+    if source is None:
+        return {}
+    return load_components({node: source}, os.path.dirname(source), workers=1).get(node, {})
@@ -16,14 +16,21 @@ Output:
 import json
 import os
 import sys
+import argparse
 from pathlib import Path
 from typing import Dict, List, Any, Set
 from datetime import datetime
 
+from component_loader import ComponentCache, load_components
+from component_bundle import ComponentBundle
+
 class InterfaceContractGenerator:
-    def __init__(self, system_path: str):
+    def __init__(self, system_path: str, use_cache: bool = True, rebuild_cache: bool = False,
+                 bundle_path: str = None):
         self.system_path = Path(system_path)
         self.index_file = self.system_path / "index.json"
+        self.bundle_path = bundle_path
+        self.cache = ComponentCache.for_index(str(self.index_file), rebuild=rebuild_cache) if use_cache and not bundle_path else None
         self.interfaces_dir = self.system_path / "interfaces"
         self.template_path = Path(__file__).parent.parent / "templates" / "interface_contract_template.json"
         
@@ -39,7 +46,13 @@ class InterfaceContractGenerator:
         self.interfaces_map = {}  # interface_id -> contract
         
     def load_components(self):
-        """Load all component specifications from index"""
+        """Load all component specifications from index (or from a packed bundle)"""
+        if self.bundle_path:
+            with ComponentBundle(self.bundle_path) as bundle:
+                self.components = dict(bundle.items())
+            print(f"Loaded {len(self.components)} components from bundle {self.bundle_path}")
+            return
+            
         if not self.index_file.exists():
             print(f"Error: Index file not found at {self.index_file}")
             sys.exit(1)
@@ -47,22 +60,11 @@ class InterfaceContractGenerator:
         with open(self.index_file, 'r') as f:
             index = json.load(f)
             
-        for component_id, component_path in index.get('components', {}).items():
-            if not os.path.isabs(component_path):
-                component_path = self.system_path / component_path
-            else:
-                component_path = Path(component_path)
-                
-            if component_path.exists():
-                try:
-                    with open(component_path, 'r') as f:
-                        self.components[component_id] = json.load(f)
-                except json.JSONDecodeError as e:
-                    print(f"Warning: Could not parse {component_path}: {e}")
-            else:
-                print(f"Warning: Component file not found: {component_path}")
+        self.components = load_components(index.get('components', {}), str(self.system_path), cache=self.cache)
                 
         print(f"Loaded {len(self.components)} components")
+        if self.cache is not None:
+            print(self.cache.summary())
         
     def extract_interfaces(self):
         """Extract all interfaces from component specifications"""
@@ -396,18 +398,22 @@ class InterfaceContractGenerator:
         print(f"Summary saved to: {summary_path}")
         
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python3 generate_interface_contracts.py /path/to/systems/<system_name>/")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Generate interface contract documents for a system")
+    parser.add_argument('system_path', help='Path to the system directory (/path/to/systems/<system_name>/)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the parsed-component cache')
+    parser.add_argument('--rebuild-cache', action='store_true', help='Discard and rebuild the parsed-component cache')
+    parser.add_argument('--bundle', help='Read components from a packed bundle (component_bundle.py pack) instead of the files')
+    args = parser.parse_args()
         
-    system_path = sys.argv[1]
+    system_path = args.system_path
     
     print("=" * 80)
     print("Interface Contract Generator")
     print("=" * 80)
     print(f"System path: {system_path}\n")
     
-    generator = InterfaceContractGenerator(system_path)
+    generator = InterfaceContractGenerator(system_path, use_cache=not args.no_cache, rebuild_cache=args.rebuild_cache,
+                                           bundle_path=args.bundle)
     generator.load_components()
     generator.generate_all_contracts()
     generator.generate_summary()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Node styles and batched drawing for visualize_graph.
+
+Node sizes and colors are looked up in tables indexed by level and
+implementation status, for all nodes at once. A graph of up to
+DETAILED_MAX_NODES nodes is drawn in full detail: an arrow for every edge
+and a boxed label on every node. A larger graph is drawn in batches:
+
+- the edges of each style form one LineCollection, without arrowheads
+- markers shrink as the node count grows
+- only the best-connected nodes are labelled, at most max_labels of them
+
+In both modes, nodes with fewer than label_min_degree edges get no label.
+A draft render is saved at DRAFT_DPI instead of FULL_DPI.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import networkx as nx
+from matplotlib.collections import LineCollection
+
+FULL_DPI = 300
+DRAFT_DPI = 100
+
+# Above this many nodes edges are batched, markers shrink and labels are limited
+DETAILED_MAX_NODES = 500
+DEFAULT_MAX_LABELS = 200
+
+LEVELS = ('system_of_systems', 'system', 'service', 'package', 'module')
+STATUSES = ('existing', 'recommended', 'hypothetical')
+
+# One column per level in LEVELS, then one for any other level
+LEVEL_SIZES = np.array([3000, 2500, 2000, 1500, 1200, 1500])
+# One row per status in STATUSES, after the row of base colors used for any other status
+COLOR_TABLE = np.array([
+    ['#003049', '#219ebc', '#ffb703', '#8ecae6', '#fb8500', '#adb5bd'],  # base: blue/orange by level, gray
+    ['#2d6a4f', '#40916c', '#52b788', '#74c69d', '#95d5b2', '#52b788'],  # existing: green
+    ['#f3722c', '#f8961e', '#f9844a', '#f9c74f', '#90e0ef', '#f9c74f'],  # recommended: amber
+    ['#6a040f', '#9d0208', '#d00000', '#dc2f02', '#e85d04', '#f94144'],  # hypothetical: red
+])
+
+# Edge type (None for any other type) and its drawing style, in drawing order
+EDGE_STYLES = (
+    ('dependency', {'edge_color': 'darkred', 'arrowsize': 25, 'width': 3, 'alpha': 0.8, 'style': 'solid'}),
+    ('interface', {'edge_color': 'darkblue', 'arrowsize': 20, 'width': 2, 'alpha': 0.7, 'style': 'dashed'}),
+    (None, {'edge_color': 'gray', 'arrowsize': 15, 'width': 1.5, 'alpha': 0.6, 'style': 'solid'}),
+)
+BATCHED_EDGE_WIDTH = 0.25
+
+_LEVEL_INDEX = {level: i for i, level in enumerate(LEVELS)}
+_STATUS_INDEX = {status: i + 1 for i, status in enumerate(STATUSES)}
+
+
+def is_detailed(G: nx.Graph) -> bool:
+    """Whether G is small enough to be drawn in full detail."""
+    return G.number_of_nodes() <= DETAILED_MAX_NODES
+
+
+def node_styles(levels: Sequence[str], statuses: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    """Marker sizes and colors for nodes with the given levels and implementation statuses."""
+    level_code = np.fromiter((_LEVEL_INDEX.get(level, len(LEVELS)) for level in levels),
+                             dtype=np.intp, count=len(levels))
+    status_code = np.fromiter((_STATUS_INDEX.get(status, 0) for status in statuses),
+                              dtype=np.intp, count=len(statuses))
+    return LEVEL_SIZES[level_code], COLOR_TABLE[status_code, level_code].tolist()
+
+
+def edge_groups(G: nx.DiGraph) -> Dict[str, list]:
+    """Edges of G by the type of their style in EDGE_STYLES, in one pass."""
+    styled = {edge_type for edge_type, _ in EDGE_STYLES}
+    groups = {edge_type: [] for edge_type, _ in EDGE_STYLES}
+    for u, v, edge_type in G.edges(data='type'):
+        groups[edge_type if edge_type in styled else None].append((u, v))
+    return groups
+
+
+def draw_edges(ax, G: nx.DiGraph, pos: Dict, detailed: bool):
+    """Draw the edges of G, as arrows when detailed, else one line collection per style."""
+    groups = edge_groups(G)
+    for edge_type, style in EDGE_STYLES:
+        edges = groups[edge_type]
+        if not edges:
+            continue
+        if detailed:
+            nx.draw_networkx_edges(G, pos, edgelist=edges, arrowstyle='->', ax=ax, **style)
+            continue
+        segments = np.array([(pos[u], pos[v]) for u, v in edges], dtype=float)
+        ax.add_collection(LineCollection(segments, colors=style['edge_color'], alpha=style['alpha'],
+                                         linewidths=style['width'] * BATCHED_EDGE_WIDTH,
+                                         linestyles=style['style'], zorder=0))
+    ax.autoscale_view()
+
+
+def label_nodes(G: nx.Graph, max_labels: int = None, min_degree: int = 0) -> List:
+    """Nodes to label: every node with at least min_degree edges, or the max_labels best-connected of them."""
+    nodes = list(G)
+    degrees = np.fromiter((degree for _, degree in G.degree(nodes)), dtype=np.int64, count=len(nodes))
+    chosen = np.flatnonzero(degrees >= min_degree)
+    if max_labels is not None and len(chosen) > max_labels:
+        chosen = chosen[np.argsort(-degrees[chosen], kind='stable')[:max_labels]]
+        chosen.sort()
+    return [nodes[i] for i in chosen.tolist()]
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Watch mode for system_of_systems_graph.py.
+
+Keeps the system graph in memory and, when a component file, index.json or
+one of its sub-indexes changes, reloads only the affected components and recomputes only their
+outgoing edges and the edges of services whose dependency names may now
+resolve differently. Changes are detected by polling file fingerprints
+(mtime and size) with a debounce, so it works on any filesystem.
+"""
+
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Set, Tuple
+
+import networkx as nx
+
+from component_loader import DEFAULT_WORKERS, ComponentCache, load_components, resolve_component_path
+from component_model import (
+    ServiceNameIndex, classify_node, iter_component_references, make_node_attributes, normalize_service_name
+)
+from reachability import ReachabilityIndex
+from system_of_systems_graph import load_service_architecture_index
+
+
+class IncrementalSystemGraph:
+    """A system graph that can be patched one component at a time.
+
+    The graph holds the nodes at include_levels, exactly as build_system_graph
+    would build them; per-service reference lists and a reverse index from
+    dependency name to referring services make each update proportional to the
+    size of the change rather than the size of the system.
+    """
+
+    def __init__(self, index_path: str, include_levels: List[str], lean: bool = False,
+                 workers: int = DEFAULT_WORKERS, cache: ComponentCache = None):
+        self.index_path = os.path.abspath(index_path)
+        self.index_dir = os.path.dirname(self.index_path)
+        self.include_levels = include_levels
+        self.lean = lean
+        self.G = nx.DiGraph()
+        self.references: Dict[str, List[Tuple[str, str]]] = {}  # service_id -> (dependency name, edge type)
+        self.referrers: Dict[str, Set[str]] = {}  # normalized dependency name -> service_ids using it
+        self._reachability: ReachabilityIndex = None
+        self.touched: Set[str] = set()  # nodes changed since take_touched(), for incremental issue detection
+        self._reorder = False  # nodes may be out of index order (a node was added or the index changed)
+        self.shard_paths: Set[str] = set()  # sub-index files the index was read from
+
+        self.paths = self._read_index()
+        self.order = {sid: i for i, sid in enumerate(self.paths)}
+        self.service_info = load_components(self.paths, self.index_dir, workers=workers, cache=cache)
+        self.names = ServiceNameIndex(self.service_info)
+        for service_id, data in self.service_info.items():
+            self._add_node(service_id, data)
+        for service_id in list(self.G):
+            self._connect(service_id)
+        self.refresh_name_resolution()
+
+    def _read_index(self) -> Dict[str, str]:
+        self.shard_paths = set()
+        index = load_service_architecture_index(self.index_path, self.include_levels, shard_paths=self.shard_paths)
+        return {sid: os.path.abspath(resolve_component_path(path, self.index_dir)) for sid, path in index.items()}
+
+    def _node_attributes(self, service_id: str, data: dict):
+        """Node attributes of a component, or None if its level is not included."""
+        level, display = classify_node(service_id, data)
+        if level not in self.include_levels:
+            return None
+        return make_node_attributes(data, level, display, self.lean, self.paths.get(service_id))
+
+    def _add_node(self, service_id: str, data: dict):
+        attrs = self._node_attributes(service_id, data)
+        if attrs is not None:
+            self.G.add_node(service_id, **attrs)
+
+    def _forget_references(self, service_id: str):
+        for dep, _ in self.references.pop(service_id, []):
+            key = normalize_service_name(dep)
+            referrers = self.referrers.get(key)
+            if referrers is not None:
+                referrers.discard(service_id)
+                if not referrers:
+                    del self.referrers[key]
+
+    def _connect(self, service_id: str):
+        """Recompute the outgoing edges of one service."""
+        self._forget_references(service_id)
+        if service_id not in self.G:
+            return
+        self.touched.add(service_id)
+        self.touched.update(self.G.successors(service_id))
+        self.G.remove_edges_from(list(self.G.out_edges(service_id)))
+        refs = list(iter_component_references(self.service_info[service_id]))
+        self.references[service_id] = refs
+        for dep, edge_type in refs:
+            self.referrers.setdefault(normalize_service_name(dep), set()).add(service_id)
+            dep_id = self.names.resolve(dep)
+            if dep_id is not None and dep_id in self.G:
+                self.G.add_edge(service_id, dep_id, type=edge_type)
+                self.touched.add(dep_id)
+
+    def _replace(self, service_id: str, new_data):
+        """Swap the document of one service (None removes it) and patch the affected edges."""
+        affected_keys = set()
+        old_data = self.service_info.pop(service_id, None)
+        if old_data is not None:
+            affected_keys.update(ServiceNameIndex.keys_for(service_id, old_data))
+            self.names.remove(service_id, old_data)
+        attrs = None if new_data is None else self._node_attributes(service_id, new_data)
+        self.touched.add(service_id)
+        if service_id in self.G:
+            self.touched.update(self.G.successors(service_id))
+            self.touched.update(self.G.predecessors(service_id))
+            if attrs is None:
+                self.G.remove_node(service_id)
+        self._forget_references(service_id)
+
+        if new_data is not None:
+            self.service_info[service_id] = new_data
+            self.names.add(service_id, new_data, order=self.order)
+            affected_keys.update(ServiceNameIndex.keys_for(service_id, new_data))
+            if attrs is not None and service_id in self.G:
+                # Edited in place, so the node keeps its position in the node and edge order
+                node = self.G.nodes[service_id]
+                node.clear()
+                node.update(attrs)
+            elif attrs is not None:
+                self.G.add_node(service_id, **attrs)
+                self._reorder = True
+            self._connect(service_id)
+
+        # Services that refer to any name of this one may now resolve to a different node
+        for key in affected_keys:
+            for referrer in list(self.referrers.get(key, ())):
+                if referrer != service_id:
+                    self._connect(referrer)
+
+    def reload_component(self, service_id: str) -> bool:
+        """Reload one component from disk; returns True if the graph may have changed."""
+        path = self.paths.get(service_id)
+        if path is None or not os.path.exists(path):
+            if service_id not in self.service_info:
+                return False
+            self._replace(service_id, None)
+            return True
+        data = load_components({service_id: path}, self.index_dir, workers=1).get(service_id)
+        if data is None:
+            # Usually a file caught mid-save; keep the last good version until it parses again
+            print(f"Warning: keeping previous version of {service_id}", file=sys.stderr)
+            return False
+        self._replace(service_id, data)
+        return True
+
+    def reload_index(self) -> Set[str]:
+        """Re-read index.json and its sub-indexes and apply added, removed and moved components."""
+        old_paths = self.paths
+        self.paths = self._read_index()
+        self.order = {sid: i for i, sid in enumerate(self.paths)}
+        self._reorder = True
+        changed = {sid for sid in set(old_paths) | set(self.paths) if old_paths.get(sid) != self.paths.get(sid)}
+        for service_id in sorted(changed):
+            self.reload_component(service_id)
+        return changed
+
+    def apply_changes(self, changed_paths: Set[str]) -> Set[str]:
+        """Apply a batch of changed files; returns the service_ids that were reloaded."""
+        updated = set()
+        if self.index_path in changed_paths or changed_paths & self.shard_paths:
+            updated |= self.reload_index()
+        by_path = {}
+        for service_id, path in self.paths.items():
+            by_path.setdefault(path, []).append(service_id)
+        for path in changed_paths:
+            for service_id in by_path.get(path, []):
+                if service_id not in updated and self.reload_component(service_id):
+                    updated.add(service_id)
+        if self._reorder:
+            self._restore_order()
+        if updated:
+            self.refresh_name_resolution()
+            if self._reachability is not None:
+                self._reachability.invalidate()
+        return updated
+
+    def _restore_order(self):
+        """Put nodes, and so edges, back in index order as build_system_graph adds them.
+
+        Edits keep nodes in place; only added nodes and index changes need this.
+        """
+        self._reorder = False
+        nodes = list(self.G)
+        ordered = sorted(nodes, key=self.order.__getitem__)
+        if ordered == nodes:
+            return
+        # Cycle issues list their members in graph order, so a reorder touches everything
+        self.touched.update(ordered)
+        node_data = [(node, self.G.nodes[node]) for node in ordered]
+        edges = [(u, v, data) for u in ordered for v, data in self.G.succ[u].items()]
+        graph = dict(self.G.graph)
+        self.G.clear()
+        self.G.graph.update(graph)
+        self.G.add_nodes_from(node_data)
+        self.G.add_edges_from(edges)
+
+    def take_touched(self) -> Set[str]:
+        """Nodes added, removed, re-attributed or with changed edges since the last call."""
+        touched, self.touched = self.touched, set()
+        return touched
+
+    def reachability(self) -> ReachabilityIndex:
+        """Reachability index over the current graph, rebuilt lazily after a change."""
+        if self._reachability is None:
+            self._reachability = ReachabilityIndex(self.G)
+        return self._reachability
+
+    def refresh_name_resolution(self):
+        """Recompute G.graph['name_resolution'] as build_system_graph records it."""
+        unresolved = {}
+        for service_id, refs in self.references.items():
+            for dep, _ in refs:
+                if self.names.resolve(dep) is None:
+                    unresolved.setdefault(dep, []).append(service_id)
+        self.G.graph['name_resolution'] = {
+            'ambiguous': {key: list(candidates) for key, candidates in self.names.ambiguous.items()},
+            'unresolved': {dep: sorted(set(referrers)) for dep, referrers in unresolved.items()}
+        }
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Fingerprint (mtime_ns, size) of index.json, its sub-indexes and every component file."""
+        fingerprints = {}
+        for path in [self.index_path, *sorted(self.shard_paths), *self.paths.values()]:
+            try:
+                st = os.stat(path)
+                fingerprints[path] = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                fingerprints[path] = None
+        return fingerprints
+
+
+def watch_system(state: IncrementalSystemGraph, on_update: Callable[[IncrementalSystemGraph, Set[str], float], None],
+                 interval: float = 0.5, debounce: float = 0.3):
+    """Poll for changes until interrupted, calling on_update(state, updated_ids, seconds) after each batch.
+
+    A batch is applied once the watched files have stopped changing for
+    `debounce` seconds, so an editor's save sequence is handled as one change.
+    """
+    last = state.snapshot()
+    while True:
+        time.sleep(interval)
+        current = state.snapshot()
+        if current == last:
+            continue
+        while True:
+            time.sleep(debounce)
+            settled = state.snapshot()
+            if settled == current:
+                break
+            current = settled
+        changed = {path for path in set(last) | set(current) if last.get(path) != current.get(path)}
+        start = time.perf_counter()
+        updated = state.apply_changes(changed)
+        elapsed = time.perf_counter() - start
+        # Paths may have been added or removed by an index change
+        last = state.snapshot()
+        if updated:
+            on_update(state, updated, elapsed)
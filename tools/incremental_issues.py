@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Incremental architectural issue detection for changed components.
+
+IncrementalIssueDetector keeps the previous issue report together with a
+dependency record: every node issue relied on its node and that node's
+neighbours (degrees, edge types and auth flag are all it reads), and every
+circular dependency relied on the members of its strongly connected
+component. Given the nodes touched since the last run, only the issues
+whose record meets them are dropped, local node rules are re-run for the
+touched nodes and their neighbours, and cycle checks are recomputed only for
+the SCCs that can have changed. Everything else is carried forward as-is.
+
+Rules that need the whole graph (non-local node rules and graph rules other
+than the cycle check) are re-run in full on every update.
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+import networkx as nx
+
+from compact_graph import DEFAULT_MAX_CYCLE_LENGTH, DEFAULT_MAX_CYCLES, CompactGraph
+from issue_rules import CycleRule, GraphRule, IssueRuleEngine, IssueTables, bottleneck_threshold
+
+
+def _reach(G: nx.DiGraph, sources: Iterable, forward: bool) -> Set:
+    """sources plus every node reachable from them (forward) or reaching them (backward)."""
+    neighbours = G.successors if forward else G.predecessors
+    seen = set(sources)
+    stack = list(seen)
+    while stack:
+        for w in neighbours(stack.pop()):
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+    return seen
+
+
+def _ordered_subgraph(G: nx.DiGraph, nodes: List) -> nx.DiGraph:
+    """Copy of G induced on nodes, with nodes in the given order and each node's edges in G's order.
+
+    G.subgraph iterates a small node set in set order, not G's.
+    """
+    inside = set(nodes)
+    H = nx.DiGraph()
+    H.add_nodes_from((node, G.nodes[node]) for node in nodes)
+    H.add_edges_from((u, v, data) for u in nodes for v, data in G.succ[u].items() if v in inside)
+    return H
+
+
+class IncrementalIssueDetector:
+    """detect_architectural_issues that re-evaluates only what a change can affect.
+
+    Attributes:
+        node_issues: node -> [(rule position, category, issue)] from local node rules
+        relies_on: node -> nodes its issues were computed from (the node and its neighbours)
+        dependents: node -> nodes whose issues relied on it
+        cycle_issues: [(members, issue)] per cyclic SCC
+    """
+
+    def __init__(self, rules: List = None, max_cycle_length: int = DEFAULT_MAX_CYCLE_LENGTH,
+                 max_cycles: int = DEFAULT_MAX_CYCLES):
+        self.engine = IssueRuleEngine(rules, max_cycle_length, max_cycles)
+        node_rules = self.engine.node_rules()
+        self.local_rules = [(position, rule) for position, rule in node_rules if rule.local]
+        self.global_rules = [(position, rule) for position, rule in node_rules if not rule.local]
+        self.cycle_rule = next((rule for rule in self.engine.rules if isinstance(rule, CycleRule)), None)
+        self.other_graph_rules = [rule for rule in self.engine.rules
+                                  if isinstance(rule, GraphRule) and rule is not self.cycle_rule]
+        self.node_issues: Dict = {}
+        self.relies_on: Dict = {}
+        self.dependents: Dict[object, Set] = {}
+        self.cycle_issues: List[Tuple[frozenset, Dict]] = []
+        self.average_degree = None
+        self.evaluated = False
+
+    def detect(self, G: nx.DiGraph, changed: Iterable = None) -> Dict[str, List[Dict]]:
+        """Issue report for G.
+
+        changed lists what was touched since the last call: nodes added or
+        removed, both endpoints of every edge added or removed, and nodes whose
+        attributes changed (a removed node's former neighbours are endpoints of
+        removed edges). None, or the first call, evaluates the whole graph.
+        """
+        full_tables = None
+        if changed is None or not self.evaluated:
+            full_tables = IssueTables(CompactGraph.from_networkx(G))
+            self._reset()
+            self._record_node_issues(full_tables, self.engine.node_issues(full_tables, self.local_rules))
+            if self.cycle_rule is not None:
+                self.cycle_issues = [(frozenset(issue['nodes']), issue) for issue in self.cycle_rule.evaluate(full_tables)]
+            self.average_degree = full_tables.average_degree
+            self.evaluated = True
+        else:
+            changed = set(changed)
+            self._update_node_issues(G, changed)
+            self._update_cycle_issues(G, changed)
+
+        # Whole-graph rules are re-run every time
+        other_graph_issues = {}
+        global_node_issues = []
+        if self.global_rules or self.other_graph_rules:
+            if full_tables is None:
+                full_tables = IssueTables(CompactGraph.from_networkx(G))
+            for rule in self.other_graph_rules:
+                other_graph_issues[id(rule)] = list(rule.evaluate(full_tables))
+            global_node_issues = [(full_tables.nodes[i], position, category, issue) for i, position, category, issue
+                                  in self.engine.node_issues(full_tables, self.global_rules)]
+        return self._report(G, other_graph_issues, global_node_issues)
+
+    # --- Node rules ---
+
+    def _reset(self):
+        self.node_issues = {}
+        self.relies_on = {}
+        self.dependents = {}
+        self.cycle_issues = []
+
+    def _forget(self, node):
+        self.node_issues.pop(node, None)
+        for other in self.relies_on.pop(node, ()):
+            owners = self.dependents.get(other)
+            if owners is not None:
+                owners.discard(node)
+                if not owners:
+                    del self.dependents[other]
+
+    def _record_node_issues(self, tables: IssueTables, found: List[Tuple[int, int, str, Dict]]):
+        compact = tables.compact
+        for i, position, category, issue in found:
+            node = compact.nodes[i]
+            if node not in self.node_issues:
+                self.node_issues[node] = []
+                relied = {node}
+                relied.update(compact.nodes[j] for j in compact.successors(i).tolist())
+                relied.update(compact.nodes[j] for j in compact.predecessors(i).tolist())
+                self.relies_on[node] = relied
+                for other in relied:
+                    self.dependents.setdefault(other, set()).add(node)
+            self.node_issues[node].append((position, category, issue))
+
+    def _update_node_issues(self, G: nx.DiGraph, changed: Set):
+        # Nodes whose rule inputs can differ: the changed ones, those whose issues relied on them
+        # and their current neighbours (which may not have had an issue before)
+        affected = set(changed)
+        for node in changed:
+            affected.update(self.dependents.get(node, ()))
+            if node in G:
+                affected.update(G.successors(node))
+                affected.update(G.predecessors(node))
+
+        # A shift of the average degree moves the bottleneck threshold for every node
+        average_degree = 2 * G.number_of_edges() / G.number_of_nodes() if G.number_of_nodes() else 0.0
+        old, new = bottleneck_threshold(self.average_degree), bottleneck_threshold(average_degree)
+        if old != new:
+            low, high = min(old, new), max(old, new)
+            affected.update(node for node, degree in G.degree() if low < degree <= high)
+        self.average_degree = average_degree
+
+        for node in affected:
+            self._forget(node)
+        present = [node for node in affected if node in G]
+        if not present:
+            return
+        halo = set(present)
+        for node in present:
+            halo.update(G.successors(node))
+            halo.update(G.predecessors(node))
+        compact = CompactGraph.from_networkx(G.subgraph(halo))
+        tables = IssueTables(compact, average_degree=average_degree)
+        owned = np.zeros(len(compact.nodes), dtype=bool)
+        owned[[compact.index[node] for node in present]] = True
+        self._record_node_issues(tables, self.engine.node_issues(tables, self.local_rules, nodes=owned))
+
+    # --- Cycles ---
+
+    def _update_cycle_issues(self, G: nx.DiGraph, changed: Set):
+        if self.cycle_rule is None:
+            return
+        # Nodes whose SCC may differ: the changed ones and the members of every SCC they were in
+        region = set(changed)
+        kept = []
+        for members, issue in self.cycle_issues:
+            if members & changed:
+                region |= members
+            else:
+                kept.append((members, issue))
+        region = {node for node in region if node in G}
+
+        # Any SCC through the region lies within what the region both reaches and is reached from.
+        # The scope keeps G's node and edge order and ranks members by their degree in G, so its
+        # issues match a full run.
+        scope = _reach(G, region, forward=True) & _reach(G, region, forward=False)
+        position = {node: i for i, node in enumerate(G)}
+        compact = CompactGraph.from_networkx(_ordered_subgraph(G, sorted(scope, key=position.__getitem__)))
+        degree = np.fromiter((G.degree(node) for node in compact.nodes), dtype=np.int64, count=len(compact.nodes))
+        fresh = []
+        for members in compact.cyclic_components():
+            nodes = frozenset(compact.nodes[i] for i in members.tolist())
+            if nodes & region:
+                fresh.append((nodes, members))
+
+        # An SCC that grew by merging swallows previous SCCs outside the region
+        merged = frozenset().union(*(nodes for nodes, _ in fresh))
+        self.cycle_issues = [(members, issue) for members, issue in kept if not members & merged]
+        self.cycle_issues.extend((nodes, self.cycle_rule.component_issue(compact, members, degree))
+                                 for nodes, members in fresh)
+        # Ordered by first member in graph order, as cyclic_components orders a full run
+        self.cycle_issues.sort(key=lambda item: position[item[1]['nodes'][0]])
+
+    # --- Report ---
+
+    def _report(self, G: nx.DiGraph, other_graph_issues: Dict[int, List[Dict]],
+                global_node_issues: List[Tuple[object, int, str, Dict]]) -> Dict[str, List[Dict]]:
+        issues = self.engine.empty_report()
+        for rule in self.engine.rules:
+            if rule is self.cycle_rule:
+                issues[rule.category].extend(issue for _, issue in self.cycle_issues)
+            elif isinstance(rule, GraphRule):
+                issues[rule.category].extend(other_graph_issues[id(rule)])
+
+        # Node issues in graph order, then rule order, as a full run lists them
+        by_node: Dict = {}
+        for node, found in self.node_issues.items():
+            by_node[node] = list(found)
+        for node, position, category, issue in global_node_issues:
+            by_node.setdefault(node, []).append((position, category, issue))
+        for node in G.nodes():
+            for _, category, issue in sorted(by_node.get(node, ()), key=lambda item: item[0]):
+                issues[category].append(issue)
+        return issues
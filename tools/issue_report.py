@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Architectural issue reports: the JSON report and a streaming JSONL form.
+
+The JSON report (export_issues_report in system_of_systems_graph.py) holds
+every issue in one document. The JSONL form is written one issue per line as
+the rules find them, so memory stays flat however many issues there are,
+and it ends with one summary record:
+
+    {"severity": "critical", "category": "circular_dependencies", "issue": {...}}
+    ...
+    {"summary": {...}, "recommendations": {...}, "analysis_timestamp": "..."}
+
+Every issue line starts with its severity, so read_issues_report can skip
+lines of other severities without parsing them.
+
+The call-graph reports (load_simulator.py, tail_latency.py) share the
+timestamp and the latency percentile fields defined here.
+"""
+
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+ANALYSIS_TIMESTAMP = '2025-10-05T00:00:00Z'
+
+PERCENTILES = (50, 95, 99, 99.9)
+
+SEVERITIES = ('critical', 'warning', 'medium', 'info')
+
+
+def percentile_summary(values: np.ndarray) -> Dict[str, Optional[float]]:
+    """PERCENTILES of values as {'p50': ..., 'p999': ...}; None when there are no values."""
+    if len(values) == 0:
+        return {f'p{p:g}'.replace('.', ''): None for p in PERCENTILES}
+    return {f'p{p:g}'.replace('.', ''): float(q) for p, q in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def format_ms(value: Optional[float]) -> str:
+    """A percentile_summary value for console output; 'n/a' when nothing was measured."""
+    return f"{value:.1f} ms" if value is not None else 'n/a'
+
+
+def report_summary(severity_counts: Mapping[str, int]) -> Dict:
+    """The summary and recommendations sections of a report, from issue counts by severity."""
+    total_issues = sum(severity_counts.values())
+    return {
+        'summary': {
+            'total_issues': total_issues,
+            'critical_issues': severity_counts.get('critical', 0),
+            'warning_issues': severity_counts.get('warning', 0),
+            'medium_issues': severity_counts.get('medium', 0),
+            'info_issues': severity_counts.get('info', 0)
+        },
+        'recommendations': {
+            'immediate_action_required': severity_counts.get('critical', 0) > 0,
+            'review_recommended': severity_counts.get('warning', 0) + severity_counts.get('medium', 0) > 0,
+            'overall_status': 'needs_attention' if total_issues > 0 else 'healthy'
+        }
+    }
+
+
+def iter_report_items(issues: Mapping[str, List[Dict]]) -> Iterator[Tuple[str, Dict]]:
+    """(category, issue) pairs of an issues dict, as detect_architectural_issues returns it."""
+    for category, issue_list in issues.items():
+        for issue in issue_list:
+            yield category, issue
+
+
+def stream_issues_report(items: Iterable[Tuple[str, Dict]], out_path: str) -> Dict:
+    """Write (category, issue) pairs as JSONL while they are produced, then the summary record.
+
+    Returns the summary record.
+    """
+    severity_counts = {severity: 0 for severity in SEVERITIES}
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        for category, issue in items:
+            severity = issue.get('severity', 'info')
+            severity_counts[severity] = severity_counts.get(severity, 0) + 1
+            f.write(json.dumps({'severity': severity, 'category': category, 'issue': issue}, separators=(',', ':')))
+            f.write('\n')
+        summary = {**report_summary(severity_counts), 'analysis_timestamp': ANALYSIS_TIMESTAMP}
+        f.write(json.dumps(summary, separators=(',', ':')))
+        f.write('\n')
+    # Readers never see a report without its summary
+    os.replace(tmp_path, out_path)
+
+    counts = summary['summary']
+    print(f"Architectural issues report streamed to {out_path}")
+    print(f"Found {counts['total_issues']} issues: {counts['critical_issues']} critical, {counts['warning_issues']} warnings")
+    return summary
+
+
+def read_issues_report(path: str, severities: Iterable[str] = None,
+                       categories: Iterable[str] = None) -> Iterator[Tuple[str, Dict]]:
+    """Yield (category, issue) from a JSONL report, one line at a time.
+
+    severities and categories, if given, keep only matching issues; lines of
+    other severities are skipped on their prefix without being parsed.
+    """
+    prefixes = tuple(f'{{"severity":{json.dumps(severity)},'.encode() for severity in severities) \
+        if severities is not None else None
+    categories = set(categories) if categories is not None else None
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.startswith(b'{"severity":'):
+                continue  # the summary record
+            if prefixes is not None and not line.startswith(prefixes):
+                continue
+            record = json.loads(line)
+            if categories is None or record['category'] in categories:
+                yield record['category'], record['issue']
+
+
+def read_issues_summary(path: str) -> Dict:
+    """The summary record of a JSONL report, read from the end of the file."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = position = f.tell()
+        block = 4096
+        tail = b''
+        # Grow the window from the end until it holds the whole last line
+        while position > 0:
+            position = max(0, position - block)
+            f.seek(position)
+            tail = f.read(end - position)
+            if tail.rstrip(b'\n').count(b'\n') >= 1:
+                break
+    return json.loads(tail.rstrip(b'\n').rsplit(b'\n', 1)[-1])
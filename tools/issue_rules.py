@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Rule engine for architectural issue detection.
+
+The per-node facts every check needs (in/out degree, incoming and outgoing
+edge types, authentication flags) are computed once into IssueTables from the
+array-backed CompactGraph. Node rules then run together in a single pass over
+the nodes: each rule may give a vectorized candidate mask, and only nodes that
+some rule selects are visited. Graph rules (such as circular dependencies)
+look at the graph as a whole and run once. Node rules marked local only read
+their node's row and incident edges, so they can also run per partition in a
+process pool (see parallel_issues.py).
+
+Custom rules are registered on an IssueRuleEngine:
+
+    engine = IssueRuleEngine()
+    engine.register(NodeRule('fan_out', lambda t, i: {...} if t.out_degree[i] > 20 else None))
+    issues = engine.run(G)
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import networkx as nx
+
+from compact_graph import (
+    DEFAULT_BETWEENNESS_BUDGET, DEFAULT_BETWEENNESS_SAMPLES, DEFAULT_BETWEENNESS_SEED, DEFAULT_MAX_CYCLE_LENGTH,
+    DEFAULT_MAX_CYCLES, CompactGraph
+)
+
+# Issue categories of the report, in report order; rules may add more
+ISSUE_CATEGORIES = [
+    'circular_dependencies',
+    'orphaned_nodes',
+    'missing_interfaces',
+    'inconsistent_protocols',
+    'security_gaps',
+    'performance_bottlenecks'
+]
+
+
+class IssueTables:
+    """Per-node tables shared by every rule, computed once per run.
+
+    Attributes:
+        compact: the CompactGraph the tables were computed from
+        nodes: node ids; row i of every table is nodes[i]
+        in_degree, out_degree, degree: integer columns
+        average_degree: mean of degree (of the whole graph, when the tables cover one partition)
+        has_auth: bool column
+        incoming_types, outgoing_types: bool matrices [node, type code]
+        incoming_type_count, outgoing_type_count: distinct edge types per node
+        type_names: type code -> edge type
+        cache: scratch space for custom rules to share derived tables
+    """
+
+    def __init__(self, compact: CompactGraph, average_degree: float = None):
+        self.compact = compact
+        self.nodes = compact.nodes
+        self.in_degree = compact.in_degree()
+        self.out_degree = compact.out_degree()
+        self.degree = self.in_degree + self.out_degree
+        if average_degree is None:
+            average_degree = float(self.degree.mean()) if len(self.degree) else 0.0
+        self.average_degree = average_degree
+        self.has_auth = compact.has_auth
+        self.incoming_types = compact.protocol_matrix(incoming=True)
+        self.outgoing_types = compact.protocol_matrix(incoming=False)
+        self.incoming_type_count = self.incoming_types.sum(axis=1)
+        self.outgoing_type_count = self.outgoing_types.sum(axis=1)
+        self.type_names = compact.type_names
+        self.cache: Dict = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def incoming_protocols(self, i: int) -> List[str]:
+        return sorted(self.type_names[t] for t in np.flatnonzero(self.incoming_types[i]))
+
+    def outgoing_protocols(self, i: int) -> List[str]:
+        return sorted(self.type_names[t] for t in np.flatnonzero(self.outgoing_types[i]))
+
+
+class NodeRule:
+    """A check evaluated per node during the single pass.
+
+    check(tables, i) returns an issue dict for node i, or None. candidates(tables),
+    if given, returns a bool array selecting the nodes worth checking; the
+    default is every node. A rule is local if both only read row i and the
+    node's incident edges (plus tables.average_degree); local rules built from
+    module-level functions can run in worker processes.
+    """
+
+    def __init__(self, category: str, check: Callable[[IssueTables, int], Optional[Dict]],
+                 candidates: Callable[[IssueTables], np.ndarray] = None, local: bool = True):
+        self.category = category
+        self.check = check
+        self.candidates = candidates
+        self.local = local
+
+
+class GraphRule:
+    """A check over the whole graph; evaluate(tables) yields issue dicts."""
+
+    def __init__(self, category: str, evaluate: Callable[[IssueTables], Iterable[Dict]]):
+        self.category = category
+        self.evaluate = evaluate
+
+
+Rule = Union[NodeRule, GraphRule]
+
+
+# --- Built-in rules ---
+
+class CycleRule(GraphRule):
+    """One issue per strongly connected component with a few representative shortest cycles,
+    since enumerating every cycle is exponential on dense subsystems."""
+
+    def __init__(self, max_cycle_length: int = DEFAULT_MAX_CYCLE_LENGTH, max_cycles: int = DEFAULT_MAX_CYCLES):
+        super().__init__('circular_dependencies', self.evaluate_cycles)
+        self.max_cycle_length = max_cycle_length
+        self.max_cycles = max_cycles
+
+    def evaluate_cycles(self, tables: IssueTables) -> Iterable[Dict]:
+        for members in tables.compact.cyclic_components():
+            yield self.component_issue(tables.compact, members)
+
+    def component_issue(self, compact: CompactGraph, members: np.ndarray, degree: np.ndarray = None) -> Dict:
+        """The issue for one cyclic strongly connected component of compact (see representative_cycles for degree)."""
+        nodes = compact.nodes
+        found, truncated = compact.representative_cycles(members, self.max_cycle_length, self.max_cycles, degree)
+        cycles = [[nodes[i] for i in cycle] for cycle in found]
+        involved = [nodes[i] for i in members]
+        shown = f": {' -> '.join(map(str, cycles[0] + [cycles[0][0]]))}" if cycles else ''
+        return {
+            'nodes': involved,
+            'size': len(involved),
+            'cycle': cycles[0] if cycles else [],
+            'cycles': cycles,
+            'truncated': truncated,
+            'description': f"Circular dependency among {len(involved)} node{'s' if len(involved) != 1 else ''}{shown}"
+                           + (" (cycle enumeration truncated)" if truncated else ''),
+            'severity': 'critical',
+            'recommendation': 'Consider introducing async communication or refactoring service responsibilities'
+        }
+
+
+def circular_dependency_rule(max_cycle_length: int = DEFAULT_MAX_CYCLE_LENGTH,
+                             max_cycles: int = DEFAULT_MAX_CYCLES) -> CycleRule:
+    return CycleRule(max_cycle_length, max_cycles)
+
+
+def _orphaned_node(tables: IssueTables, i: int) -> Dict:
+    node = tables.nodes[i]
+    return {
+        'node': node,
+        'description': f"Orphaned node '{node}' has no connections",
+        'severity': 'warning',
+        'recommendation': 'Verify if this component is needed or add appropriate interfaces'
+    }
+
+
+def bottleneck_threshold(average_degree: float) -> float:
+    """Degree above which a node is a potential bottleneck: significantly above average or >5 connections."""
+    return max(average_degree * 2, 5)
+
+
+def _bottleneck_threshold(tables: IssueTables) -> float:
+    return bottleneck_threshold(tables.average_degree)
+
+
+def _is_orphan(tables: IssueTables) -> np.ndarray:
+    return tables.degree == 0
+
+
+def _is_bottleneck(tables: IssueTables) -> np.ndarray:
+    return tables.degree > _bottleneck_threshold(tables)
+
+
+def _lacks_auth(tables: IssueTables) -> np.ndarray:
+    # Incoming connections but no auth is a potential security gap
+    return (tables.in_degree > 0) & ~tables.has_auth
+
+
+def _mixes_protocols(tables: IssueTables) -> np.ndarray:
+    return (tables.incoming_type_count > 2) | (tables.outgoing_type_count > 2)
+
+
+def _performance_bottleneck(tables: IssueTables, i: int) -> Dict:
+    node, total_degree = tables.nodes[i], int(tables.degree[i])
+    return {
+        'node': node,
+        'connections': total_degree,
+        'description': f"Node '{node}' has {total_degree} connections, potential bottleneck",
+        'severity': 'warning',
+        'recommendation': 'Consider load balancing or splitting responsibilities'
+    }
+
+
+def _security_gap(tables: IssueTables, i: int) -> Dict:
+    node = tables.nodes[i]
+    return {
+        'node': node,
+        'description': f"Node '{node}' receives connections but lacks authentication interface",
+        'severity': 'medium',
+        'recommendation': 'Add authentication/authorization interface'
+    }
+
+
+def _inconsistent_protocols(tables: IssueTables, i: int) -> Dict:
+    node = tables.nodes[i]
+    return {
+        'node': node,
+        'incoming_protocols': tables.incoming_protocols(i),
+        'outgoing_protocols': tables.outgoing_protocols(i),
+        'description': f"Node '{node}' uses multiple communication protocols",
+        'severity': 'info',
+        'recommendation': 'Consider standardizing on fewer protocols for consistency'
+    }
+
+
+def path_load(tables: IssueTables, samples: int = DEFAULT_BETWEENNESS_SAMPLES, seed: int = DEFAULT_BETWEENNESS_SEED,
+              time_budget: float = DEFAULT_BETWEENNESS_BUDGET) -> np.ndarray:
+    """Estimated fraction of shortest paths through each node, computed once per run and shared via tables.cache."""
+    if 'path_load' not in tables.cache:
+        tables.cache['path_load'] = tables.compact.approximate_betweenness(samples, seed, time_budget)
+    return tables.cache['path_load'][0]
+
+
+def rank_path_load(graph: Union[nx.DiGraph, CompactGraph], samples: int = DEFAULT_BETWEENNESS_SAMPLES,
+                   seed: int = DEFAULT_BETWEENNESS_SEED, time_budget: float = DEFAULT_BETWEENNESS_BUDGET,
+                   top: int = None) -> List[tuple]:
+    """Services ranked by estimated path load (sampled betweenness), highest first, as (node, load) pairs."""
+    compact = graph if isinstance(graph, CompactGraph) else CompactGraph.from_networkx(graph)
+    scores, _ = compact.approximate_betweenness(samples, seed, time_budget)
+    order = np.argsort(-scores, kind='stable')[:top]
+    return [(compact.nodes[i], float(scores[i])) for i in order.tolist()]
+
+
+def path_load_rule(samples: int = DEFAULT_BETWEENNESS_SAMPLES, seed: int = DEFAULT_BETWEENNESS_SEED,
+                   time_budget: float = DEFAULT_BETWEENNESS_BUDGET, top: int = 10,
+                   min_load: float = 0.01) -> NodeRule:
+    """Choke points by path load: the top nodes by sampled betweenness carrying at least
+    min_load of all shortest paths. Nodes the degree check already reports are left to it."""
+    def candidates(tables: IssueTables) -> np.ndarray:
+        load = path_load(tables, samples, seed, time_budget)
+        order = np.argsort(-load, kind='stable')
+        rank = np.empty(len(tables), dtype=np.int64)
+        rank[order] = np.arange(1, len(tables) + 1)
+        tables.cache['path_load_rank'] = rank
+        selected = np.zeros(len(tables), dtype=bool)
+        selected[order[:top]] = True
+        return selected & (load >= min_load) & (tables.degree <= _bottleneck_threshold(tables))
+
+    def check(tables: IssueTables, i: int) -> Dict:
+        node = tables.nodes[i]
+        load = float(tables.cache['path_load'][0][i])
+        return {
+            'node': node,
+            'connections': int(tables.degree[i]),
+            'path_load': round(load, 4),
+            'path_load_rank': int(tables.cache['path_load_rank'][i]),
+            'sampled_sources': tables.cache['path_load'][1],
+            'description': f"Node '{node}' lies on about {load:.1%} of shortest dependency paths, potential choke point",
+            'severity': 'warning',
+            'recommendation': 'Consider redundancy, caching or splitting responsibilities on this path'
+        }
+
+    return NodeRule('performance_bottlenecks', check, candidates, local=False)
+
+
+def default_rules(max_cycle_length: int = DEFAULT_MAX_CYCLE_LENGTH,
+                  max_cycles: int = DEFAULT_MAX_CYCLES) -> List[Rule]:
+    """The checks detect_architectural_issues has always run."""
+    return [
+        circular_dependency_rule(max_cycle_length, max_cycles),
+        NodeRule('orphaned_nodes', _orphaned_node, _is_orphan),
+        NodeRule('performance_bottlenecks', _performance_bottleneck, _is_bottleneck),
+        NodeRule('security_gaps', _security_gap, _lacks_auth),
+        NodeRule('inconsistent_protocols', _inconsistent_protocols, _mixes_protocols)
+    ]
+
+
+class IssueRuleEngine:
+    """Runs graph rules once and node rules in a single pass over shared tables."""
+
+    def __init__(self, rules: List[Rule] = None, max_cycle_length: int = DEFAULT_MAX_CYCLE_LENGTH,
+                 max_cycles: int = DEFAULT_MAX_CYCLES):
+        self.rules: List[Rule] = list(rules) if rules is not None else default_rules(max_cycle_length, max_cycles)
+
+    def register(self, rule: Rule) -> Rule:
+        self.rules.append(rule)
+        return rule
+
+    def empty_report(self) -> Dict[str, List[Dict]]:
+        issues: Dict[str, List[Dict]] = {category: [] for category in ISSUE_CATEGORIES}
+        for rule in self.rules:
+            issues.setdefault(rule.category, [])
+        return issues
+
+    def graph_issues(self, tables: IssueTables, issues: Dict[str, List[Dict]]):
+        """Run every graph rule, appending to issues."""
+        for rule in self.rules:
+            if isinstance(rule, GraphRule):
+                issues[rule.category].extend(rule.evaluate(tables))
+
+    def node_rules(self) -> List[Tuple[int, NodeRule]]:
+        """(position in self.rules, rule) of every node rule; positions order the issues of one node."""
+        return [(position, rule) for position, rule in enumerate(self.rules) if isinstance(rule, NodeRule)]
+
+    @staticmethod
+    def iter_node_issues(tables: IssueTables, node_rules: List[Tuple[int, NodeRule]],
+                         nodes: np.ndarray = None) -> Iterator[Tuple[int, int, str, Dict]]:
+        """Single pass of node_rules over the tables, yielding (row, rule position, category, issue) in row order.
+
+        nodes, a bool mask over the rows, restricts the pass to some of them.
+        """
+        if not node_rules or not len(tables):
+            return
+        selected = np.ones((len(node_rules), len(tables)), dtype=bool)
+        for r, (_, rule) in enumerate(node_rules):
+            if rule.candidates is not None:
+                selected[r] = rule.candidates(tables)
+        if nodes is not None:
+            selected &= nodes
+        for i in np.flatnonzero(selected.any(axis=0)).tolist():
+            for r in np.flatnonzero(selected[:, i]).tolist():
+                position, rule = node_rules[r]
+                issue = rule.check(tables, i)
+                if issue is not None:
+                    yield i, position, rule.category, issue
+
+    @staticmethod
+    def node_issues(tables: IssueTables, node_rules: List[Tuple[int, NodeRule]],
+                    nodes: np.ndarray = None) -> List[Tuple[int, int, str, Dict]]:
+        return list(IssueRuleEngine.iter_node_issues(tables, node_rules, nodes))
+
+    def iter_issues(self, graph: Union[nx.DiGraph, CompactGraph]) -> Iterator[Tuple[str, Dict]]:
+        """Yield (category, issue) as each rule finds it: graph rules first, then the node pass."""
+        compact = graph if isinstance(graph, CompactGraph) else CompactGraph.from_networkx(graph)
+        tables = IssueTables(compact)
+        for rule in self.rules:
+            if isinstance(rule, GraphRule):
+                for issue in rule.evaluate(tables):
+                    yield rule.category, issue
+        for _, _, category, issue in self.iter_node_issues(tables, self.node_rules()):
+            yield category, issue
+
+    def run(self, graph: Union[nx.DiGraph, CompactGraph]) -> Dict[str, List[Dict]]:
+        issues = self.empty_report()
+        for category, issue in self.iter_issues(graph):
+            issues[category].append(issue)
+        return issues
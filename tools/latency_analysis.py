@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Critical-path latency analysis over synchronous call chains.
+
+A request entering at a service waits for every synchronous call below it,
+so its worst-case end-to-end latency is the heaviest path through the
+synchronous call graph (call_graph.py): the entry service's own latency plus
+the latency of each call on the path. The heaviest path is found by dynamic
+programming over the SCC condensation in reverse topological order, so the
+whole analysis is linear in the size of the graph.
+
+Services that call each other in a cycle cannot be ordered. A request that
+reaches such a strongly connected component is charged, conservatively,
+with every member of it once: the call into the component plus the own
+latency of the other members. The report shows those members as one cycle
+hop of the critical path.
+
+    python3 latency_analysis.py /path/to/index.json --entry api-gateway --out latency_report.json
+"""
+
+import json
+import argparse
+from typing import Dict, Iterable, List
+
+import networkx as nx
+
+from call_graph import add_call_graph_arguments, find_entry_points, load_call_graph, synchronous_subgraph
+from compact_graph import CompactGraph
+from issue_report import ANALYSIS_TIMESTAMP
+
+DEFAULT_DOMINANT_HOPS = 5
+
+
+def critical_paths(S: nx.DiGraph, entries: Iterable, top: int = DEFAULT_DOMINANT_HOPS) -> List[Dict]:
+    """Worst-case latency and critical path of every entry point of a synchronous call graph S.
+
+    Each result lists the hops of the path in order: the entry service, the
+    calls taken ({'from', 'to', ...}) and any cycles passed through
+    ({'cycle': members, ...}), each with its latency_ms; the hop latencies
+    sum to worst_case_latency_ms. dominant_hops are the `top` costliest hops
+    with their share of the total.
+    """
+    compact = CompactGraph.from_networkx(S)
+    labels, _, _, order = compact.condensation()
+    labels = labels.tolist()
+    nodes = compact.nodes
+    own = [float(S.nodes[node]['latency_ms']) for node in nodes]
+
+    members: List[List[int]] = [[] for _ in order]
+    for i, c in enumerate(labels):
+        members[c].append(i)
+    component_latency = [sum(own[i] for i in group) for group in members]
+
+    calls_out: List[List] = [[] for _ in order]
+    for u, v, data in S.edges(data=True):
+        i, j = compact.index[u], compact.index[v]
+        if labels[i] != labels[j]:
+            calls_out[labels[i]].append((i, j, float(data['latency_ms'])))
+
+    # Heaviest continuation after reaching each component, and the call it leaves by
+    best = [0.0] * len(order)
+    leave_by = [None] * len(order)
+    for c in reversed(order):
+        for i, j, latency in calls_out[c]:
+            d = labels[j]
+            candidate = latency + component_latency[d] - own[j] + best[d]
+            if candidate > best[c]:
+                best[c], leave_by[c] = candidate, (i, j, latency)
+
+    results = []
+    for entry in entries:
+        e = compact.index[entry]
+        hops = [{'service': entry, 'latency_ms': own[e], 'latency_source': S.nodes[entry]['latency_source']}]
+        c, at = labels[e], e
+        while True:
+            if len(members[c]) > 1:
+                hops.append({'cycle': [nodes[i] for i in members[c]], 'latency_ms': component_latency[c] - own[at],
+                             'latency_source': 'cycle'})
+            if leave_by[c] is None:
+                break
+            i, j, latency = leave_by[c]
+            hops.append({'from': nodes[i], 'to': nodes[j], 'latency_ms': latency,
+                         'latency_source': S.edges[nodes[i], nodes[j]]['latency_source']})
+            c, at = labels[j], j
+
+        total = component_latency[labels[e]] + best[labels[e]]
+        path = [entry] + [hop['to'] for hop in hops if 'to' in hop]
+        dominant = sorted(hops, key=lambda hop: -hop['latency_ms'])[:top]
+        results.append({
+            'entry': entry,
+            'worst_case_latency_ms': total,
+            'path': path,
+            'hops': hops,
+            'dominant_hops': [{**hop, 'share': hop['latency_ms'] / total if total else 0.0} for hop in dominant],
+            'cycles_on_path': sum(1 for hop in hops if 'cycle' in hop)
+        })
+    return results
+
+
+def latency_report(C: nx.DiGraph, entries: Iterable = None, top: int = DEFAULT_DOMINANT_HOPS) -> Dict:
+    """Critical-path report of a call graph for the given entry points (see find_entry_points)."""
+    S = synchronous_subgraph(C)
+    entry_points = find_entry_points(S, entries)
+    results = critical_paths(S, entry_points, top)
+    sources: Dict[str, int] = {}
+    for _, _, source in S.edges(data='latency_source'):
+        sources[source] = sources.get(source, 0) + 1
+    return {
+        'analysis_timestamp': ANALYSIS_TIMESTAMP,
+        'summary': {
+            'services': S.number_of_nodes(),
+            'synchronous_calls': S.number_of_edges(),
+            'asynchronous_calls': C.number_of_edges() - S.number_of_edges(),
+            'call_latency_sources': sources,
+            'entry_points': len(results),
+            'worst_case_latency_ms': max((r['worst_case_latency_ms'] for r in results), default=0.0)
+        },
+        'entry_points': sorted(results, key=lambda r: -r['worst_case_latency_ms'])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worst-case latency and critical paths of synchronous call chains")
+    add_call_graph_arguments(parser)
+    parser.add_argument('--entry', action='append',
+                        help='Entry point service (repeatable; default: gateway services, else services nothing calls)')
+    parser.add_argument('--top', type=int, default=DEFAULT_DOMINANT_HOPS, help='Dominant hops reported per entry point')
+    parser.add_argument('--out', default='latency_report.json', help='Output report filename')
+    args = parser.parse_args()
+
+    report = latency_report(load_call_graph(args), args.entry, args.top)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Latency report saved to {args.out}")
+    for result in report['entry_points'][:10]:
+        print(f"  {result['entry']}: {result['worst_case_latency_ms']:.1f} ms over {len(result['path'])} services")
+
+
+if __name__ == "__main__":
+    main()
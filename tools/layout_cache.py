@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Position cache and incremental layout for visualize_graph.
+
+Node positions are kept in an on-disk LayoutCache stored next to
+index.json, one entry per view and layout algorithm, fingerprinted by the
+graph's nodes (with their level) and edges. A run whose graph matches the
+fingerprint reuses the positions without computing a layout. For the
+force-directed layouts (spring, kamada) a changed graph keeps the cached
+positions of the nodes it still has and only places the new ones: each
+starts at the centre of its already-placed neighbours and a few spring
+iterations relax the new nodes while every other node stays fixed, so small
+changes do not move the rest of the picture. The other layouts are cheap
+and derived from the structure, so they are recomputed when the graph
+changes.
+
+The cache sits in the architecture data directory, so it is plain JSON:
+loading it never runs code, unlike unpickling.
+"""
+
+import os
+import sys
+import json
+import hashlib
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import networkx as nx
+
+LAYOUT_CACHE_FILENAME = '.layout_cache.json'
+LAYOUT_CACHE_VERSION = 2
+
+INCREMENTAL_LAYOUTS = ('spring', 'kamada')
+
+# Above this share of new nodes the layout is recomputed instead of extended
+MAX_NEW_FRACTION = 0.5
+
+RELAX_ITERATIONS = 15
+
+Positions = Dict[object, Tuple[float, float]]
+
+
+def graph_fingerprint(G: nx.DiGraph) -> str:
+    """SHA-256 of the graph's nodes (with their level) and edges, independent of insertion order."""
+    digest = hashlib.sha256()
+    for node in sorted(f"{node!r}\0{G.nodes[node].get('level', '')}" for node in G.nodes):
+        digest.update(node.encode())
+        digest.update(b'\n')
+    digest.update(b'\0edges\n')
+    for edge in sorted(f'{u!r}\0{v!r}' for u, v in G.edges):
+        digest.update(edge.encode())
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def place_new_nodes(G: nx.DiGraph, cached: Positions, seed: int = 42) -> Positions:
+    """Positions for G keeping the cached ones, with new nodes placed near their neighbours and relaxed locally."""
+    known = [node for node in G if node in cached]
+    new = [node for node in G if node not in cached]
+    pos = {node: cached[node] for node in known}
+    if not new:
+        return pos
+
+    coords = np.array([pos[node] for node in known], dtype=float)
+    low, high = coords.min(axis=0), coords.max(axis=0)
+    # Typical length of a known edge sets the spring length for the new ones
+    lengths = [np.hypot(pos[u][0] - pos[v][0], pos[u][1] - pos[v][1])
+               for u, v in G.edges if u in pos and v in pos and u != v]
+    k = float(np.median(lengths)) if lengths else float(np.max(high - low) or 1.0) / np.sqrt(len(G))
+
+    rng = np.random.default_rng(seed)
+    # New nodes next to already-placed neighbours first, so chains of new nodes grow outwards
+    pending = list(new)
+    while pending:
+        waiting = []
+        for node in pending:
+            placed = [pos[other] for other in nx.all_neighbors(G, node) if other in pos]
+            if placed:
+                centre = np.mean(placed, axis=0)
+                pos[node] = tuple(centre + rng.normal(scale=k / 2, size=2))
+            else:
+                waiting.append(node)
+        if len(waiting) == len(pending):
+            for node in waiting:
+                pos[node] = tuple(rng.uniform(low, high))
+            break
+        pending = waiting
+
+    relaxed = nx.spring_layout(G, pos=pos, fixed=known, k=k, iterations=RELAX_ITERATIONS, seed=seed)
+    return {node: tuple(relaxed[node]) for node in G}
+
+
+class LayoutCache:
+    """On-disk cache of node positions per (view, layout)."""
+
+    def __init__(self, cache_path: str, rebuild: bool = False):
+        self.cache_path = cache_path
+        self.entries = {} if rebuild else self._read()
+        self.stats = {'hit': 0, 'extended': 0, 'computed': 0}
+        self._dirty = rebuild
+
+    @classmethod
+    def for_index(cls, index_path: str, rebuild: bool = False) -> 'LayoutCache':
+        """Create the cache stored next to the given index.json."""
+        return cls(os.path.join(os.path.dirname(os.path.abspath(index_path)), LAYOUT_CACHE_FILENAME), rebuild=rebuild)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.cache_path, 'r') as f:
+                payload = json.load(f)
+            if not isinstance(payload, dict) or payload.get('version') != LAYOUT_CACHE_VERSION:
+                return {}
+            # Positions are stored as [node, x, y] rows so node ids keep their JSON type
+            return {(entry['view'], entry['layout']): {
+                        'fingerprint': entry['fingerprint'],
+                        'positions': {node: (float(x), float(y)) for node, x, y in entry['positions']}}
+                    for entry in payload.get('entries', [])}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable layout cache {self.cache_path}: {e}", file=sys.stderr)
+            return {}
+
+    def positions(self, G: nx.DiGraph, layout: str, compute: Callable[[nx.DiGraph, str], Positions],
+                  view: str = '') -> Positions:
+        """Positions of G for a layout: cached, extended from the cache, or computed with compute(G, layout)."""
+        fingerprint = graph_fingerprint(G)
+        entry = self.entries.get((view, layout))
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            self.stats['hit'] += 1
+            return dict(entry['positions'])
+
+        cached = entry['positions'] if entry is not None else {}
+        new = sum(1 for node in G if node not in cached)
+        if layout in INCREMENTAL_LAYOUTS and cached and len(G) and new <= MAX_NEW_FRACTION * len(G) \
+                and any(node in cached for node in G):
+            pos = place_new_nodes(G, cached)
+            self.stats['extended'] += 1
+        else:
+            pos = compute(G, layout)
+            self.stats['computed'] += 1
+        pos = {node: (float(x), float(y)) for node, (x, y) in pos.items()}
+        self.entries[view, layout] = {'fingerprint': fingerprint, 'positions': pos}
+        self._dirty = True
+        return dict(pos)
+
+    def save(self):
+        """Atomically write the cache if anything changed."""
+        if not self._dirty:
+            return
+        entries = [{'view': view, 'layout': layout, 'fingerprint': entry['fingerprint'],
+                    'positions': [[node, x, y] for node, (x, y) in entry['positions'].items()]}
+                   for (view, layout), entry in self.entries.items()]
+        tmp_path = f"{self.cache_path}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': LAYOUT_CACHE_VERSION, 'entries': entries}, f)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Warning: Could not write layout cache {self.cache_path}: {e}", file=sys.stderr)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def summary(self) -> str:
+        s = self.stats
+        return f"Layout cache: {s['hit']} reused, {s['extended']} extended, {s['computed']} computed ({self.cache_path})"
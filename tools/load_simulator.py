@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Discrete-event load simulation over the service call graph.
+
+Requests arrive at the entry points as Poisson streams. Every request to a
+service waits for one of its `concurrency` servers (first come, first
+served), is served for a time drawn from the service's distribution, and
+then calls each of the service's dependencies in parallel; it completes
+when its own work and every synchronous call it made have completed.
+Asynchronous calls add load downstream but are not waited for. A server
+is released as soon as its own work is done.
+
+Under that model a service's arrivals are fully known once the services
+calling it have been simulated, so the event simulation is run service by
+service in topological order of the call graph instead of through one
+global event queue. Each service is an exact multi-server FCFS queue over
+its merged arrival stream: a single server is the Lindley recursion, done
+with a cumulative maximum in NumPy; more servers keep a heap of the times
+each becomes free. Completion times are then collected in reverse order.
+Calls that would close a cycle (back edges inside a strongly connected
+component) are not simulated and are counted in the report.
+
+Results are deterministic for a seed: every entry point and every service
+draws from its own generator seeded from (seed, position).
+
+Service times come from --service-times, a JSON file keyed by service id
+or 'service/interface' (the service then draws from its interfaces with
+equal probability), with a 'default' entry:
+
+    {"default": {"distribution": "exponential", "mean_ms": 10},
+     "orders": {"distribution": "lognormal", "mean_ms": 40, "sigma": 0.6, "concurrency": 8},
+     "db/query": {"distribution": "constant", "value_ms": 3}}
+
+Distributions: exponential (mean_ms), constant (value_ms), lognormal
+(mean_ms, sigma), uniform (low_ms, high_ms); a mean_ms of 0 or less means
+no service time. Services without an entry are exponential with the mean
+of their call-graph latency_ms. Concurrency comes from the entry, else the
+service's scaling_requirements, else --default-concurrency.
+
+    python3 load_simulator.py /path/to/index.json --rate 200 --scale 5 --requests 1000000 --seed 1
+"""
+
+import json
+import heapq
+import argparse
+from typing import Dict, List, Mapping
+
+import numpy as np
+import networkx as nx
+
+from call_graph import add_call_graph_arguments, find_entry_points, load_call_graph
+from compact_graph import CompactGraph
+from issue_report import ANALYSIS_TIMESTAMP, format_ms, percentile_summary
+
+DISTRIBUTIONS = ('exponential', 'constant', 'lognormal', 'uniform')
+DEFAULT_MAX_CALLS = 50_000_000
+
+
+def sample_service_times(spec: Mapping, rng: np.random.Generator, size: int) -> np.ndarray:
+    """size service times in ms from a distribution spec (see the module docstring)."""
+    distribution = spec.get('distribution', 'exponential')
+    if distribution == 'exponential':
+        return rng.exponential(float(spec['mean_ms']), size) if spec['mean_ms'] > 0 else np.zeros(size)
+    if distribution == 'constant':
+        return np.full(size, float(spec['value_ms']))
+    if distribution == 'lognormal':
+        if spec['mean_ms'] <= 0:
+            return np.zeros(size)
+        sigma = float(spec.get('sigma', 0.5))
+        return rng.lognormal(np.log(float(spec['mean_ms'])) - sigma * sigma / 2, sigma, size)
+    if distribution == 'uniform':
+        return rng.uniform(float(spec['low_ms']), float(spec['high_ms']), size)
+    raise ValueError(f"Unknown service time distribution '{distribution}', expected one of {DISTRIBUTIONS}")
+
+
+def fcfs_queue(arrivals: np.ndarray, service: np.ndarray, servers: int) -> np.ndarray:
+    """Start times of requests (sorted by arrival) at a FCFS queue with `servers` servers."""
+    if servers >= len(arrivals):
+        return arrivals.copy()
+    if servers == 1:
+        # Lindley: departure_i = max over k <= i of (arrival_k + service_k + ... + service_i)
+        served = np.cumsum(service)
+        before = served - service
+        departures = served + np.maximum.accumulate(arrivals - before)
+        return departures - service
+    starts = np.empty(len(arrivals))
+    free = [0.0] * servers
+    replace = heapq.heapreplace
+    for k, (arrival, duration) in enumerate(zip(arrivals.tolist(), service.tolist())):
+        start = arrival if arrival > free[0] else free[0]
+        replace(free, start + duration)
+        starts[k] = start
+    return starts
+
+
+def _max_queue_length(arrivals: np.ndarray, starts: np.ndarray) -> int:
+    """Most requests waiting at once: +1 at each arrival, -1 at each start, starts first on ties."""
+    times = np.concatenate([starts, arrivals])
+    steps = np.concatenate([-np.ones(len(starts), dtype=np.int64), np.ones(len(arrivals), dtype=np.int64)])
+    order = np.lexsort((steps, times))
+    return int(np.cumsum(steps[order]).max(initial=0))
+
+
+def _service_spec(service_times: Mapping, node, latency_ms: float) -> List[Mapping]:
+    if node in service_times:
+        return [service_times[node]]
+    prefix = f'{node}/'
+    per_interface = [spec for key, spec in service_times.items() if key.startswith(prefix)]
+    if per_interface:
+        return per_interface
+    return [service_times.get('default', {'distribution': 'exponential', 'mean_ms': latency_ms})]
+
+
+def simulate(C: nx.DiGraph, entries: List, rate_rps: float, requests: int, service_times: Mapping = None,
+             default_concurrency: int = 1, seed: int = 0, max_calls: int = DEFAULT_MAX_CALLS) -> Dict:
+    """Simulate `requests` Poisson arrivals at rate_rps at each entry point; returns per-service and per-entry results."""
+    service_times = service_times or {}
+    compact = CompactGraph.from_networkx(C)
+    nodes = compact.nodes
+    labels, _, _, component_order = compact.condensation()
+    rank = np.empty(len(component_order), dtype=np.int64)
+    rank[component_order] = np.arange(len(component_order))
+    # Topological order of the nodes; inside an SCC, node order breaks the cycle
+    order = np.lexsort((np.arange(len(nodes)), rank[labels])).tolist()
+    position = np.empty(len(nodes), dtype=np.int64)
+    position[order] = np.arange(len(nodes))
+
+    callers: List[List] = [[] for _ in nodes]
+    skipped = 0
+    for u, v, pattern in C.edges(data='pattern'):
+        i, j = compact.index[u], compact.index[v]
+        if position[i] < position[j]:
+            callers[j].append((i, pattern == 'synchronous'))
+        else:
+            skipped += 1
+    callees: List[List] = [[] for _ in nodes]
+
+    external = {compact.index[entry]: k for k, entry in enumerate(entries)}
+    mean_gap = 1000.0 / rate_rps
+    arrivals: List = [None] * len(nodes)
+    finished: List = [None] * len(nodes)
+    inbound: Dict = {}
+    stats: Dict[int, Dict] = {}
+    total_calls = 0
+    for i in order:
+        # Merge this service's arrival streams: its external requests, then each caller's departures
+        streams = []
+        if i in external:
+            rng = np.random.default_rng([seed, 0, external[i]])
+            streams.append(('entry', np.cumsum(rng.exponential(mean_gap, requests))))
+        for caller, synchronous in callers[i]:
+            if finished[caller] is not None:
+                streams.append((caller, finished[caller]))
+                callees[caller].append((i, synchronous))
+        if not streams:
+            continue
+        merged = np.concatenate([times for _, times in streams])
+        total_calls += len(merged)
+        if total_calls > max_calls:
+            raise ValueError(f"Simulation needs more than {max_calls} calls; lower --requests or raise --max-calls")
+        sort = np.argsort(merged, kind='stable')
+        where = np.empty(len(merged), dtype=np.int64)
+        where[sort] = np.arange(len(merged))
+        offset = 0
+        for source, times in streams:
+            inbound[source, i] = where[offset:offset + len(times)]
+            offset += len(times)
+        arrived = merged[sort]
+
+        node = nodes[i]
+        attrs = C.nodes[node]
+        specs = _service_spec(service_times, node, float(attrs.get('latency_ms') or 0.0))
+        rng = np.random.default_rng([seed, 1, i])
+        if len(specs) == 1:
+            service = sample_service_times(specs[0], rng, len(arrived))
+        else:
+            choice = rng.integers(len(specs), size=len(arrived))
+            service = np.empty(len(arrived))
+            for k, spec in enumerate(specs):
+                picked = choice == k
+                service[picked] = sample_service_times(spec, rng, int(picked.sum()))
+        servers = next((spec['concurrency'] for spec in specs if 'concurrency' in spec), None) \
+            or attrs.get('concurrency') or default_concurrency
+        starts = fcfs_queue(arrived, service, servers)
+        done = starts + service
+
+        arrivals[i] = arrived
+        finished[i] = done
+        stats[i] = {'servers': servers, 'service_ms': service, 'waits': starts - arrived,
+                    'max_queue': _max_queue_length(arrived, starts)}
+
+    # A call completes when its own work and every synchronous call it made have completed
+    completed: List = [None] * len(nodes)
+    for i in reversed(order):
+        if finished[i] is None:
+            continue
+        end = finished[i].copy()
+        for callee, synchronous in callees[i]:
+            if synchronous:
+                np.maximum(end, completed[callee][inbound[i, callee]], out=end)
+        completed[i] = end
+
+    starts_at = [times[0] for times in arrivals if times is not None and len(times)]
+    ends_at = [times.max() for times in completed if times is not None and len(times)]
+    span = max(ends_at) - min(starts_at) if starts_at else 0.0
+
+    services = []
+    for i, record in stats.items():
+        busy = float(record['service_ms'].sum())
+        services.append({
+            'service': nodes[i],
+            'calls': int(len(arrivals[i])),
+            'servers': int(record['servers']),
+            'utilization': float(busy / (record['servers'] * span)) if span > 0 else 0.0,
+            # Little's law: time-average number waiting = total waiting time / span
+            'mean_queue_length': float(record['waits'].sum() / span) if span > 0 else 0.0,
+            'max_queue_length': record['max_queue'],
+            'wait_ms': percentile_summary(record['waits']),
+            'latency_ms': percentile_summary(completed[i] - arrivals[i])
+        })
+    services.sort(key=lambda item: -item['utilization'])
+
+    entry_results = []
+    for entry in entries:
+        i = compact.index[entry]
+        picked = inbound['entry', i]
+        latencies = completed[i][picked] - arrivals[i][picked]
+        entry_results.append({'entry': entry, 'requests': int(len(picked)), 'latency_ms': percentile_summary(latencies),
+                              'mean_latency_ms': float(latencies.mean()) if len(latencies) else None})
+    return {'span_ms': float(span), 'total_calls': total_calls, 'cycle_calls_skipped': skipped,
+            'services': services, 'entry_points': entry_results}
+
+
+def simulation_report(C: nx.DiGraph, entries: List = None, rate_rps: float = 100.0, scale: float = 1.0,
+                      requests: int = 100_000, service_times: Mapping = None, default_concurrency: int = 1,
+                      seed: int = 0, max_calls: int = DEFAULT_MAX_CALLS) -> Dict:
+    """Simulation report of a call graph at rate_rps * scale per entry point (see find_entry_points)."""
+    entry_points = find_entry_points(C, entries)
+    results = simulate(C, entry_points, rate_rps * scale, requests, service_times, default_concurrency, seed, max_calls)
+    return {
+        'analysis_timestamp': ANALYSIS_TIMESTAMP,
+        'parameters': {'rate_rps': rate_rps, 'scale': scale, 'requests_per_entry': requests, 'seed': seed,
+                       'default_concurrency': default_concurrency},
+        'summary': {
+            'services': C.number_of_nodes(),
+            'entry_points': len(entry_points),
+            'simulated_ms': results['span_ms'],
+            'total_calls': results['total_calls'],
+            'cycle_calls_skipped': results['cycle_calls_skipped'],
+            'saturated_services': sum(1 for item in results['services'] if item['utilization'] >= 0.95)
+        },
+        'entry_points': results['entry_points'],
+        'services': results['services']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discrete-event load simulation over the service call graph")
+    add_call_graph_arguments(parser)
+    parser.add_argument('--entry', action='append',
+                        help='Entry point service (repeatable; default: gateway services, else services nothing calls)')
+    parser.add_argument('--rate', type=float, default=100.0, help='Request rate per entry point (requests per second)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Traffic multiplier applied to --rate (e.g. 5 for 5x)')
+    parser.add_argument('--requests', type=int, default=100_000, help='Requests simulated per entry point')
+    parser.add_argument('--service-times', help='JSON file of service time distributions (see module docstring)')
+    parser.add_argument('--default-concurrency', type=int, default=1,
+                        help='Servers of a service that declares no concurrency')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--max-calls', type=int, default=DEFAULT_MAX_CALLS,
+                        help='Stop if the simulation would need more service calls than this')
+    parser.add_argument('--out', default='simulation_report.json', help='Output report filename')
+    args = parser.parse_args()
+
+    service_times = None
+    if args.service_times:
+        with open(args.service_times) as f:
+            service_times = json.load(f)
+    report = simulation_report(load_call_graph(args), args.entry, args.rate, args.scale, args.requests,
+                               service_times, args.default_concurrency, args.seed, args.max_calls)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Simulation report saved to {args.out}")
+    for result in report['entry_points'][:10]:
+        latency = result['latency_ms']
+        print(f"  {result['entry']}: p50 {format_ms(latency['p50'])}, p99 {format_ms(latency['p99'])}")
+    for item in report['services'][:5]:
+        print(f"  {item['service']}: {item['utilization']:.0%} busy, up to {item['max_queue_length']} waiting")
+
+
+if __name__ == "__main__":
+    main()
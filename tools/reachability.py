@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Precomputed reachability index for transitive dependency queries.
+
+Edges of the system graph point from a service to what it depends on, so the
+descendants of X are everything X transitively depends on and the ancestors
+of Y are everything affected if Y slows down. Answering either with a graph
+traversal costs O(N+E) per query.
+
+ReachabilityIndex collapses the graph into its condensation DAG (one node per
+strongly connected component) and labels every component with two bitsets,
+held as Python ints: the components it reaches and the components that reach
+it. Bits are numbered in reverse topological order, so a component's
+descendant bits all sit below its own and, as built, the labels stay as
+short as the graph allows. A reachability query is then one shift and mask,
+and an ancestor or descendant query costs the size of its answer.
+
+The index wraps the graph it was built from. Adding nodes and edges through
+it patches the labels in place; removals mark it stale and it is rebuilt on
+the next query.
+"""
+
+from typing import Dict, List, Set
+
+import numpy as np
+import networkx as nx
+
+from compact_graph import CompactGraph
+
+
+def _bit_positions(bits: int) -> np.ndarray:
+    """Positions of the set bits of a non-negative int."""
+    if not bits:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little'))
+
+
+class ReachabilityIndex:
+    """Reachability, ancestor and descendant queries over a system graph.
+
+    Attributes:
+        G: the wrapped graph
+        component: node -> component id (a bit position)
+        members: component id -> nodes of that strongly connected component
+        descendants_bits, ancestors_bits: component id -> bitset of the
+            components it reaches / that reach it, itself included
+    """
+
+    def __init__(self, G: nx.DiGraph):
+        self.G = G
+        self.stale = True
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute the condensation and all labels from the wrapped graph."""
+        compact = CompactGraph.from_networkx(self.G)
+        labels, dag_sources, dag_targets, order = compact.condensation()
+        count = len(order)
+        successors: List[List[int]] = [[] for _ in range(count)]
+        for u, v in zip(dag_sources.tolist(), dag_targets.tolist()):
+            successors[u].append(v)
+
+        # Number components sinks first, so descendant bits are always lower than a component's own bit
+        position = [0] * count
+        for rank, c in enumerate(reversed(order)):
+            position[c] = rank
+        self.successors = [[position[s] for s in successors[c]] for c in reversed(order)]
+        self.predecessors: List[List[int]] = [[] for _ in range(count)]
+        for c, succ in enumerate(self.successors):
+            for s in succ:
+                self.predecessors[s].append(c)
+
+        self.members: List[List] = [[] for _ in range(count)]
+        self.component: Dict = {}
+        for node, label in zip(compact.nodes, labels.tolist()):
+            c = position[label]
+            self.component[node] = c
+            self.members[c].append(node)
+
+        self.descendants_bits = [0] * count
+        for c in range(count):
+            bits = 1 << c
+            for s in self.successors[c]:
+                bits |= self.descendants_bits[s]
+            self.descendants_bits[c] = bits
+        self.ancestors_bits = [0] * count
+        for c in reversed(range(count)):
+            bits = 1 << c
+            for p in self.predecessors[c]:
+                bits |= self.ancestors_bits[p]
+            self.ancestors_bits[c] = bits
+        self.stale = False
+
+    def _ensure_fresh(self):
+        if self.stale:
+            self.rebuild()
+
+    def _component_of(self, node) -> int:
+        self._ensure_fresh()
+        try:
+            return self.component[node]
+        except KeyError:
+            raise nx.NodeNotFound(f"Node {node!r} is not in the graph") from None
+
+    def _expand(self, bits: int, exclude) -> Set:
+        nodes = set()
+        for c in _bit_positions(bits).tolist():
+            nodes.update(self.members[c])
+        nodes.discard(exclude)
+        return nodes
+
+    # --- Queries ---
+
+    def reaches(self, source, target) -> bool:
+        """True if there is a path from source to target (source depends on target, transitively)."""
+        c, target_c = self._component_of(source), self._component_of(target)
+        return bool(self.descendants_bits[c] >> target_c & 1)
+
+    def descendants(self, node) -> Set:
+        """Every node reachable from node: what it transitively depends on. Like nx.descendants."""
+        c = self._component_of(node)
+        return self._expand(self.descendants_bits[c], node)
+
+    def ancestors(self, node) -> Set:
+        """Every node that reaches node: what is affected if it slows down. Like nx.ancestors."""
+        c = self._component_of(node)
+        return self._expand(self.ancestors_bits[c], node)
+
+    def count_descendants(self, node) -> int:
+        c = self._component_of(node)
+        return sum(len(self.members[d]) for d in _bit_positions(self.descendants_bits[c]).tolist()) - 1
+
+    def count_ancestors(self, node) -> int:
+        c = self._component_of(node)
+        return sum(len(self.members[a]) for a in _bit_positions(self.ancestors_bits[c]).tolist()) - 1
+
+    # --- Updates ---
+
+    def add_node(self, node, **attr):
+        """Add a node to the graph and give it its own component."""
+        new = node not in self.G
+        self.G.add_node(node, **attr)
+        if new and not self.stale:
+            c = len(self.members)
+            self.component[node] = c
+            self.members.append([node])
+            self.successors.append([])
+            self.predecessors.append([])
+            self.descendants_bits.append(1 << c)
+            self.ancestors_bits.append(1 << c)
+
+    def add_edge(self, u, v, **attr):
+        """Add an edge to the graph and patch the labels.
+
+        An edge that closes a cycle merges components, which renumbers the
+        condensation, so it marks the index stale instead.
+        """
+        self.add_node(u)
+        self.add_node(v)
+        self.G.add_edge(u, v, **attr)
+        if self.stale:
+            return
+        cu, cv = self.component[u], self.component[v]
+        if self.ancestors_bits[cu] >> cv & 1:
+            if cu != cv:
+                self.stale = True
+            return
+        if cv in self.successors[cu]:
+            return
+        self.successors[cu].append(cv)
+        self.predecessors[cv].append(cu)
+        reached = self.descendants_bits[cv]
+        for a in _bit_positions(self.ancestors_bits[cu]).tolist():
+            self.descendants_bits[a] |= reached
+        reaching = self.ancestors_bits[cu]
+        for d in _bit_positions(reached).tolist():
+            self.ancestors_bits[d] |= reaching
+
+    def remove_edge(self, u, v):
+        self.G.remove_edge(u, v)
+        self.stale = True
+
+    def remove_node(self, node):
+        self.G.remove_node(node)
+        self.stale = True
+
+    def invalidate(self):
+        """Mark the index stale after the wrapped graph was changed directly."""
+        self.stale = True
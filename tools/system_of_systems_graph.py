@@ -5,18 +5,44 @@ import networkx as nx
 import matplotlib.pyplot as plt
 import sys
 import argparse
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Mapping, Set, Tuple, Union
+
+from component_loader import DEFAULT_WORKERS, ComponentCache, load_components, resolve_component_path
+from component_bundle import ComponentBundle, is_bundle
+from component_model import (
+    ServiceNameIndex, classify_node, iter_component_references, make_node_attributes, node_implementation_status
+)
+from compact_graph import (
+    DEFAULT_BETWEENNESS_BUDGET, DEFAULT_BETWEENNESS_SAMPLES, DEFAULT_BETWEENNESS_SEED, DEFAULT_MAX_CYCLE_LENGTH,
+    DEFAULT_MAX_CYCLES
+)
+from issue_report import ANALYSIS_TIMESTAMP, iter_report_items, report_summary, stream_issues_report
+from issue_rules import IssueRuleEngine, default_rules, path_load_rule
+from force_layout import multilevel_layout
+from graph_render import (
+    DEFAULT_MAX_LABELS, DETAILED_MAX_NODES, DRAFT_DPI, FULL_DPI, draw_edges, is_detailed, label_nodes, node_styles
+)
+from layout_cache import LayoutCache
 
 # --- STEP 1: Load the robust index file ---
-def load_service_architecture_index(index_path: str) -> Dict[str, str]:
-    """Load the mapping of service_id to file path from the index file.
+# Top-level keys of a legacy flat index that are not components
+INDEX_METADATA_KEYS = {'system_name', 'description', 'last_updated', 'version', 'metadata', 'levels'}
+SUB_INDEX_FILENAME = 'index.json'
+
+def is_sub_index_entry(value) -> bool:
+    """True if an index entry points at another index.json rather than a component file.
     
-    Handles both flat dictionaries and structured index files with 'components' key.
-    Returns a flat mapping of service_id to file_path.
+    A sub-index (shard) entry is either the path of a file named index.json, or
+    a dict {"index": path, "levels": [...]} where the optional levels list the
+    graph levels (see classify_node) of the components in that shard.
     """
-    with open(index_path, 'r') as f:
-        index_data = json.load(f)
-    
+    if isinstance(value, dict):
+        return isinstance(value.get('index'), str)
+    return isinstance(value, str) and os.path.basename(value) == SUB_INDEX_FILENAME
+
+def _index_entries(index_data) -> Dict:
+    """Component and sub-index entries of a parsed index file."""
     # Handle structured index format with metadata and components
     if isinstance(index_data, dict) and 'components' in index_data:
         return index_data['components']
@@ -24,122 +50,319 @@ def load_service_architecture_index(index_path: str) -> Dict[str, str]:
     # Handle legacy flat format (service_id: file_path mapping)
     elif isinstance(index_data, dict):
         # Filter out non-component metadata keys
-        metadata_keys = {'system_name', 'description', 'last_updated', 'version', 'metadata'}
-        return {k: v for k, v in index_data.items() if k not in metadata_keys and isinstance(v, str)}
+        return {k: v for k, v in index_data.items()
+                if k not in INDEX_METADATA_KEYS and (isinstance(v, str) or is_sub_index_entry(v))}
     
     else:
         raise ValueError(f"Invalid index format: expected dict with 'components' key or flat service mapping")
 
-# --- STEP 2: Build the system-of-systems graph ---
-def classify_node(service_id: str, data: dict) -> Tuple[str, str]:
-    """Return (level, display_name) based on UAF hierarchical classification and service data."""
-    
-    # Use UAF hierarchical_tier if available
-    tier = data.get('hierarchical_tier')
-    if tier == 'tier_0_system_of_systems':
-        level = 'system_of_systems'
-    elif tier == 'tier_1_systems':
-        level = 'system'
-    elif tier == 'tier_2_components':
-        level = 'package'  # Map to existing 'package' level for compatibility
-    elif tier == 'tier_3_internal_modules':
-        level = 'module'  # New level for internal modules
-    else:
-        # Fallback heuristics for non-UAF formatted data
-        if service_id.endswith('_service') and 'package_name' not in data:
-            level = 'service'
-        elif 'package_name' in data:
-            level = 'package'
-        else:
-            level = 'package'  # Default to package level
+def _shard_wanted(levels, include_levels) -> bool:
+    return include_levels is None or levels is None or bool(set(levels) & set(include_levels))
+
+def _load_sub_index(index_path: str, include_levels: List[str], workers: int, seen: frozenset,
+                    shard_paths: Set[str] = None) -> List[Tuple[str, str]]:
+    """Load one shard as (service_id, absolute path) pairs; missing, cyclic or unwanted shards give none."""
+    real_path = os.path.realpath(index_path)
+    if real_path in seen:
+        print(f"Warning: Skipping sub-index {index_path}, it is already being loaded (cycle)", file=sys.stderr)
+        return []
+    if shard_paths is not None:
+        shard_paths.add(os.path.abspath(index_path))
+    try:
+        with open(index_path, 'r') as f:
+            index_data = json.load(f)
+    except FileNotFoundError:
+        print(f"Warning: Could not find sub-index {index_path}", file=sys.stderr)
+        return []
+    if isinstance(index_data, dict) and not _shard_wanted(index_data.get('levels'), include_levels):
+        return []
+    shard_dir = os.path.dirname(os.path.abspath(index_path))
+    pairs = expand_sub_indexes(_index_entries(index_data).items(), shard_dir, include_levels, workers,
+                               shard_paths, _seen=seen | {real_path})
+    # Component paths in a shard are relative to the shard, so make them absolute for the caller
+    return [(sid, os.path.abspath(resolve_component_path(path, shard_dir))) for sid, path in pairs]
+
+def expand_sub_indexes(pairs: Iterable[Tuple[str, object]], index_dir: str, include_levels: List[str] = None,
+                       workers: int = DEFAULT_WORKERS, shard_paths: Set[str] = None,
+                       _seen: frozenset = frozenset()) -> Iterator[Tuple[str, str]]:
+    """Replace sub-index entries in a stream of index entries by the components they list.
+    
+    Component entries pass through unchanged and are yielded as they arrive.
+    Sub-indexes are read in a thread pool while the rest of the index is read,
+    recursively, and their components follow in entry order. A shard whose
+    declared levels do not intersect include_levels is never read, so e.g. the
+    systems view does not open the index or the files of a tier-3 module shard.
+    The absolute path of every sub-index file it reads, or tries to, is added
+    to shard_paths if given.
+    """
+    shards = []
+    pool = None
+    try:
+        for service_id, entry in pairs:
+            if not is_sub_index_entry(entry):
+                yield service_id, entry
+                continue
+            path, levels = (entry['index'], entry.get('levels')) if isinstance(entry, dict) else (entry, None)
+            if not _shard_wanted(levels, include_levels):
+                continue
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=max(1, workers))
+            shards.append(pool.submit(_load_sub_index, resolve_component_path(path, index_dir),
+                                      include_levels, workers, _seen, shard_paths))
+        for shard in shards:
+            yield from shard.result()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def load_service_architecture_index(index_path: str, include_levels: List[str] = None,
+                                    workers: int = DEFAULT_WORKERS, shard_paths: Set[str] = None) -> Dict[str, str]:
+    """Load the mapping of service_id to file path from the index file.
+    
+    Handles both flat dictionaries and structured index files with 'components' key.
+    Entries that point at another index.json are resolved in parallel (see
+    expand_sub_indexes), skipping shards with no components at include_levels;
+    the sub-index files read are added to shard_paths if given.
+    Returns a flat mapping of service_id to file_path.
+    """
+    with open(index_path, 'r') as f:
+        index_data = json.load(f)
+    entries = _index_entries(index_data)
+    if not any(is_sub_index_entry(v) for v in entries.values()):
+        return entries
+    index_dir = os.path.dirname(os.path.abspath(index_path))
+    return dict(expand_sub_indexes(entries.items(), index_dir, include_levels, workers, shard_paths,
+                                   _seen=frozenset([os.path.realpath(index_path)])))
+
+class _JsonEventReader:
+    """Minimal incremental JSON reader over a text file.
     
-    # Get display name, preferring service_name
-    display_name = (
-        data.get('service_name') or 
-        data.get('package_name') or 
-        service_id.replace('_', '-')  # Convert underscores to hyphens for display
-    )
+    Reads the file in chunks and decodes one token or value at a time, so a
+    caller can walk the top levels of a huge document without holding it all.
+    """
     
-    return (level, display_name)
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+    
+    def _fill(self, size: int = None) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\n\r':
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos] if self.pos < len(self.buf) else ''
+    
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Invalid index format: expected '{char}'")
+        self.pos += 1
+    
+    def value(self):
+        """Decode the next complete JSON value, reading more input as needed."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A value ending exactly at the buffer edge may continue in the next chunk, and so may
+                # a number cut inside its fraction or exponent ('-0' of '-0.5', '1' of '1e5')
+                cut = end == len(self.buf) or (isinstance(value, (int, float)) and self.buf[end] in '.eE')
+                if not cut or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            size *= 2  # grow reads so very large values are not re-decoded once per chunk
+            self._fill(size)
+    
+    def members(self) -> Iterator[str]:
+        """Iterate the keys of the object at the current position; the caller reads each value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+def iter_service_architecture_index(index_path: str, include_levels: List[str] = None,
+                                    workers: int = DEFAULT_WORKERS) -> Iterator[Tuple[str, str]]:
+    """Stream (service_id, file_path) pairs from an index file as it is parsed.
+    
+    Accepts the same formats as load_service_architecture_index. For the
+    structured format, pairs are yielded as soon as each 'components' entry is
+    read, so component loading can overlap with reading a very large index.
+    Legacy flat indexes can only be told apart from metadata once the whole
+    object has been read, so their pairs are yielded at the end.
+    Sub-indexes are expanded as in load_service_architecture_index.
+    """
+    index_dir = os.path.dirname(os.path.abspath(index_path))
+    return expand_sub_indexes(_iter_index_entries(index_path), index_dir, include_levels, workers,
+                              _seen=frozenset([os.path.realpath(index_path)]))
+
+def _iter_index_entries(index_path: str) -> Iterator[Tuple[str, object]]:
+    with open(index_path, 'r') as f:
+        reader = _JsonEventReader(f)
+        if reader.peek() != '{':
+            raise ValueError(f"Invalid index format: expected dict with 'components' key or flat service mapping")
+        structured = False
+        flat_pairs = []
+        for key in reader.members():
+            if key == 'components' and reader.peek() == '{':
+                structured = True
+                flat_pairs = []
+                for service_id in reader.members():
+                    yield service_id, reader.value()
+            else:
+                value = reader.value()
+                if not structured and key not in INDEX_METADATA_KEYS and (isinstance(value, str) or is_sub_index_entry(value)):
+                    flat_pairs.append((key, value))
+        yield from flat_pairs
 
-def build_system_graph(index: Dict[str, str], include_levels: List[str], index_dir: str) -> nx.DiGraph:
+# --- STEP 2: Build the system-of-systems graph ---
+def build_system_graph(index: Union[Dict[str, str], Iterable[Tuple[str, str]]], include_levels: List[str], index_dir: str,
+                       workers: int = DEFAULT_WORKERS, parse_processes: int = 0,
+                       cache: ComponentCache = None, lean: bool = False) -> nx.DiGraph:
     """Build a directed graph from all service_architecture.json files filtering by include_levels (e.g., ['package']).
     
     Args:
-        index: Dictionary mapping service_id to file paths
-        include_levels: List of levels to include in the graph
+        index: Dictionary mapping service_id to file paths, or a stream of
+            (service_id, path) pairs such as iter_service_architecture_index();
+            entries pointing at sub-indexes are expanded for include_levels
+        include_levels: List of levels to include in the graph (None keeps every level)
         index_dir: Directory containing the index.json file, used for resolving relative paths
+        workers: Number of threads used to read component files
+        parse_processes: If > 0, parse component JSON in a process pool of this size
+        cache: Optional ComponentCache of parsed component files
+        lean: Store lean node attributes instead of the full parsed document (see lean_node_attributes)
+    """
+    # Pass 1: load (in parallel, results in index order)
+    sources = {}
+    def record_sources(pairs):
+        for service_id, file_path in pairs:
+            sources[service_id] = os.path.abspath(resolve_component_path(file_path, index_dir))
+            yield service_id, file_path
+    
+    pairs = index.items() if isinstance(index, dict) else index
+    # Entries may still point at sub-indexes if the caller built the index itself
+    pairs = expand_sub_indexes(pairs, index_dir, include_levels, workers)
+    service_info = load_components(record_sources(pairs), index_dir, workers=workers,
+                                   parse_processes=parse_processes, cache=cache)
+    return graph_from_components(service_info, include_levels, lean=lean, sources=sources if lean else None)
+
+def build_bundle_graph(bundle: ComponentBundle, include_levels: List[str], lean: bool = False) -> nx.DiGraph:
+    """Build the graph from a packed component bundle instead of individual files.
+    
+    Levels are decided from the bundle table, so only the records of kept nodes
+    are decoded. Lean nodes load their documents back from the bundle.
+    """
+    G = graph_from_components(bundle, include_levels, lean=lean, sources=bundle.sources if lean else None,
+                              summaries=bundle.summaries)
+    G.graph['bundle'] = bundle.path
+    return G
+
+def graph_from_components(service_info: Mapping[str, dict], include_levels: List[str] = None,
+                          lean: bool = False, sources: Dict[str, str] = None,
+                          summaries: Mapping[str, dict] = None) -> nx.DiGraph:
+    """Classify loaded components and connect them, keeping only include_levels (all levels if None).
+    
+    With lean=True nodes carry lean_node_attributes() and the path of their source
+    document (from sources) instead of the whole document as 'raw'.
+    
+    If summaries is given (service_id -> the fields classify_node and
+    ServiceNameIndex read), classification and name resolution use it and
+    service_info is only indexed for the kept nodes, so a lazy mapping such as a
+    ComponentBundle only decodes the documents the selected levels need.
     """
     G = nx.DiGraph()
-    service_info = {}
     node_levels = {}
+    headers = service_info if summaries is None else summaries
+    kept = {}
     
-    # Pass 1: load and classify
-    for service_id, file_path in index.items():
-        # Handle relative paths by making them relative to index directory
-        if not os.path.isabs(file_path):
-            file_path = os.path.join(index_dir, file_path)
-        
-        try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            print(f"Warning: Could not find file {file_path} for service {service_id}")
-            continue
-        except json.JSONDecodeError:
-            print(f"Warning: Invalid JSON in {file_path} for service {service_id}")
-            continue
-            
-        level, display = classify_node(service_id, data)
+    for service_id, head in headers.items():
+        level, display = classify_node(service_id, head)
         node_levels[service_id] = level
-        if level in include_levels:
-            G.add_node(service_id, label=display, level=level, raw=data)
-        service_info[service_id] = data
+        if include_levels is None or level in include_levels:
+            data = head if summaries is None else service_info[service_id]
+            kept[service_id] = data
+            G.add_node(service_id, **make_node_attributes(data, level, display, lean,
+                                                          (sources or {}).get(service_id)))
     # Pass 2: add edges only if both endpoints are kept (to avoid partial hierarchy clutter)
-    for service_id, data in service_info.items():
-        if service_id not in G:  # Skip nodes filtered out
-            continue
-        # Dependencies
-        dependencies = []
-        if 'dependencies' in data:
-            dependencies = data['dependencies']
-        elif 'srd' in data and 'dependencies' in data['srd']:
-            dependencies = data['srd']['dependencies']
-        for dep in dependencies:
-            dep_id = None
-            for sid, info in service_info.items():
-                name_candidates = [sid,
-                                   info.get('service_name', '').lower().replace(' ', '_'),
-                                   info.get('package_name', '').lower().replace(' ', '_')]
-                if dep.lower().replace(' ', '_') in name_candidates:
-                    dep_id = sid
-                    break
-            if dep_id and dep_id in G:
-                G.add_edge(service_id, dep_id, type='dependency')
-        # Interfaces
-        icd = data.get('icd', data)
-        interfaces = icd.get('interfaces', [])
-        for iface in interfaces:
-            if isinstance(iface, dict):
-                for dep in iface.get('dependencies', []):
-                    dep_id = None
-                    for sid, info in service_info.items():
-                        name_candidates = [sid,
-                                           info.get('service_name', '').lower().replace(' ', '_'),
-                                           info.get('package_name', '').lower().replace(' ', '_')]
-                        if dep.lower().replace(' ', '_') in name_candidates:
-                            dep_id = sid
-                            break
-                    if dep_id and dep_id in G:
-                        G.add_edge(service_id, dep_id, type='interface')
+    names = ServiceNameIndex(headers)
+    unresolved = {}
+    for service_id, data in kept.items():
+        for dep, edge_type in iter_component_references(data):
+            dep_id = names.resolve(dep)
+            if dep_id is None:
+                unresolved.setdefault(dep, []).append(service_id)
+            elif dep_id in G:
+                G.add_edge(service_id, dep_id, type=edge_type)
+
+    report_name_resolution(G, names, unresolved)
     return G
 
-# --- STEP 3: Visualize the graph ---
-def visualize_graph(G: nx.DiGraph, out_file: str = None, title: str = 'System Architecture', layout: str = 'spectral'):
-    # Increase figure size for better readability
-    plt.figure(figsize=(20, 14))
+def report_name_resolution(G: nx.DiGraph, names: ServiceNameIndex, unresolved: Dict[str, List[str]]):
+    """Record ambiguous and unresolved dependency names on the graph and print a summary"""
+    for key, candidates in names.ambiguous.items():
+        print(f"Warning: Ambiguous service name '{key}' matches {', '.join(candidates)}; using {candidates[0]}",
+              file=sys.stderr)
+    if unresolved:
+        print(f"Warning: {len(unresolved)} dependency names did not match any component "
+              f"(see graph attribute 'name_resolution')", file=sys.stderr)
+    G.graph['name_resolution'] = {
+        'ambiguous': {key: list(candidates) for key, candidates in names.ambiguous.items()},
+        'unresolved': {dep: sorted(set(referrers)) for dep, referrers in unresolved.items()}
+    }
+
+def filter_graph_levels(G: nx.DiGraph, include_levels: List[str]) -> nx.DiGraph:
+    """Return the subgraph of G induced by the nodes at include_levels.
     
-    # Choose layout algorithm with improved positioning
+    Gives the same graph as building with include_levels directly, so one fully
+    loaded graph can serve several viewpoints.
+    """
+    keep = [n for n, level in G.nodes(data='level') if level in include_levels]
+    kept = set(keep)
+    # Rebuild explicitly rather than via G.subgraph(), whose node order follows set iteration
+    view = nx.DiGraph()
+    view.graph.update(G.graph)
+    view.add_nodes_from((n, G.nodes[n]) for n in keep)
+    view.add_edges_from((u, v, d) for u, v, d in G.edges(keep, data=True) if v in kept)
+    resolution = G.graph.get('name_resolution')
+    if resolution is not None:
+        unresolved = {}
+        for dep, referrers in resolution['unresolved'].items():
+            kept = [r for r in referrers if r in view]
+            if kept:
+                unresolved[dep] = kept
+        view.graph['name_resolution'] = {'ambiguous': resolution['ambiguous'], 'unresolved': unresolved}
+    return view
+
+# --- STEP 3: Visualize the graph ---
+def compute_layout(G: nx.DiGraph, layout: str) -> dict:
+    """Node positions of G for a layout algorithm (before visualize_graph scales them)."""
     if layout == 'spectral':
         pos = nx.spectral_layout(G, scale=2.0)
     elif layout == 'circular':
@@ -178,106 +401,52 @@ def visualize_graph(G: nx.DiGraph, out_file: str = None, title: str = 'System Ar
             pos = create_custom_hierarchical_layout(G)
     elif layout == 'custom_hierarchical':
         pos = create_custom_hierarchical_layout(G)
+    elif layout == 'multilevel':
+        # Scales to graphs with tens of thousands of nodes (see force_layout.py)
+        pos = multilevel_layout(G, scale=2.0)
     else:  # spring (default fallback)
         pos = nx.spring_layout(G, seed=42, k=3.0, iterations=100, scale=2.0)
+    return pos
+
+def visualize_graph(G: nx.DiGraph, out_file: str = None, title: str = 'System Architecture', layout: str = 'spectral',
+                    layout_cache: LayoutCache = None, draft: bool = False, max_labels: int = DEFAULT_MAX_LABELS,
+                    label_min_degree: int = 0):
+    # Increase figure size for better readability
+    plt.figure(figsize=(20, 14))
+    ax = plt.gca()
+    # Large graphs are drawn in batches with fewer labels (see graph_render.py)
+    detailed = is_detailed(G)
+    
+    # Choose layout algorithm with improved positioning; cached positions are reused per view
+    if layout_cache is not None:
+        pos = layout_cache.positions(G, layout, compute_layout, view=title)
+    else:
+        pos = compute_layout(G, layout)
     
     # Scale positions to avoid overlap
     scale_factor = max(len(G.nodes) * 0.3, 2.0)
     pos = {node: (coord[0] * scale_factor, coord[1] * scale_factor) for node, coord in pos.items()}
     
-    labels = nx.get_node_attributes(G, 'label')
-    
-    # Create color map with better contrast
-    color_map = []
-    node_sizes = []
-    
-    for n in G.nodes:
-        node_data = G.nodes[n].get('raw', {})
-        level = G.nodes[n].get('level', 'unknown')
-        implementation_status = node_data.get('implementation_status', 'existing')
-        
-        # Set node size based on hierarchy level
-        if level == 'system_of_systems':
-            size = 3000
-        elif level == 'system':
-            size = 2500
-        elif level == 'service':
-            size = 2000
-        elif level == 'package':
-            size = 1500
-        elif level == 'module':
-            size = 1200
-        else:
-            size = 1500
-        node_sizes.append(size)
-        
-        # Choose base color by level with better contrast
-        if level == 'system_of_systems':
-            base_color = '#003049'  # Dark blue
-        elif level == 'system':
-            base_color = '#219ebc'  # Blue
-        elif level == 'service':
-            base_color = '#ffb703'  # Orange
-        elif level == 'package':
-            base_color = '#8ecae6'  # Light blue
-        elif level == 'module':
-            base_color = '#fb8500'  # Dark orange
-        else:
-            base_color = '#adb5bd'  # Gray
-        
-        # Modify color based on implementation status
-        if implementation_status == 'existing':
-            # Use green tint for existing (verified) components
-            color_map.append('#2d6a4f' if level == 'system_of_systems' else
-                           '#40916c' if level == 'system' else 
-                           '#52b788' if level == 'service' else
-                           '#74c69d' if level == 'package' else
-                           '#95d5b2' if level == 'module' else '#52b788')
-        elif implementation_status == 'recommended':
-            # Use amber tint for recommended components
-            color_map.append('#f3722c' if level == 'system_of_systems' else
-                           '#f8961e' if level == 'system' else
-                           '#f9844a' if level == 'service' else
-                           '#f9c74f' if level == 'package' else
-                           '#90e0ef' if level == 'module' else '#f9c74f')
-        elif implementation_status == 'hypothetical':
-            # Use red tint for hypothetical components
-            color_map.append('#6a040f' if level == 'system_of_systems' else
-                           '#9d0208' if level == 'system' else
-                           '#d00000' if level == 'service' else
-                           '#dc2f02' if level == 'package' else
-                           '#e85d04' if level == 'module' else '#f94144')
-        else:
-            # Default to original level-based colors for unknown status
-            color_map.append(base_color)
+    # Size by hierarchy level, color by level tinted with implementation status
+    node_sizes, color_map = node_styles([G.nodes[n].get('level', 'unknown') for n in G.nodes],
+                                        [node_implementation_status(G, n) for n in G.nodes])
+    if not detailed:
+        node_sizes = node_sizes * (DETAILED_MAX_NODES / len(G))
     
     # Draw nodes with improved styling
-    nx.draw_networkx_nodes(G, pos, node_size=node_sizes, node_color=color_map, 
-                          alpha=0.9, linewidths=2, edgecolors='black')
+    nx.draw_networkx_nodes(G, pos, node_size=node_sizes, node_color=color_map, ax=ax,
+                          alpha=0.9, linewidths=2 if detailed else 0.5, edgecolors='black')
     
     # Draw labels with better positioning and styling
-    label_pos = {}
-    for node, (x, y) in pos.items():
-        label_pos[node] = (x, y)
-    
-    nx.draw_networkx_labels(G, label_pos, labels=labels, font_size=10, 
+    all_labels = nx.get_node_attributes(G, 'label')
+    labels = {n: all_labels[n] for n in label_nodes(G, None if detailed else max_labels, label_min_degree)
+              if n in all_labels}
+    nx.draw_networkx_labels(G, pos, labels=labels, font_size=10, ax=ax,
                            font_weight='bold', font_color='white',
                            bbox=dict(boxstyle="round,pad=0.3", facecolor='black', alpha=0.7))
     
     # Draw different edge types with different styles
-    dependency_edges = [(u, v) for u, v, d in G.edges(data=True) if d.get('type') == 'dependency']
-    interface_edges = [(u, v) for u, v, d in G.edges(data=True) if d.get('type') == 'interface']
-    other_edges = [(u, v) for u, v, d in G.edges(data=True) if d.get('type') not in ['dependency', 'interface']]
-    
-    if dependency_edges:
-        nx.draw_networkx_edges(G, pos, edgelist=dependency_edges, edge_color='darkred', 
-                              arrowsize=25, arrowstyle='->', width=3, alpha=0.8)
-    if interface_edges:
-        nx.draw_networkx_edges(G, pos, edgelist=interface_edges, edge_color='darkblue', 
-                              arrowsize=20, arrowstyle='->', width=2, alpha=0.7, style='dashed')
-    if other_edges:
-        nx.draw_networkx_edges(G, pos, edgelist=other_edges, edge_color='gray', 
-                              arrowsize=15, arrowstyle='->', width=1.5, alpha=0.6)
+    draw_edges(ax, G, pos, detailed)
     
     # Add a comprehensive legend
     from matplotlib.lines import Line2D
@@ -306,12 +475,12 @@ def visualize_graph(G: nx.DiGraph, out_file: str = None, title: str = 'System Ar
     plt.tight_layout()
     
     if out_file:
-        plt.savefig(out_file, dpi=300, bbox_inches='tight', facecolor='white')
+        plt.savefig(out_file, dpi=DRAFT_DPI if draft else FULL_DPI, bbox_inches='tight', facecolor='white')
         print(f"Visualization saved to {out_file}")
     
     # Only show if not in headless mode
     import matplotlib
-    if matplotlib.get_backend() != 'Agg':
+    if matplotlib.get_backend().lower() != 'agg':
         plt.show()
     else:
         plt.close()  # Close the figure to free memory
@@ -352,110 +521,23 @@ def export_graph_json(G: nx.DiGraph, out_path: str):
     print(f"Graph exported to {out_path}")
 
 # --- STEP 5: Architectural Issue Detection ---
-def detect_architectural_issues(G: nx.DiGraph) -> Dict[str, List[Dict]]:
-    """Detect common architectural issues in the system graph"""
-    issues = {
-        'circular_dependencies': [],
-        'orphaned_nodes': [],
-        'missing_interfaces': [],
-        'inconsistent_protocols': [],
-        'security_gaps': [],
-        'performance_bottlenecks': []
-    }
-    
-    # 1. Detect circular dependencies
-    try:
-        cycles = list(nx.simple_cycles(G))
-        for cycle in cycles:
-            issues['circular_dependencies'].append({
-                'cycle': cycle,
-                'description': f"Circular dependency detected: {' -> '.join(cycle + [cycle[0]])}",
-                'severity': 'critical',
-                'recommendation': 'Consider introducing async communication or refactoring service responsibilities'
-            })
-    except:
-        pass
-    
-    # 2. Find orphaned nodes (no incoming or outgoing edges)
-    for node in G.nodes():
-        in_degree = G.in_degree(node)
-        out_degree = G.out_degree(node)
-        if in_degree == 0 and out_degree == 0:
-            issues['orphaned_nodes'].append({
-                'node': node,
-                'description': f"Orphaned node '{node}' has no connections",
-                'severity': 'warning',
-                'recommendation': 'Verify if this component is needed or add appropriate interfaces'
-            })
-    
-    # 3. Check for nodes with high connectivity (potential bottlenecks)
-    avg_degree = sum(dict(G.degree()).values()) / len(G.nodes()) if len(G.nodes()) > 0 else 0
-    for node in G.nodes():
-        total_degree = G.in_degree(node) + G.out_degree(node)
-        if total_degree > max(avg_degree * 2, 5):  # Significantly above average or >5 connections
-            issues['performance_bottlenecks'].append({
-                'node': node,
-                'connections': total_degree,
-                'description': f"Node '{node}' has {total_degree} connections, potential bottleneck",
-                'severity': 'warning',
-                'recommendation': 'Consider load balancing or splitting responsibilities'
-            })
-    
-    # 4. Check for missing authentication/security interfaces
-    for node in G.nodes():
-        node_data = G.nodes[node].get('raw', {})
-        interfaces = node_data.get('interfaces', [])
-        
-        has_auth = False
-        for interface in interfaces:
-            if isinstance(interface, dict):
-                if interface.get('auth_required', False) or 'auth' in interface.get('name', '').lower():
-                    has_auth = True
-                    break
-        
-        # If node has incoming connections but no auth, flag as potential security gap
-        if G.in_degree(node) > 0 and not has_auth:
-            issues['security_gaps'].append({
-                'node': node,
-                'description': f"Node '{node}' receives connections but lacks authentication interface",
-                'severity': 'medium',
-                'recommendation': 'Add authentication/authorization interface'
-            })
-    
-    # 5. Check for inconsistent interface protocols
-    protocol_map = {}
-    for u, v, data in G.edges(data=True):
-        edge_type = data.get('type', 'unknown')
-        if edge_type not in protocol_map:
-            protocol_map[edge_type] = []
-        protocol_map[edge_type].append((u, v))
-    
-    # Look for nodes that mix protocols inconsistently
-    for node in G.nodes():
-        incoming_protocols = set()
-        outgoing_protocols = set()
-        
-        for u, v, data in G.edges(data=True):
-            protocol = data.get('type', 'unknown')
-            if v == node:
-                incoming_protocols.add(protocol)
-            if u == node:
-                outgoing_protocols.add(protocol)
-        
-        if len(incoming_protocols) > 2 or len(outgoing_protocols) > 2:
-            issues['inconsistent_protocols'].append({
-                'node': node,
-                'incoming_protocols': list(incoming_protocols),
-                'outgoing_protocols': list(outgoing_protocols),
-                'description': f"Node '{node}' uses multiple communication protocols",
-                'severity': 'info',
-                'recommendation': 'Consider standardizing on fewer protocols for consistency'
-            })
-    
-    return issues
+def detect_architectural_issues(G: nx.DiGraph, max_cycle_length: int = DEFAULT_MAX_CYCLE_LENGTH,
+                                max_cycles: int = DEFAULT_MAX_CYCLES, rules: List = None, jobs: int = 1,
+                                partition_by: str = 'component') -> Dict[str, List[Dict]]:
+    """Detect common architectural issues in the system graph
+
+    max_cycle_length and max_cycles cap the representative cycles reported per circular dependency.
+    rules replaces the default checks (see issue_rules.default_rules to extend them).
+    jobs > 1 runs the node checks per partition ('component' or 'parent_system') in a process pool,
+    when they are costly enough to pay for one (see parallel_issues.py).
+    """
+    if jobs > 1:
+        from parallel_issues import detect_issues_parallel
+        return detect_issues_parallel(G, jobs, partition_by, rules, max_cycle_length, max_cycles)
+    return IssueRuleEngine(rules, max_cycle_length, max_cycles).run(G)
 
 def export_issues_report(issues: Dict, out_path: str):
-    """Export architectural issues to a machine-readable JSON report"""
+    """Export architectural issues to a machine-readable JSON report (see issue_report.py for JSONL)"""
     
     # Count issues by severity
     severity_counts = {'critical': 0, 'warning': 0, 'medium': 0, 'info': 0}
@@ -467,21 +549,12 @@ def export_issues_report(issues: Dict, out_path: str):
             severity_counts[severity] += 1
             total_issues += 1
     
+    sections = report_summary(severity_counts)
     report = {
-        'analysis_timestamp': '2025-10-05T00:00:00Z',
-        'summary': {
-            'total_issues': total_issues,
-            'critical_issues': severity_counts['critical'],
-            'warning_issues': severity_counts['warning'],
-            'medium_issues': severity_counts['medium'],
-            'info_issues': severity_counts['info']
-        },
+        'analysis_timestamp': ANALYSIS_TIMESTAMP,
+        'summary': sections['summary'],
         'architectural_issues': issues,
-        'recommendations': {
-            'immediate_action_required': severity_counts['critical'] > 0,
-            'review_recommended': severity_counts['warning'] + severity_counts['medium'] > 0,
-            'overall_status': 'needs_attention' if total_issues > 0 else 'healthy'
-        }
+        'recommendations': sections['recommendations']
     }
     
     with open(out_path, 'w') as f:
@@ -494,24 +567,130 @@ def export_issues_report(issues: Dict, out_path: str):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Build and visualize a system-of-systems graph from an index.json")
-    parser.add_argument('index', help='Path to index.json (absolute path recommended)')
+    parser.add_argument('index', help='Path to index.json or to a packed component bundle (absolute path recommended)')
     parser.add_argument('--mode', choices=['all', 'systems', 'packages', 'components', 'modules', 'multi'], default='packages', 
                        help='Which hierarchy level(s) to include: modules (tier 3), packages/components (tier 2), systems (tier 1), all (all levels), or multi (generate multiple viewpoints)')
-    parser.add_argument('--layout', choices=['spectral', 'circular', 'shell', 'kamada', 'hierarchical', 'spring', 'custom_hierarchical'], 
+    parser.add_argument('--layout', choices=['spectral', 'circular', 'shell', 'kamada', 'hierarchical', 'spring', 'custom_hierarchical',
+                                            'multilevel'],
                        default='custom_hierarchical', help='Graph layout algorithm')
     parser.add_argument('--png', default='system_of_systems_graph.png', help='Output PNG filename (for single mode) or prefix (for multi mode)')
     parser.add_argument('--json', default='system_of_systems_graph.json', help='Output graph JSON filename')
     parser.add_argument('--issues', default='architecture_issues.json', help='Output architectural issues report filename')
+    parser.add_argument('--issues-format', choices=['json', 'jsonl'], default='json',
+                        help='Issue report format: one JSON document, or JSONL streamed as issues are found')
     parser.add_argument('--no-display', action='store_true', help='Save files only, do not display graphs')
     parser.add_argument('--analyze-issues', action='store_true', help='Perform architectural issue analysis')
+    parser.add_argument('--max-cycle-length', type=int, default=DEFAULT_MAX_CYCLE_LENGTH,
+                        help='Longest cycle (in nodes) reported for a circular dependency')
+    parser.add_argument('--max-cycles', type=int, default=DEFAULT_MAX_CYCLES,
+                        help='Representative cycles reported per circular dependency')
+    parser.add_argument('--path-load', action='store_true',
+                        help='Also report choke points by sampled betweenness (estimated shortest-path load)')
+    parser.add_argument('--path-load-samples', type=int, default=DEFAULT_BETWEENNESS_SAMPLES,
+                        help='BFS sources sampled for --path-load')
+    parser.add_argument('--path-load-seed', type=int, default=DEFAULT_BETWEENNESS_SEED, help='Random seed for --path-load')
+    parser.add_argument('--path-load-budget', type=float, default=DEFAULT_BETWEENNESS_BUDGET,
+                        help='Seconds allowed for --path-load sampling')
+    parser.add_argument('--path-load-top', type=int, default=10, help='Highest-load nodes considered by --path-load')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Processes for issue analysis; >1 runs node checks per graph partition in parallel')
+    parser.add_argument('--partition-by', choices=['component', 'parent_system'], default='component',
+                        help='How --jobs partitions the graph: weakly connected component or parent_system')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help='Number of threads used to read component files (1 = sequential)')
+    parser.add_argument('--parse-processes', type=int, default=0,
+                       help='Parse component JSON in a process pool of this size (0 = parse in the reading threads)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the parsed-component cache next to index.json')
+    parser.add_argument('--rebuild-cache', action='store_true', help='Discard and rebuild the parsed-component cache')
+    parser.add_argument('--no-layout-cache', action='store_true',
+                        help='Compute every layout from scratch instead of reusing cached node positions')
+    parser.add_argument('--rebuild-layout-cache', action='store_true',
+                        help='Discard the cached node positions and store freshly computed ones')
+    parser.add_argument('--draft', action='store_true', help=f'Save images at {DRAFT_DPI} dpi instead of {FULL_DPI}')
+    parser.add_argument('--max-labels', type=int, default=DEFAULT_MAX_LABELS,
+                        help=f'Most node labels drawn on graphs above {DETAILED_MAX_NODES} nodes (best-connected first)')
+    parser.add_argument('--label-min-degree', type=int, default=0, help='Do not label nodes with fewer edges than this')
+    parser.add_argument('--stream-index', action='store_true',
+                       help='Parse index.json incrementally and start loading components before it is fully read')
+    parser.add_argument('--lean-nodes', action='store_true',
+                       help='Keep only analysis/rendering attributes on nodes instead of the full parsed documents')
+    parser.add_argument('--watch', action='store_true',
+                       help='Keep running and update the graph JSON (and issues report) when component files change')
+    parser.add_argument('--poll-interval', type=float, default=0.5, help='Seconds between change checks in --watch mode')
+    parser.add_argument('--debounce', type=float, default=0.3,
+                       help='Seconds files must stay unchanged before a batch of changes is applied in --watch mode')
     args = parser.parse_args()
 
+    issue_rules = default_rules(args.max_cycle_length, args.max_cycles)
+    if args.path_load:
+        issue_rules.append(path_load_rule(args.path_load_samples, args.path_load_seed, args.path_load_budget,
+                                          args.path_load_top))
+
+    def save_issues(G, out_name, issues=None):
+        """Analyze G (unless issues are given) and write the report in --issues-format next to the index."""
+        if args.issues_format == 'json':
+            if issues is None:
+                issues = detect_architectural_issues(G, rules=issue_rules, jobs=args.jobs, partition_by=args.partition_by)
+            export_issues_report(issues, os.path.join(index_dir, out_name))
+            return
+        if out_name.endswith('.json'):
+            out_name += 'l'
+        if issues is not None:
+            items = iter_report_items(issues)
+        elif args.jobs > 1:
+            items = iter_report_items(detect_architectural_issues(G, rules=issue_rules, jobs=args.jobs,
+                                                                  partition_by=args.partition_by))
+        else:
+            # Each issue is written as soon as its rule finds it
+            items = IssueRuleEngine(issue_rules).iter_issues(G)
+        stream_issues_report(items, os.path.join(index_dir, out_name))
+
     # Resolve absolute path to index file and its containing directory
     index_path = os.path.abspath(args.index)
     index_dir = os.path.dirname(index_path)
     
-    index = load_service_architecture_index(index_path)
-    print(f"Loaded {len(index)} components from index")
+    # Levels of the selected mode; sub-indexes without components at these levels are not loaded
+    if args.mode == 'multi':
+        include_levels = None
+    elif args.mode == 'all':
+        include_levels = ['system_of_systems', 'system', 'service', 'package', 'module']
+    elif args.mode == 'systems':
+        include_levels = ['system', 'service']
+    elif args.mode == 'components':
+        include_levels = ['package']
+    elif args.mode == 'modules':
+        include_levels = ['module', 'package']  # Include parent packages for context
+    else:  # packages (default)
+        include_levels = ['package']
+
+    bundle = None
+    cache = None
+    if args.watch and args.mode == 'multi':
+        parser.error('--watch supports a single --mode, not multi')
+    if args.watch and is_bundle(index_path):
+        parser.error('--watch needs index.json; a bundle does not change in place')
+    if is_bundle(index_path):
+        bundle = ComponentBundle(index_path)
+        print(f"Loaded {len(bundle)} components from bundle")
+    elif args.stream_index:
+        index = iter_service_architecture_index(index_path, include_levels, workers=args.workers)
+        print(f"Streaming components from index {index_path}")
+    else:
+        index = load_service_architecture_index(index_path, include_levels, workers=args.workers)
+        print(f"Loaded {len(index)} components from index")
+    if bundle is None and not args.no_cache:
+        cache = ComponentCache.for_index(index_path, rebuild=args.rebuild_cache)
+    layout_cache = None
+    if not args.no_layout_cache:
+        layout_cache = LayoutCache.for_index(index_path, rebuild=args.rebuild_layout_cache)
+    render_options = {'draft': args.draft, 'max_labels': args.max_labels, 'label_min_degree': args.label_min_degree}
+
+    def load_graph(include_levels):
+        if bundle is not None:
+            return build_bundle_graph(bundle, include_levels, lean=args.lean_nodes)
+        return build_system_graph(index, include_levels=include_levels, index_dir=index_dir,
+                                  workers=args.workers, parse_processes=args.parse_processes, cache=cache,
+                                  lean=args.lean_nodes)
 
     # Configure matplotlib for headless operation if requested
     if args.no_display:
@@ -527,10 +706,11 @@ if __name__ == "__main__":
     ]
 
     if args.mode == 'multi':
-        # Generate multiple viewpoints
+        # Load and classify every component once, then derive each viewpoint from the full graph
+        full_graph = load_graph(None)
         for viewpoint in viewpoints:
             include_levels = viewpoint['levels']
-            G = build_system_graph(index, include_levels=include_levels, index_dir=index_dir)
+            G = filter_graph_levels(full_graph, include_levels)
             
             if len(G.nodes()) == 0:
                 print(f"Skipping {viewpoint['mode']} view - no nodes at specified levels")
@@ -544,12 +724,14 @@ if __name__ == "__main__":
             title = f"{viewpoint['title']} - {args.layout} layout"
             
             if not args.no_display:
-                visualize_graph(G, out_file=out_png, title=title, layout=args.layout)
+                visualize_graph(G, out_file=out_png, title=title, layout=args.layout, layout_cache=layout_cache,
+                                **render_options)
             else:
                 # Save without displaying
                 import matplotlib.pyplot as plt
                 plt.ioff()  # Turn off interactive mode
-                visualize_graph(G, out_file=out_png, title=title, layout=args.layout)
+                visualize_graph(G, out_file=out_png, title=title, layout=args.layout, layout_cache=layout_cache,
+                                **render_options)
                 plt.close('all')
             
             export_graph_json(G, out_json)
@@ -557,24 +739,17 @@ if __name__ == "__main__":
             
             # Perform issue analysis if requested
             if args.analyze_issues:
-                issues = detect_architectural_issues(G)
-                issues_file = os.path.join(index_dir, f"issues_{viewpoint['mode']}.json")
-                export_issues_report(issues, issues_file)
+                save_issues(G, f"issues_{viewpoint['mode']}.json")
     
     else:
         # Single mode operation
-        if args.mode == 'all':
-            include_levels = ['system_of_systems', 'system', 'service', 'package', 'module']
-        elif args.mode == 'systems':
-            include_levels = ['system', 'service']
-        elif args.mode == 'components':
-            include_levels = ['package']
-        elif args.mode == 'modules':
-            include_levels = ['module', 'package']  # Include parent packages for context
-        else:  # packages (default)
-            include_levels = ['package']
-
-        G = build_system_graph(index, include_levels=include_levels, index_dir=index_dir)
+        if args.watch:
+            from graph_watch import IncrementalSystemGraph, watch_system
+            watched = IncrementalSystemGraph(index_path, include_levels, lean=args.lean_nodes,
+                                             workers=args.workers, cache=cache)
+            G = watched.G
+        else:
+            G = load_graph(include_levels)
         
         # Write output files in the same directory as the index
         out_json = os.path.join(index_dir, args.json)
@@ -582,21 +757,47 @@ if __name__ == "__main__":
         title = f"System Architecture ({args.mode}) - {args.layout} layout"
         
         if not args.no_display:
-            visualize_graph(G, out_file=out_png, title=title, layout=args.layout)
+            visualize_graph(G, out_file=out_png, title=title, layout=args.layout, layout_cache=layout_cache,
+                            **render_options)
         else:
             # Save without displaying
             import matplotlib.pyplot as plt
             plt.ioff()  # Turn off interactive mode
-            visualize_graph(G, out_file=out_png, title=title, layout=args.layout)
+            visualize_graph(G, out_file=out_png, title=title, layout=args.layout, layout_cache=layout_cache,
+                            **render_options)
             plt.close('all')
         
         export_graph_json(G, out_json)
         print(f"Nodes kept ({args.mode}): {len(G.nodes())}; Edges: {len(G.edges())}")
         
         # Perform issue analysis if requested
-        if args.analyze_issues:
-            issues = detect_architectural_issues(G)
-            issues_file = os.path.join(index_dir, args.issues)
-            export_issues_report(issues, issues_file)
+        if args.analyze_issues and args.watch:
+            # Later updates only re-evaluate what the changed components can affect
+            from incremental_issues import IncrementalIssueDetector
+            detector = IncrementalIssueDetector(issue_rules)
+            save_issues(G, args.issues, detector.detect(G))
+            watched.take_touched()
+        elif args.analyze_issues:
+            save_issues(G, args.issues)
+
+        if args.watch:
+            def on_update(state, updated, elapsed):
+                print(f"Updated {len(updated)} component(s) in {elapsed:.3f}s: "
+                      f"{len(state.G.nodes())} nodes, {len(state.G.edges())} edges")
+                export_graph_json(state.G, out_json)
+                if args.analyze_issues:
+                    save_issues(state.G, args.issues, detector.detect(state.G, state.take_touched()))
+
+            shards = f", {len(watched.shard_paths)} sub-indexes" if watched.shard_paths else ''
+            print(f"Watching {index_path}{shards} and {len(watched.paths)} component files (Ctrl+C to stop)")
+            try:
+                watch_system(watched, on_update, interval=args.poll_interval, debounce=args.debounce)
+            except KeyboardInterrupt:
+                print("Stopped watching")
 
+    if cache is not None:
+        print(cache.summary())
+    if layout_cache is not None:
+        layout_cache.save()
+        print(layout_cache.summary())
     print("Graph generation complete!")
@@ -0,0 +1,93 @@
+"""Shared fixtures; the tools import each other as top-level modules, so their directory goes on sys.path."""
+
+import os
+import sys
+import json
+import random
+import contextlib
+import io
+
+import networkx as nx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_graph import make_synthetic_components  # noqa: E402
+from system_of_systems_graph import graph_from_components  # noqa: E402
+
+
+def synthetic_graph(count: int, seed: int = 42, lean: bool = True, **kwargs):
+    """System graph of count synthetic components, without the name-resolution warnings."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return graph_from_components(make_synthetic_components(count, seed, **kwargs), lean=lean)
+
+
+def varied_graph(seed):
+    """A synthetic system with hubs, mixed protocols and orphans, so that every node check fires."""
+    G = synthetic_graph(200, seed=seed, avg_dependencies=2)
+    rng = random.Random(seed)
+    nodes = list(G)
+    for hub in rng.sample(nodes, 5):
+        for other in rng.sample(nodes, 12):
+            if other != hub:
+                G.add_edge(hub, other, type=rng.choice(['dependency', 'interface', 'event', 'rpc']))
+    G.add_nodes_from(f"orphan_{i}" for i in range(4))
+    return G
+
+
+def write_system(directory, components, index_name='index.json'):
+    """Write one file per component and an index.json listing them; returns the index path."""
+    os.makedirs(os.path.join(directory, 'components'), exist_ok=True)
+    for service_id, data in components.items():
+        with open(os.path.join(directory, 'components', f"{service_id}.json"), 'w') as f:
+            json.dump(data, f)
+    index_path = os.path.join(directory, index_name)
+    with open(index_path, 'w') as f:
+        json.dump({service_id: f"components/{service_id}.json" for service_id in components}, f)
+    return index_path
+
+
+def call_graph(seed, count=60, density=0.08):
+    """A random acyclic call graph with the attributes build_call_graph produces."""
+    rng = random.Random(seed)
+    C = nx.DiGraph()
+    for i in range(count):
+        C.add_node(f"s{i}", label=f"s{i}", latency_ms=float(rng.randint(1, 50)), latency_source='timeout',
+                   latency_samples=None, concurrency=None,
+                   capacity_rps=rng.choice([None, float(rng.randint(50, 1000))]))
+    for i in range(count):
+        for j in range(i + 1, count):
+            if rng.random() < density:
+                C.add_edge(f"s{i}", f"s{j}", pattern=rng.choice(['synchronous'] * 3 + ['asynchronous']),
+                           latency_ms=float(rng.randint(1, 80)), latency_source='timeout', latency_samples=None,
+                           capacity_rps=rng.choice([None, None, float(rng.randint(50, 500))]),
+                           max_retries=rng.choice([None, 0, 1, 2]), contract=None)
+    return C
+
+
+def synchronous_calls(C):
+    """The synchronous calls of a call graph, with every service."""
+    S = nx.DiGraph()
+    S.add_nodes_from(C.nodes(data=True))
+    S.add_edges_from((u, v, d) for u, v, d in C.edges(data=True) if d['pattern'] == 'synchronous')
+    return S
+
+
+def call_entries(S, count=8):
+    """The first count services that call others."""
+    return [node for node in S if S.out_degree(node)][:count]
+
+
+def path_volumes(G, entry, multiplier):
+    """Calls reaching each service per request to entry, summed over every path (G acyclic)."""
+    volume = dict.fromkeys(G, 0.0)
+    volume[entry] = 1.0
+    for u in nx.topological_sort(G):
+        for v, data in G[u].items():
+            volume[v] += volume[u] * multiplier(data)
+    return {node: calls for node, calls in volume.items() if calls and node != entry}
+
+
+@pytest.fixture
+def small_system():
+    return synthetic_graph(150, seed=7)
@@ -0,0 +1,30 @@
+import networkx as nx
+import pytest
+
+from amplification_analysis import amplification_report
+from conftest import call_entries, call_graph, path_volumes
+
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_amplification_matches_path_products(seed):
+    C = call_graph(seed)
+    report = amplification_report(C, call_entries(C), failure_rate=0.5, top=len(C))
+    assert report['entry_points']
+    for result in report['entry_points']:
+        worst = path_volumes(C, result['entry'], lambda data: 1.0 + (data['max_retries'] or 0))
+        expected = path_volumes(C, result['entry'],
+                                lambda data: (1.0 - 0.5 ** ((data['max_retries'] or 0) + 1)) / 0.5)
+        assert {item['service']: item['worst_case_calls'] for item in result['downstream']} == pytest.approx(worst)
+        assert {item['service']: item['expected_calls'] for item in result['downstream']} == pytest.approx(expected)
+        assert result['worst_case_total_calls'] == pytest.approx(sum(worst.values()))
+
+
+def test_amplification_counts_a_cycle_once():
+    C = nx.DiGraph()
+    C.add_nodes_from('gabcd', label='')
+    for u, v, retries in [('g', 'a', 1), ('a', 'b', 0), ('b', 'c', 0), ('c', 'a', 0), ('c', 'd', 2)]:
+        C.add_edge(u, v, pattern='synchronous', max_retries=retries)
+    [result] = amplification_report(C, ['g'])['entry_points']
+    calls = {item['service']: item['worst_case_calls'] for item in result['downstream']}
+    assert calls == {'a': 2.0, 'b': 2.0, 'c': 2.0, 'd': 6.0}
+    assert result['worst_case_total_calls'] == 8.0
@@ -0,0 +1,59 @@
+import networkx as nx
+import pytest
+
+from capacity_analysis import capacity_report
+from conftest import call_entries, call_graph, path_volumes, synchronous_calls
+
+
+def expected_max_flow(S, entry):
+    """Max-flow from entry to every leaf, with node limits split into in/out edges; None if unbounded."""
+    N = nx.DiGraph()
+    for node, capacity in S.nodes(data='capacity_rps'):
+        N.add_edge((node, 'in'), (node, 'out'), **({'capacity': capacity} if capacity is not None else {}))
+        if S.out_degree(node) == 0:
+            N.add_edge((node, 'out'), 'sink')
+    for u, v, capacity in S.edges(data='capacity_rps'):
+        N.add_edge((u, 'out'), (v, 'in'), **({'capacity': capacity} if capacity is not None else {}))
+    try:
+        return nx.maximum_flow_value(N, (entry, 'in'), 'sink')
+    except nx.NetworkXUnbounded:
+        return None
+
+
+def expected_fan_out_bound(S, entry):
+    """Entry rate at which some limit sees its capacity, given the calls per request that reach it."""
+    calls = path_volumes(S, entry, lambda data: 1.0)
+    calls[entry] = 1.0
+    bounds = [S.nodes[node]['capacity_rps'] / n for node, n in calls.items()
+              if S.nodes[node]['capacity_rps'] is not None]
+    bounds += [capacity / calls[u] for u, v, capacity in S.edges(data='capacity_rps')
+               if capacity is not None and u in calls]
+    return min(bounds, default=None)
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_capacity_matches_max_flow_and_fan_out(seed):
+    C = call_graph(seed)
+    S = synchronous_calls(C)
+    report = capacity_report(C, call_entries(S))
+    assert report['entry_points']
+    for result in report['entry_points']:
+        entry = result['entry']
+        flow = expected_max_flow(S, entry)
+        bound = expected_fan_out_bound(S, entry)
+        assert result['max_throughput_rps'] == pytest.approx(flow)
+        assert result['fan_out_bound_rps'] == pytest.approx(bound)
+        limits = [value for value in (flow, bound) if value is not None]
+        assert result['throughput_rps'] == pytest.approx(min(limits) if limits else None)
+
+
+def test_capacity_of_a_chain_is_its_tightest_limit():
+    C = nx.DiGraph()
+    for node, capacity in [('gateway', 500.0), ('a', None), ('b', 120.0), ('c', 300.0)]:
+        C.add_node(node, label=node, capacity_rps=capacity)
+    for u, v, capacity in [('gateway', 'a', None), ('a', 'b', 200.0), ('b', 'c', 80.0)]:
+        C.add_edge(u, v, pattern='synchronous', capacity_rps=capacity, max_retries=None)
+    [result] = capacity_report(C)['entry_points']
+    assert result['entry'] == 'gateway'
+    assert result['max_throughput_rps'] == result['fan_out_bound_rps'] == result['throughput_rps'] == 80.0
+    assert result['saturating'][0]['from'] == 'b' and result['saturating'][0]['gain_rps'] == 40.0
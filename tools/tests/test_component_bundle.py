@@ -0,0 +1,45 @@
+import pytest
+
+from benchmark_graph import make_synthetic_components
+from component_bundle import ComponentBundle, pack_system, write_bundle
+from component_model import load_node_document
+from conftest import write_system
+from system_of_systems_graph import (
+    build_bundle_graph, build_system_graph, detect_architectural_issues, load_service_architecture_index
+)
+
+
+def test_bundle_round_trip(tmp_path):
+    components = make_synthetic_components(25, seed=12, schema_fields=3)
+    path = str(tmp_path / 'system.saabundle')
+    write_bundle(path, components, {'svc_0': 'components/svc_0.json'}, {'version': 1})
+    with ComponentBundle(path) as bundle:
+        assert list(bundle) == list(components)
+        assert dict(bundle) == components
+        assert bundle.sources == {'svc_0': 'components/svc_0.json'}
+        assert bundle.metadata == {'version': 1}
+
+
+@pytest.mark.parametrize('levels', [None, ['package']])
+def test_packed_system_builds_the_same_graph(tmp_path, levels):
+    components = make_synthetic_components(40, seed=11, schema_fields=3)
+    index_path = write_system(str(tmp_path), components)
+    from_files = build_system_graph(load_service_architecture_index(index_path), levels, str(tmp_path))
+    with ComponentBundle(pack_system(index_path, workers=2)) as bundle:
+        assert dict(bundle) == components
+        from_bundle = build_bundle_graph(bundle, levels)
+        assert list(from_bundle.nodes(data='label')) == list(from_files.nodes(data='label'))
+        assert list(from_bundle.edges(data=True)) == list(from_files.edges(data=True))
+        assert detect_architectural_issues(from_bundle) == detect_architectural_issues(from_files)
+
+        lean = build_bundle_graph(bundle, levels, lean=True)
+        assert all('raw' not in attrs for _, attrs in lean.nodes(data=True))
+        assert all(load_node_document(lean, node) == components[node] for node in lean)
+
+
+@pytest.mark.parametrize('content', [b'', b'{"components": {}}', b'X' * 64])
+def test_not_a_bundle(tmp_path, content):
+    path = tmp_path / 'index.json'
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        ComponentBundle(str(path))
@@ -0,0 +1,108 @@
+import json
+import os
+
+import pytest
+
+from benchmark_graph import make_synthetic_components
+from component_loader import ComponentCache, load_components
+from conftest import write_system
+from system_of_systems_graph import load_service_architecture_index
+
+
+@pytest.fixture
+def system(tmp_path):
+    """An index.json over one file per synthetic component; returns (index path, components)."""
+    components = make_synthetic_components(40, seed=11, schema_fields=3)
+    return write_system(str(tmp_path), components), components
+
+
+@pytest.mark.parametrize('workers, parse_processes', [(1, 0), (8, 0), (4, 2)])
+def test_components_come_back_in_index_order(system, workers, parse_processes):
+    index_path, components = system
+    index = load_service_architecture_index(index_path)
+    # Large documents first, so later reads finish before earlier ones
+    components['svc_0']['purpose'] *= 2000
+    write_system(os.path.dirname(index_path), components)
+    loaded = load_components(index, os.path.dirname(index_path), workers=workers, parse_processes=parse_processes)
+    assert list(loaded) == list(index) and loaded == components
+
+
+def test_streamed_pairs_load_like_a_dict(system):
+    index_path, components = system
+    index = load_service_architecture_index(index_path)
+    loaded = load_components(iter(index.items()), os.path.dirname(index_path), workers=4)
+    assert list(loaded) == list(index) and loaded == components
+
+
+def test_missing_and_invalid_files_are_reported_and_skipped(system, capsys):
+    index_path, components = system
+    directory = os.path.dirname(index_path)
+    os.remove(os.path.join(directory, 'components', 'svc_3.json'))
+    with open(os.path.join(directory, 'components', 'svc_4.json'), 'w') as f:
+        f.write('{"service_id": ')
+    loaded = load_components(load_service_architecture_index(index_path), directory, workers=4)
+    assert list(loaded) == [sid for sid in components if sid not in ('svc_3', 'svc_4')]
+    err = capsys.readouterr().err
+    assert 'Could not find file' in err and 'svc_3' in err
+    assert 'Invalid JSON' in err and 'svc_4' in err
+
+
+def _load(index_path, rebuild=False):
+    cache = ComponentCache.for_index(index_path, rebuild)
+    index = load_service_architecture_index(index_path)
+    return load_components(index, os.path.dirname(index_path), workers=4, cache=cache), cache.stats
+
+
+def test_cache_serves_unchanged_files(system):
+    index_path, components = system
+    loaded, stats = _load(index_path)
+    assert loaded == components and stats['parsed'] == len(components)
+    loaded, stats = _load(index_path)
+    assert loaded == components and stats['hit'] == len(components) and stats['parsed'] == 0
+
+
+def test_cache_revalidates_and_reparses_changed_files(system):
+    index_path, components = system
+    directory = os.path.dirname(index_path)
+    _load(index_path)
+    touched = os.path.join(directory, 'components', 'svc_1.json')
+    st = os.stat(touched)
+    os.utime(touched, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    edited = os.path.join(directory, 'components', 'svc_2.json')
+    components['svc_2']['purpose'] = 'changed'
+    with open(edited, 'w') as f:
+        json.dump(components['svc_2'], f)
+    os.utime(edited, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10 ** 9))
+
+    loaded, stats = _load(index_path)
+    assert loaded == components
+    assert (stats['revalidated'], stats['parsed'], stats['hit']) == (1, 1, len(components) - 2)
+
+
+def test_cache_prunes_deleted_files(system, capsys):
+    index_path, components = system
+    _load(index_path)
+    os.remove(os.path.join(os.path.dirname(index_path), 'components', 'svc_3.json'))
+    del components['svc_3']
+    loaded, stats = _load(index_path)
+    # Still listed in the index: reported, but its entry is kept
+    assert loaded == components and stats['pruned'] == 0
+    assert 'svc_3' in capsys.readouterr().err
+
+    with open(index_path, 'w') as f:
+        json.dump({service_id: f"components/{service_id}.json" for service_id in components}, f)
+    loaded, stats = _load(index_path)
+    assert loaded == components and stats['pruned'] == 1
+
+
+def test_unreadable_or_rebuilt_cache_is_ignored(system, capsys):
+    index_path, components = system
+    _load(index_path)
+    cache_path = ComponentCache.for_index(index_path).cache_path
+    with open(cache_path, 'wb') as f:
+        f.write(b'not a cache')
+    loaded, stats = _load(index_path)
+    assert loaded == components and stats['parsed'] == len(components)
+    assert 'unreadable component cache' in capsys.readouterr().err
+    loaded, stats = _load(index_path, rebuild=True)
+    assert loaded == components and stats['parsed'] == len(components)
@@ -0,0 +1,46 @@
+import random
+
+import networkx as nx
+import pytest
+
+from conftest import varied_graph
+from system_of_systems_graph import detect_architectural_issues
+
+
+def _cycle_members(issues):
+    return sorted(sorted(issue['nodes']) for issue in issues['circular_dependencies'])
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_cycle_rule_matches_strongly_connected_components(seed):
+    G = varied_graph(seed)
+    edges = list(G.edges())
+    random.Random(seed).shuffle(edges)
+    G.remove_edges_from(edges[:len(edges) * 3 // 4])
+    issues = detect_architectural_issues(G, max_cycle_length=4, max_cycles=3)
+    # A self-loop is a cycle of one, as nx.simple_cycles reports it
+    expected = sorted(sorted(c) for c in nx.strongly_connected_components(G)
+                      if len(c) > 1 or G.has_edge(next(iter(c)), next(iter(c))))
+    assert _cycle_members(issues) == expected
+    for issue in issues['circular_dependencies']:
+        # A component whose cycles are all longer than max_cycle_length reports none, flagged as truncated
+        assert len(issue['cycles']) <= 3 and (issue['cycles'] or issue['truncated'])
+        for cycle in issue['cycles']:
+            assert len(cycle) <= 4
+            assert all(G.has_edge(u, v) for u, v in zip(cycle, cycle[1:] + cycle[:1]))
+
+
+@pytest.mark.parametrize('max_length, max_cycles, expected, truncated', [
+    (4, 5, [['a', 'b', 'c']], True),
+    (6, 1, [['a', 'b', 'c']], True),
+    (6, 5, [['a', 'b', 'c'], ['d', 'e', 'f', 'a', 'b', 'c']], False),
+])
+def test_shortest_cycles_within_the_bounds(max_length, max_cycles, expected, truncated):
+    # A six-node ring with a chord closing a three-node cycle
+    G = nx.DiGraph()
+    G.add_edges_from(zip('abcdef', 'bcdefa'))
+    G.add_edge('c', 'a')
+    [issue] = detect_architectural_issues(G, max_cycle_length=max_length, max_cycles=max_cycles)['circular_dependencies']
+    assert issue['nodes'] == list('abcdef') and issue['size'] == 6
+    assert issue['cycles'] == expected and issue['cycle'] == expected[0]
+    assert issue['truncated'] is truncated
@@ -0,0 +1,59 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from force_layout import multilevel_layout
+
+
+def coords(pos, nodes=None) -> np.ndarray:
+    return np.array([pos[node] for node in (nodes if nodes is not None else pos)], dtype=float)
+
+
+def check_bounds(G, pos, scale=2.0):
+    assert set(pos) == set(G)
+    xy = coords(pos)
+    assert np.isfinite(xy).all()
+    assert np.abs(xy).max() == pytest.approx(scale)
+    assert np.allclose(xy.mean(axis=0), 0.0, atol=1e-9)
+
+
+def test_empty_and_single_node_graphs():
+    assert multilevel_layout(nx.Graph()) == {}
+    single = nx.Graph()
+    single.add_node('only')
+    assert coords(multilevel_layout(single)).tolist() == [[0.0, 0.0]]
+
+
+def test_graph_without_edges_is_spread_out():
+    G = nx.empty_graph(300)
+    pos = multilevel_layout(G)
+    check_bounds(G, pos)
+    assert len({tuple(np.round(xy, 6)) for xy in coords(pos)}) == len(G)
+
+
+def test_disconnected_parts_stay_near_the_core():
+    G = nx.grid_2d_graph(30, 30)
+    for k in range(60):
+        G.add_edge(('pair', k, 0), ('pair', k, 1))
+    G.add_nodes_from(('lone', k) for k in range(40))
+    pos = multilevel_layout(G, seed=3)
+    check_bounds(G, pos)
+    core = coords(pos, [node for node in G if not isinstance(node[0], str)])
+    # The grid keeps a good share of the picture instead of shrinking to a dot
+    assert (core.max(axis=0) - core.min(axis=0)).min() > 1.0
+    # Neighbours end up much closer than random pairs
+    grid_edges = [(u, v) for u, v in G.edges if not isinstance(u[0], str)]
+    edge_length = np.mean([np.linalg.norm(pos[u] - pos[v]) for u, v in grid_edges])
+    rng = np.random.default_rng(0)
+    nodes = list(G)
+    pairs = rng.integers(len(nodes), size=(2000, 2))
+    assert edge_length < 0.25 * np.mean([np.linalg.norm(pos[nodes[i]] - pos[nodes[j]]) for i, j in pairs])
+
+
+def test_seed_is_deterministic_and_budget_is_bounded():
+    G = nx.connected_watts_strogatz_graph(2000, 4, 0.1, seed=1)
+    first = multilevel_layout(G, seed=5)
+    assert all(np.array_equal(first[node], xy) for node, xy in multilevel_layout(G, seed=5).items())
+    # A spent budget still projects every level up to a complete layout
+    check_bounds(G, multilevel_layout(G, seed=5, time_budget=0.0), scale=2.0)
+    check_bounds(G, multilevel_layout(G.to_directed(), scale=1.0), scale=1.0)
@@ -0,0 +1,79 @@
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+import networkx as nx  # noqa: E402
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+from matplotlib.collections import LineCollection  # noqa: E402
+from matplotlib.image import imread  # noqa: E402
+from matplotlib.patches import FancyArrowPatch  # noqa: E402
+
+from conftest import synthetic_graph  # noqa: E402
+from graph_render import (  # noqa: E402
+    COLOR_TABLE, DETAILED_MAX_NODES, LEVEL_SIZES, edge_groups, label_nodes, node_styles
+)
+from system_of_systems_graph import visualize_graph  # noqa: E402
+
+
+@pytest.fixture
+def kept_figure(monkeypatch):
+    """Keep the figure visualize_graph would close, so the test can inspect it."""
+    monkeypatch.setattr(plt, 'close', lambda *args: None)
+    yield
+    plt.close('all')
+
+
+def drawn(out_file):
+    ax = plt.gcf().axes[0]
+    lines = [c for c in ax.collections if isinstance(c, LineCollection)]
+    arrows = [p for p in ax.patches if isinstance(p, FancyArrowPatch)]
+    labels = [t for t in ax.texts if t.get_text()]
+    return lines, arrows, labels, imread(out_file).shape
+
+
+def test_node_styles_and_edge_groups():
+    sizes, colors = node_styles(['system', 'module', 'nonsense'], ['existing', 'unknown', 'hypothetical'])
+    assert sizes.tolist() == [LEVEL_SIZES[1], LEVEL_SIZES[4], LEVEL_SIZES[5]]
+    assert colors == [COLOR_TABLE[1, 1], COLOR_TABLE[0, 4], COLOR_TABLE[3, 5]]
+    G = nx.DiGraph([('a', 'b', {'type': 'dependency'}), ('b', 'c', {'type': 'event'}), ('c', 'a', {})])
+    assert edge_groups(G) == {'dependency': [('a', 'b')], 'interface': [], None: [('b', 'c'), ('c', 'a')]}
+
+
+def test_label_nodes_keeps_the_best_connected_in_node_order():
+    G = nx.star_graph(6)
+    G.add_edge(1, 2)
+    G.add_node(99)
+    assert label_nodes(G, max_labels=3) == [0, 1, 2]
+    assert label_nodes(G, min_degree=1) == list(range(7))
+
+
+def test_large_graph_is_drawn_in_batches(tmp_path, kept_figure):
+    G = synthetic_graph(DETAILED_MAX_NODES + 300, seed=11)
+    out_file = str(tmp_path / 'large.png')
+    visualize_graph(G, out_file, layout='multilevel', draft=True, max_labels=25)
+    lines, arrows, labels, shape = drawn(out_file)
+    assert not arrows and lines
+    assert sum(len(c.get_segments()) for c in lines) == G.number_of_edges()
+    assert 0 < len(labels) <= 25
+    # Draft DPI: the 20 x 14 inch figure is about 2000 pixels wide before the tight crop
+    assert 1000 < shape[1] <= 2000
+
+
+def test_small_graph_is_drawn_in_detail(tmp_path, kept_figure):
+    G = synthetic_graph(40, seed=12)
+    out_file = str(tmp_path / 'small.png')
+    visualize_graph(G, out_file, layout='circular', draft=True)
+    lines, arrows, labels, _ = drawn(out_file)
+    assert len(arrows) == G.number_of_edges() and not lines
+    assert len(labels) == G.number_of_nodes()
+
+
+def test_render_closes_its_figure_under_agg(tmp_path, monkeypatch):
+    # Chosen automatically on a machine without a display, the backend is reported in lower case
+    monkeypatch.setattr(matplotlib, 'get_backend', lambda: 'agg')
+    plt.close('all')
+    visualize_graph(synthetic_graph(30, seed=13), str(tmp_path / 'closed.png'), layout='circular', draft=True)
+    assert not plt.get_fignums()
+    assert np.asarray(imread(str(tmp_path / 'closed.png'))).size
@@ -0,0 +1,149 @@
+import json
+import os
+import random
+
+import pytest
+
+from benchmark_graph import make_synthetic_components
+from conftest import write_system
+from graph_watch import IncrementalSystemGraph
+from system_of_systems_graph import build_system_graph, load_service_architecture_index
+
+LEVELS = ['system', 'package']
+
+
+class System:
+    """Component files and an index.json under a directory, edited the way a user would."""
+
+    def __init__(self, directory, components):
+        self.directory = directory
+        self.components = components
+        self.order = list(components)
+        self.index_path = write_system(directory, components)
+        self.tick = 0
+
+    def _bump(self, path):
+        # Distinct mtimes even on filesystems with coarse timestamps
+        self.tick += 1
+        os.utime(path, ns=(0, 10 ** 18 + self.tick * 10 ** 9))
+
+    def path(self, service_id):
+        return os.path.join(self.directory, 'components', f"{service_id}.json")
+
+    def write(self, service_id, data):
+        self.components[service_id] = data
+        with open(self.path(service_id), 'w') as f:
+            json.dump(data, f)
+        self._bump(self.path(service_id))
+
+    def write_index(self, entries=None):
+        entries = entries or {sid: f"components/{sid}.json" for sid in self.order}
+        with open(self.index_path, 'w') as f:
+            json.dump(entries, f)
+        self._bump(self.index_path)
+
+    def fresh_graph(self):
+        return build_system_graph(load_service_architecture_index(self.index_path), LEVELS, self.directory)
+
+
+def _apply(state, before):
+    after = state.snapshot()
+    changed = {path for path in set(before) | set(after) if before.get(path) != after.get(path)}
+    assert changed
+    state.apply_changes(changed)
+
+
+def _assert_matches_fresh_build(state, system):
+    fresh = system.fresh_graph()
+    assert list(state.G.nodes(data=True)) == list(fresh.nodes(data=True))
+    assert list(state.G.edges(data=True)) == list(fresh.edges(data=True))
+    assert state.G.graph['name_resolution'] == fresh.graph['name_resolution']
+
+
+@pytest.fixture
+def system(tmp_path):
+    components = make_synthetic_components(80, seed=3, schema_fields=2)
+    # Only system and package levels are kept; some components switch level below
+    for i, data in enumerate(components.values()):
+        data['hierarchical_tier'] = 'tier_1_systems' if i % 5 == 0 else 'tier_2_components'
+    return System(str(tmp_path), components)
+
+
+def test_edits_adds_removals_and_index_changes_match_a_fresh_build(system, capsys):
+    held_back = system.order.pop(20)
+    system.write_index()
+    state = IncrementalSystemGraph(system.index_path, LEVELS)
+    _assert_matches_fresh_build(state, system)
+    rng = random.Random(0)
+
+    steps = [
+        # Edit: new dependencies
+        lambda: system.write('svc_5', {**system.components['svc_5'], 'dependencies': ['svc_7', 'svc_40']}),
+        # Edit: rename, so references to the old and new name resolve differently
+        lambda: system.write('svc_9', {**system.components['svc_9'], 'service_name': 'svc 11'}),
+        # Edit: move out of the kept levels, and back
+        lambda: system.write('svc_12', {**system.components['svc_12'], 'hierarchical_tier': 'tier_3_internal_modules'}),
+        lambda: system.write('svc_12', {**system.components['svc_12'], 'hierarchical_tier': 'tier_2_components'}),
+        # Add: a component inserted in the middle of the index
+        lambda: (system.order.insert(10, held_back), system.write_index()),
+        # Remove: a file deleted while still listed, then dropped from the index
+        lambda: os.remove(system.path('svc_30')),
+        lambda: (system.order.remove('svc_30'), system.write_index()),
+        # Index change: reordered entries
+        lambda: (rng.shuffle(system.order), system.write_index()),
+        # Index change: an entry moved to another file
+        lambda: (system.write('svc_moved', {**system.components['svc_41'], 'dependencies': ['svc_2']}),
+                 system.write_index({**{sid: f"components/{sid}.json" for sid in system.order},
+                                     'svc_41': 'components/svc_moved.json'})),
+    ]
+    for step in steps:
+        before = state.snapshot()
+        step()
+        _apply(state, before)
+        _assert_matches_fresh_build(state, system)
+
+
+def test_unparsable_edit_keeps_the_previous_version(system, capsys):
+    state = IncrementalSystemGraph(system.index_path, LEVELS)
+    before = state.snapshot()
+    expected = list(state.G.edges(data=True))
+    with open(system.path('svc_3'), 'w') as f:
+        f.write('{"service_id": "svc_3", ')
+    system._bump(system.path('svc_3'))
+    assert state.apply_changes({system.path('svc_3')}) == set()
+    assert list(state.G.edges(data=True)) == expected
+    captured = capsys.readouterr()
+    assert 'keeping previous version of svc_3' in captured.err and 'Warning' not in captured.out
+    assert state.snapshot() != before
+
+
+def test_sub_index_edits_are_watched(tmp_path):
+    components = make_synthetic_components(30, seed=4, schema_fields=2)
+    for data in components.values():
+        data['hierarchical_tier'] = 'tier_2_components'
+    shard = {sid: components[sid] for sid in list(components)[20:]}
+    root = {sid: components[sid] for sid in list(components)[:20]}
+    shard_index = write_system(str(tmp_path / 'shard'), shard)
+    system = System(str(tmp_path), root)
+    system.write_index({**{sid: f"components/{sid}.json" for sid in root}, 'shard': 'shard/index.json'})
+
+    def fresh():
+        return build_system_graph(load_service_architecture_index(system.index_path), LEVELS, system.directory)
+
+    state = IncrementalSystemGraph(system.index_path, LEVELS)
+    assert state.shard_paths == {shard_index}
+    assert list(state.G) == list(fresh())
+
+    # A component added to the shard only: index.json itself is unchanged
+    added = {**components['svc_3'], 'service_id': 'svc_new', 'service_name': 'svc new', 'dependencies': ['svc_25']}
+    with open(tmp_path / 'shard' / 'components' / 'svc_new.json', 'w') as f:
+        json.dump(added, f)
+    before = state.snapshot()
+    with open(shard_index, 'w') as f:
+        json.dump({**{sid: f"components/{sid}.json" for sid in shard}, 'svc_new': 'components/svc_new.json'}, f)
+    system._bump(shard_index)
+    _apply(state, before)
+    assert 'svc_new' in state.G and state.G.has_edge('svc_new', 'svc_25')
+    expected = fresh()
+    assert list(state.G.nodes(data=True)) == list(expected.nodes(data=True))
+    assert list(state.G.edges(data=True)) == list(expected.edges(data=True))
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from conftest import synthetic_graph
+from incremental_issues import IncrementalIssueDetector
+from system_of_systems_graph import detect_architectural_issues
+
+
+def _random_edits(G, rng, steps):
+    """Yield the changed endpoints of steps batches of random edge additions and removals."""
+    nodes = list(G)
+    for _ in range(steps):
+        changed = set()
+        for _ in range(rng.randint(1, 4)):
+            if rng.random() < 0.5 and G.number_of_edges():
+                u, v = rng.choice(list(G.edges()))
+                G.remove_edge(u, v)
+            else:
+                u, v = rng.sample(nodes, 2)
+                G.add_edge(u, v, type=rng.choice(['dependency', 'interface']))
+            changed |= {u, v}
+        yield changed
+
+
+@pytest.mark.parametrize('kept_edges', [1.0, 0.3, 0.2])
+def test_incremental_report_equals_full_report(kept_edges):
+    G = synthetic_graph(250, seed=5, avg_dependencies=2)
+    rng = random.Random(0)
+    edges = list(G.edges())
+    rng.shuffle(edges)
+    # Sparser graphs have many small cycles instead of one giant component
+    G.remove_edges_from(edges[int(len(edges) * kept_edges):])
+
+    detector = IncrementalIssueDetector()
+    assert detector.detect(G) == detect_architectural_issues(G)
+    for changed in _random_edits(G, rng, 60):
+        assert detector.detect(G, changed) == detect_architectural_issues(G)
+
+
+def test_node_removal_is_carried_through():
+    G = synthetic_graph(120, seed=3)
+    detector = IncrementalIssueDetector()
+    detector.detect(G)
+    victim = max(G, key=G.degree)
+    changed = {victim, *G.successors(victim), *G.predecessors(victim)}
+    G.remove_node(victim)
+    assert detector.detect(G, changed) == detect_architectural_issues(G)
@@ -0,0 +1,165 @@
+import functools
+import io
+import json
+import os
+
+import pytest
+
+import system_of_systems_graph
+from system_of_systems_graph import (
+    _JsonEventReader, iter_service_architecture_index, load_service_architecture_index
+)
+
+TRICKY = {
+    'quote"in key': 'value with \\"escaped\\" quotes and a \\\\ backslash',
+    'braces': '{"not": ["an", "object"]} }}} {{{',
+    'unicode': 'café \U0001F600  ',
+    'numbers': [0, -1, 1234567890123, 3.25e-7, 1e308],
+    'literals': [True, False, None],
+    'nested': {'a': {'b': [{'c': 'd'}, []]}, 'e': {}},
+    '': 12345,
+}
+
+
+def _read_object(reader):
+    """Rebuild a top-level object through members() and value(), as the index reader walks it."""
+    return {key: reader.value() for key in reader.members()}
+
+
+@pytest.mark.parametrize('chunk_size', list(range(1, 18)) + [31, 64])
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+def test_reader_matches_json_load_at_every_chunk_boundary(chunk_size, ensure_ascii):
+    text = json.dumps(TRICKY, ensure_ascii=ensure_ascii, indent=1)
+    reader = _JsonEventReader(io.StringIO(text), chunk_size=chunk_size)
+    assert _read_object(reader) == json.loads(text)
+    assert reader.peek() == ''
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5])
+def test_number_at_the_end_of_a_chunk_is_not_cut_short(chunk_size):
+    text = '{"a":123456789,"b":-0.5e10,"c":true}'
+    assert _read_object(_JsonEventReader(io.StringIO(text), chunk_size=chunk_size)) == json.loads(text)
+
+
+def test_empty_object_and_invalid_input():
+    assert _read_object(_JsonEventReader(io.StringIO(' { } '), chunk_size=1)) == {}
+    with pytest.raises(ValueError):
+        _read_object(_JsonEventReader(io.StringIO('{"a" 1}'), chunk_size=2))
+    with pytest.raises(ValueError):
+        _read_object(_JsonEventReader(io.StringIO('{"a": "unterminated'), chunk_size=4))
+
+
+def _write(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    return str(path)
+
+
+def _write_at(root, relative, data):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return _write(path, data)
+
+
+STRUCTURED = {
+    'system_name': 'Quoted "name" {with braces}',
+    'components': {f"svc_{i}": f"components/svc_{i}\\u00e9.json" for i in range(30)},
+    'metadata': {'components': 'not these'},
+}
+
+FLAT = {
+    'version': '2',
+    'description': 'Flat index, "escaped" }',
+    **{f"svc_{i}": f"components/svc_{i}.json" for i in range(30)},
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 16])
+@pytest.mark.parametrize('data', [STRUCTURED, FLAT], ids=['structured', 'flat'])
+def test_streamed_index_equals_loaded_index(tmp_path, monkeypatch, chunk_size, data):
+    index_path = _write(tmp_path / 'index.json', data)
+    monkeypatch.setattr(system_of_systems_graph, '_JsonEventReader',
+                        functools.partial(_JsonEventReader, chunk_size=chunk_size))
+    streamed = list(iter_service_architecture_index(index_path))
+    assert streamed == list(load_service_architecture_index(index_path).items())
+    assert len(streamed) == 30
+
+
+def test_streamed_index_rejects_a_list(tmp_path):
+    index_path = _write(tmp_path / 'index.json', ['svc_0'])
+    with pytest.raises(ValueError):
+        list(iter_service_architecture_index(index_path))
+
+
+def _sharded_index(root):
+    """A structured index with a nested shard and a shard declared as module-only; returns the index path."""
+    _write_at(root, 'systems/deep/index.json', {'deep_a': 'deep_a.json'})
+    _write_at(root, 'systems/index.json', {'levels': ['system', 'package'],
+                                           'components': {'sys_a': 'sys_a.json', 'nested': 'deep/index.json'}})
+    _write_at(root, 'modules/index.json', {'components': {'mod_a': 'mod_a.json'}})
+    return _write_at(root, 'index.json', {'system_name': 'sharded', 'components': {
+        'root_a': 'components/root_a.json',
+        'systems': 'systems/index.json',
+        'modules': {'index': 'modules/index.json', 'levels': ['module']},
+        'root_b': 'components/root_b.json',
+    }})
+
+
+def _opened_files(monkeypatch):
+    """Record every file system_of_systems_graph opens."""
+    opened = []
+
+    def tracking_open(path, *args, **kwargs):
+        opened.append(os.path.abspath(path))
+        return open(path, *args, **kwargs)
+    monkeypatch.setattr(system_of_systems_graph, 'open', tracking_open, raising=False)
+    return opened
+
+
+def test_shards_expand_in_entry_order(tmp_path):
+    index_path = _sharded_index(tmp_path)
+    shards = set()
+    index = load_service_architecture_index(index_path, shard_paths=shards)
+    assert index == {
+        'root_a': 'components/root_a.json',
+        'root_b': 'components/root_b.json',
+        'sys_a': str(tmp_path / 'systems/sys_a.json'),
+        'deep_a': str(tmp_path / 'systems/deep/deep_a.json'),
+        'mod_a': str(tmp_path / 'modules/mod_a.json'),
+    }
+    assert list(index) == ['root_a', 'root_b', 'sys_a', 'deep_a', 'mod_a']
+    assert shards == {str(tmp_path / path) for path in
+                      ('systems/index.json', 'systems/deep/index.json', 'modules/index.json')}
+    assert list(iter_service_architecture_index(index_path)) == list(index.items())
+
+
+def test_shard_declared_for_other_levels_is_never_opened(tmp_path, monkeypatch):
+    index_path = _sharded_index(tmp_path)
+    opened = _opened_files(monkeypatch)
+    shards = set()
+    index = load_service_architecture_index(index_path, ['system'], shard_paths=shards)
+    assert list(index) == ['root_a', 'root_b', 'sys_a', 'deep_a']
+    assert str(tmp_path / 'modules/index.json') not in opened
+    assert str(tmp_path / 'modules/index.json') not in shards
+
+
+def test_shard_whose_own_levels_do_not_match_is_read_but_not_expanded(tmp_path, monkeypatch):
+    index_path = _sharded_index(tmp_path)
+    opened = _opened_files(monkeypatch)
+    shards = set()
+    assert list(load_service_architecture_index(index_path, ['module'], shard_paths=shards)) == \
+        ['root_a', 'root_b', 'mod_a']
+    # The systems shard had to be read to learn its levels; its nested shard was not
+    assert str(tmp_path / 'systems/index.json') in opened and str(tmp_path / 'systems/index.json') in shards
+    assert str(tmp_path / 'systems/deep/index.json') not in opened
+
+
+def test_missing_and_cyclic_shards_warn_and_are_skipped(tmp_path, capsys):
+    _write_at(tmp_path, 'loop/index.json', {'back': '../index.json', 'loop_a': 'loop_a.json'})
+    index_path = _write_at(tmp_path, 'index.json', {'a': 'a.json', 'gone': 'gone/index.json', 'loop': 'loop/index.json'})
+    shards = set()
+    assert list(load_service_architecture_index(index_path, shard_paths=shards)) == ['a', 'loop_a']
+    err = capsys.readouterr().err
+    assert 'Could not find sub-index' in err and 'already being loaded' in err
+    # A missing shard is still recorded, so a watcher notices when it appears
+    assert str(tmp_path / 'gone/index.json') in shards
@@ -0,0 +1,67 @@
+import json
+import os
+
+import networkx as nx
+
+from conftest import varied_graph
+from issue_report import iter_report_items, read_issues_report, read_issues_summary, stream_issues_report
+from issue_rules import IssueRuleEngine
+from system_of_systems_graph import detect_architectural_issues, export_issues_report
+
+
+def by_category(items) -> dict:
+    grouped = {}
+    for category, issue in items:
+        grouped.setdefault(category, []).append(issue)
+    return grouped
+
+
+def export_both(G: nx.DiGraph, directory) -> tuple:
+    """The JSON report of G and the path of its JSONL form streamed from the rule engine."""
+    report = export_issues_report(detect_architectural_issues(G), str(directory / 'issues.json'))
+    jsonl_path = str(directory / 'issues.jsonl')
+    stream_issues_report(IssueRuleEngine().iter_issues(G), jsonl_path)
+    return report, jsonl_path
+
+
+def test_jsonl_round_trips_to_the_json_report(tmp_path):
+    report, jsonl_path = export_both(varied_graph(8), tmp_path)
+    with open(tmp_path / 'issues.json') as f:
+        assert json.load(f) == report
+    expected = {category: issues for category, issues in report['architectural_issues'].items() if issues}
+    assert by_category(read_issues_report(jsonl_path)) == expected
+    assert os.path.getsize(jsonl_path) > 4096  # the summary sits beyond the first tail block
+    assert read_issues_summary(jsonl_path) == {
+        'summary': report['summary'],
+        'recommendations': report['recommendations'],
+        'analysis_timestamp': report['analysis_timestamp']
+    }
+    assert not os.path.exists(jsonl_path + '.tmp')
+
+
+def test_streaming_a_finished_report_gives_the_same_file(tmp_path):
+    G = varied_graph(9)
+    _, jsonl_path = export_both(G, tmp_path)
+    stream_issues_report(iter_report_items(detect_architectural_issues(G)), str(tmp_path / 'again.jsonl'))
+    assert sorted((tmp_path / 'again.jsonl').read_text().splitlines()) == \
+        sorted((tmp_path / 'issues.jsonl').read_text().splitlines())
+
+
+def test_filters_match_the_json_report(tmp_path):
+    report, jsonl_path = export_both(varied_graph(10), tmp_path)
+    issues = report['architectural_issues']
+    for severity in ('critical', 'warning', 'medium', 'info'):
+        expected = [(category, issue) for category, issue in iter_report_items(issues) if issue['severity'] == severity]
+        assert sorted(read_issues_report(jsonl_path, severities=[severity]), key=lambda item: item[0]) == \
+            sorted(expected, key=lambda item: item[0])
+    assert list(read_issues_report(jsonl_path, categories=['security_gaps'])) == \
+        [('security_gaps', issue) for issue in issues['security_gaps']]
+    assert list(read_issues_report(jsonl_path, severities=['warning'], categories=['security_gaps'])) == []
+
+
+def test_healthy_report_has_only_its_summary(tmp_path):
+    report, jsonl_path = export_both(nx.DiGraph(), tmp_path)
+    assert list(read_issues_report(jsonl_path)) == []
+    summary = read_issues_summary(jsonl_path)
+    assert summary['summary'] == report['summary'] and summary['summary']['total_issues'] == 0
+    assert summary['recommendations']['overall_status'] == 'healthy'
@@ -0,0 +1,95 @@
+from typing import Dict
+
+import networkx as nx
+import pytest
+
+from compact_graph import CompactGraph
+from component_model import node_has_auth
+from conftest import varied_graph
+from issue_rules import IssueRuleEngine, NodeRule, default_rules
+from parallel_issues import detect_issues_parallel
+from system_of_systems_graph import detect_architectural_issues
+
+NODE_CATEGORIES = ['orphaned_nodes', 'performance_bottlenecks', 'security_gaps', 'inconsistent_protocols']
+
+
+def per_check_issues(G: nx.DiGraph) -> Dict[str, list]:
+    """The node checks as detect_architectural_issues ran them before the rule engine: one graph scan each."""
+    issues = {category: [] for category in NODE_CATEGORIES}
+    for node in G.nodes():
+        if G.in_degree(node) == 0 and G.out_degree(node) == 0:
+            issues['orphaned_nodes'].append(node)
+    avg_degree = sum(dict(G.degree()).values()) / len(G.nodes()) if len(G.nodes()) > 0 else 0
+    for node in G.nodes():
+        if G.in_degree(node) + G.out_degree(node) > max(avg_degree * 2, 5):
+            issues['performance_bottlenecks'].append(node)
+    for node in G.nodes():
+        if G.in_degree(node) > 0 and not node_has_auth(G, node):
+            issues['security_gaps'].append(node)
+    for node in G.nodes():
+        incoming = {data.get('type', 'unknown') for _, _, data in G.in_edges(node, data=True)}
+        outgoing = {data.get('type', 'unknown') for _, _, data in G.out_edges(node, data=True)}
+        if len(incoming) > 2 or len(outgoing) > 2:
+            issues['inconsistent_protocols'].append(node)
+    return issues
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_node_rules_match_per_check_scans(seed):
+    G = varied_graph(seed)
+    issues = detect_architectural_issues(G)
+    expected = per_check_issues(G)
+    for category in NODE_CATEGORIES:
+        assert [issue['node'] for issue in issues[category]] == expected[category], category
+    assert all(expected[category] for category in NODE_CATEGORIES)
+
+
+def test_empty_graph():
+    issues = detect_architectural_issues(nx.DiGraph())
+    assert set(issues) >= set(NODE_CATEGORIES) | {'circular_dependencies'}
+    assert not any(issues.values())
+
+
+def test_compact_graph_input_gives_the_same_report():
+    G = varied_graph(5)
+    assert IssueRuleEngine().run(CompactGraph.from_networkx(G)) == detect_architectural_issues(G)
+
+
+def test_registered_rule_runs_in_the_same_pass():
+    G = varied_graph(6)
+    engine = IssueRuleEngine()
+    engine.register(NodeRule('fan_out', lambda t, i: {'node': t.nodes[i], 'out_degree': int(t.out_degree[i])},
+                             lambda t: t.out_degree > 10))
+    issues = engine.run(G)
+    assert [issue['node'] for issue in issues['fan_out']] == [node for node in G if G.out_degree(node) > 10]
+    assert issues['fan_out']
+    assert {k: v for k, v in issues.items() if k != 'fan_out'} == detect_architectural_issues(G)
+
+
+def test_rules_argument_replaces_the_defaults():
+    G = varied_graph(7)
+    only_orphans = [rule for rule in default_rules() if rule.category == 'orphaned_nodes']
+    issues = detect_architectural_issues(G, rules=only_orphans)
+    assert issues['orphaned_nodes'] == detect_architectural_issues(G)['orphaned_nodes']
+    assert not issues['security_gaps'] and not issues['circular_dependencies']
+
+
+@pytest.mark.parametrize('partition_by', ['component', 'parent_system'])
+def test_parallel_pool_matches_the_single_pass(partition_by):
+    G = varied_graph(4)
+    # min_seconds=0 starts the pool even though the built-in rules are cheap
+    assert detect_issues_parallel(G, 2, partition_by, min_seconds=0) == detect_architectural_issues(G)
+
+
+def test_parallel_falls_back_to_the_single_pass_for_cheap_rules():
+    G = varied_graph(4)
+    assert detect_architectural_issues(G, jobs=2) == detect_architectural_issues(G)
+
+
+def test_unpicklable_local_rule_runs_in_the_parent(capsys):
+    G = varied_graph(6)
+    rules = default_rules() + [NodeRule('fan_out', lambda t, i: {'node': t.nodes[i]}, lambda t: t.out_degree > 10)]
+    issues = detect_issues_parallel(G, 2, rules=rules, min_seconds=0)
+    assert issues == IssueRuleEngine(rules).run(G)
+    captured = capsys.readouterr()
+    assert "rule for 'fan_out' cannot be sent" in captured.err and not captured.out
@@ -0,0 +1,34 @@
+import networkx as nx
+import pytest
+
+from conftest import call_entries, call_graph, synchronous_calls
+from latency_analysis import latency_report
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_latency_matches_longest_paths(seed):
+    C = call_graph(seed)
+    S = synchronous_calls(C)
+    report = latency_report(C, call_entries(S))
+    assert report['entry_points']
+    for result in report['entry_points']:
+        entry = result['entry']
+        reached = S.subgraph(nx.descendants(S, entry) | {entry})
+        expected = S.nodes[entry]['latency_ms'] + nx.dag_longest_path_length(reached, weight='latency_ms')
+        assert result['worst_case_latency_ms'] == pytest.approx(expected)
+        path = result['path']
+        assert nx.is_path(S, path)
+        assert S.nodes[entry]['latency_ms'] + nx.path_weight(S, path, 'latency_ms') == pytest.approx(expected)
+
+
+def test_latency_charges_each_cycle_member_once():
+    C = nx.DiGraph()
+    for node, latency in [('g', 1.0), ('a', 2.0), ('b', 4.0), ('c', 8.0), ('d', 16.0)]:
+        C.add_node(node, label=node, latency_ms=latency, latency_source='timeout')
+    for u, v in [('g', 'a'), ('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd')]:
+        C.add_edge(u, v, pattern='synchronous', latency_ms=C.nodes[v]['latency_ms'], latency_source='timeout')
+    [result] = latency_report(C, ['g'])['entry_points']
+    assert result['worst_case_latency_ms'] == 31.0
+    assert result['path'] == ['g', 'a', 'd'] and result['cycles_on_path'] == 1
+    assert {'cycle': ['a', 'b', 'c'], 'latency_ms': 12.0, 'latency_source': 'cycle'} in result['hops']
+    assert sum(hop['latency_ms'] for hop in result['hops']) == 31.0
@@ -0,0 +1,102 @@
+import json
+
+import networkx as nx
+import numpy as np
+
+from layout_cache import LAYOUT_CACHE_FILENAME, LayoutCache, graph_fingerprint
+
+
+class CountingLayout:
+    """compute callback for LayoutCache.positions that counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, G, layout):
+        self.calls += 1
+        return nx.spring_layout(G, seed=1) if layout == 'spring' else nx.circular_layout(G)
+
+
+def system(count=40, seed=3) -> nx.DiGraph:
+    G = nx.gnm_random_graph(count, count * 2, seed=seed, directed=True)
+    return nx.relabel_nodes(G, {i: f"svc_{i}" for i in G})
+
+
+def grown(G: nx.DiGraph, new=4) -> nx.DiGraph:
+    H = G.copy()
+    for k in range(new):
+        H.add_edge(f"new_{k}", f"svc_{k}")
+        if k:
+            H.add_edge(f"new_{k}", f"new_{k - 1}")
+    return H
+
+
+def test_unchanged_graph_reuses_saved_positions(tmp_path):
+    G, compute = system(), CountingLayout()
+    cache = LayoutCache(str(tmp_path / LAYOUT_CACHE_FILENAME))
+    first = cache.positions(G, 'spring', compute, view='packages')
+    cache.save()
+
+    reloaded = LayoutCache(str(tmp_path / LAYOUT_CACHE_FILENAME))
+    assert reloaded.positions(G, 'spring', compute, view='packages') == first
+    assert compute.calls == 1 and reloaded.stats == {'hit': 1, 'extended': 0, 'computed': 0}
+    # Another view or layout of the same graph is its own entry
+    reloaded.positions(G, 'circular', compute, view='packages')
+    reloaded.positions(G, 'spring', compute, view='systems')
+    assert compute.calls == 3
+
+
+def test_grown_graph_keeps_old_positions_and_places_new_nodes(tmp_path):
+    G, compute = system(), CountingLayout()
+    cache = LayoutCache(str(tmp_path / LAYOUT_CACHE_FILENAME))
+    before = cache.positions(G, 'spring', compute)
+    H = grown(G)
+    H.remove_node('svc_39')
+    after = cache.positions(H, 'spring', compute)
+
+    assert compute.calls == 1 and cache.stats['extended'] == 1
+    assert set(after) == set(H)
+    assert all(after[node] == before[node] for node in H if node in G)
+    coords = np.array(list(before.values()))
+    span = coords.max(axis=0) - coords.min(axis=0)
+    for k in range(4):
+        x, y = after[f"new_{k}"]
+        assert np.isfinite([x, y]).all()
+        assert (np.abs(np.array([x, y]) - coords.mean(axis=0)) <= 2 * span).all()
+    # The extended layout is cached like a computed one
+    assert cache.positions(H, 'spring', compute) == after and cache.stats['hit'] == 1
+
+
+def test_structural_layouts_and_large_changes_are_recomputed(tmp_path):
+    G, compute = system(), CountingLayout()
+    cache = LayoutCache(str(tmp_path / LAYOUT_CACHE_FILENAME))
+    cache.positions(G, 'circular', compute)
+    cache.positions(grown(G), 'circular', compute)
+    cache.positions(G, 'spring', compute)
+    cache.positions(grown(G, new=len(G) + 1), 'spring', compute)
+    assert compute.calls == 4 and cache.stats == {'hit': 0, 'extended': 0, 'computed': 4}
+
+
+def test_fingerprint_ignores_insertion_order():
+    G = system()
+    H = nx.DiGraph()
+    H.add_nodes_from(reversed(list(G.nodes)))
+    H.add_edges_from(reversed(list(G.edges)))
+    assert graph_fingerprint(H) == graph_fingerprint(G)
+    H.nodes['svc_0']['level'] = 'system'
+    assert graph_fingerprint(H) != graph_fingerprint(G)
+    G.add_edge('svc_0', 'svc_0')
+    assert graph_fingerprint(G) != graph_fingerprint(system())
+
+
+def test_unreadable_and_rebuilt_caches_start_empty(tmp_path, capsys):
+    path = tmp_path / LAYOUT_CACHE_FILENAME
+    path.write_text('{not json')
+    assert LayoutCache(str(path)).entries == {}
+    assert 'Ignoring unreadable layout cache' in capsys.readouterr().err
+
+    cache = LayoutCache(str(path))
+    cache.positions(system(), 'spring', CountingLayout())
+    cache.save()
+    assert json.loads(path.read_text())['entries']
+    assert LayoutCache(str(path)).entries and LayoutCache(str(path), rebuild=True).entries == {}
@@ -0,0 +1,52 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from conftest import call_graph
+from issue_report import format_ms
+from load_simulator import sample_service_times, simulation_report
+
+
+def single_service(mean_ms: float) -> nx.DiGraph:
+    C = nx.DiGraph()
+    C.add_node('gateway', label='gateway', latency_ms=mean_ms)
+    return C
+
+
+def test_a_seed_gives_the_same_report():
+    C = call_graph(4, count=30)
+    first = simulation_report(C, rate_rps=50, requests=2000, seed=3)
+    assert first == simulation_report(C, rate_rps=50, requests=2000, seed=3)
+    assert first['entry_points'] and first['summary']['total_calls'] > 2000 * len(first['entry_points'])
+    assert first != simulation_report(C, rate_rps=50, requests=2000, seed=4)
+
+
+def test_mm1_mean_sojourn_time():
+    # Arrivals at 100/s and exponential service with a 5 ms mean: W = 1 / (mu - lambda) = 10 ms, utilization 0.5
+    report = simulation_report(single_service(5.0), rate_rps=100, requests=200_000, seed=1)
+    [entry] = report['entry_points']
+    assert entry['mean_latency_ms'] == pytest.approx(10.0, rel=0.05)
+    # Sojourn time is exponential with mean W, so its median is W ln 2
+    assert entry['latency_ms']['p50'] == pytest.approx(10.0 * np.log(2), rel=0.05)
+    [service] = report['services']
+    assert service['utilization'] == pytest.approx(0.5, rel=0.05)
+
+
+def test_no_requests_gives_empty_percentiles():
+    report = simulation_report(call_graph(4, count=30), rate_rps=50, requests=0)
+    assert report['entry_points']
+    for entry in report['entry_points']:
+        assert entry['requests'] == 0 and entry['mean_latency_ms'] is None
+        assert set(entry['latency_ms'].values()) == {None}
+        assert format_ms(entry['latency_ms']['p99']) == 'n/a'
+
+
+@pytest.mark.parametrize('distribution', ['exponential', 'lognormal'])
+def test_zero_mean_means_no_service_time(distribution):
+    times = sample_service_times({'distribution': distribution, 'mean_ms': 0}, np.random.default_rng(0), 5)
+    assert times.tolist() == [0.0] * 5
+
+
+def test_unknown_distribution_is_rejected():
+    with pytest.raises(ValueError, match='Unknown service time distribution'):
+        sample_service_times({'distribution': 'pareto'}, np.random.default_rng(0), 5)
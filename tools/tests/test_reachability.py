@@ -0,0 +1,58 @@
+import random
+
+import networkx as nx
+
+from conftest import synthetic_graph
+from reachability import ReachabilityIndex
+
+
+def _assert_matches_networkx(index, G, sample):
+    for node in sample:
+        descendants, ancestors = nx.descendants(G, node), nx.ancestors(G, node)
+        assert set(index.descendants(node)) == descendants
+        assert set(index.ancestors(node)) == ancestors
+        assert index.count_descendants(node) == len(descendants)
+        assert index.count_ancestors(node) == len(ancestors)
+        for other in sample:
+            assert index.reaches(node, other) == (other in descendants or other == node)
+
+
+def _sparse_graph(seed):
+    G = synthetic_graph(300, seed=seed, avg_dependencies=2)
+    edges = list(G.edges())
+    random.Random(seed).shuffle(edges)
+    G.remove_edges_from(edges[:len(edges) * 4 // 5])
+    return G
+
+
+def test_queries_match_networkx():
+    G = _sparse_graph(1)
+    _assert_matches_networkx(ReachabilityIndex(G), G, random.Random(0).sample(list(G), 40))
+
+
+def test_patched_index_matches_networkx():
+    G = _sparse_graph(2)
+    index = ReachabilityIndex(G)
+    rng = random.Random(0)
+    for step in range(120):
+        nodes = list(G)
+        roll = rng.random()
+        if roll < 0.6:
+            index.add_edge(*rng.sample(nodes, 2), type='dependency')
+        elif roll < 0.75:
+            index.add_edge(rng.choice(nodes), f"new_{step}", type='dependency')
+        elif roll < 0.9 and G.number_of_edges():
+            index.remove_edge(*rng.choice(list(G.edges())))
+        else:
+            index.remove_node(rng.choice(nodes))
+        _assert_matches_networkx(index, G, rng.sample(list(G), 15))
+
+
+def test_invalidate_after_direct_edits():
+    G = _sparse_graph(3)
+    index = ReachabilityIndex(G)
+    rng = random.Random(1)
+    for _ in range(10):
+        G.add_edge(*rng.sample(list(G), 2))
+    index.invalidate()
+    _assert_matches_networkx(index, G, rng.sample(list(G), 30))
@@ -0,0 +1,108 @@
+import json
+import os
+
+import networkx as nx
+import pytest
+
+from benchmark_graph import make_synthetic_components
+from component_model import load_node_document, node_has_auth, node_implementation_status, node_parent_system
+from conftest import write_system
+from system_of_systems_graph import (
+    build_system_graph, detect_architectural_issues, export_graph_json, filter_graph_levels, graph_from_components,
+    load_service_architecture_index
+)
+
+# The --mode multi viewpoints
+VIEW_LEVELS = [['system', 'service'], ['package'], ['module', 'package'],
+               ['system_of_systems', 'system', 'service', 'package', 'module']]
+
+
+def _component(service_id, name=None, dependencies=(), tier='tier_2_components', **extra):
+    return {'service_id': service_id, 'service_name': name or service_id, 'hierarchical_tier': tier,
+            'dependencies': list(dependencies), **extra}
+
+
+def test_exact_service_id_wins_over_earlier_name_match():
+    components = {
+        'payments_v2': _component('payments_v2', 'Payments'),
+        'payments': _component('payments', 'Legacy payments'),
+        'checkout': _component('checkout', dependencies=['payments', 'Payments V3']),
+    }
+    G = graph_from_components(components)
+    # 'payments' is the id of one service and the service_name of another
+    assert set(G.successors('checkout')) == {'payments'}
+    assert G.graph['name_resolution']['ambiguous'] == {'payments': ['payments', 'payments_v2']}
+    assert G.graph['name_resolution']['unresolved'] == {'Payments V3': ['checkout']}
+
+
+def test_names_resolve_after_normalization():
+    components = {
+        'svc_a': _component('svc_a', 'Order Service'),
+        'svc_b': _component('svc_b', 'Billing', dependencies=['order service', 'ORDER SERVICE']),
+        'svc_c': _component('svc_c', 'Ledger', interfaces=[{'name': 'post', 'dependencies': ['Billing']}]),
+    }
+    G = graph_from_components(components)
+    assert list(G.edges(data='type')) == [('svc_b', 'svc_a', 'dependency'), ('svc_c', 'svc_b', 'interface')]
+    assert G.graph['name_resolution'] == {'ambiguous': {}, 'unresolved': {}}
+
+
+def test_ambiguous_and_unresolved_names_are_recorded(capsys):
+    components = {
+        'first': _component('first', 'Shared'),
+        'second': _component('second', 'Shared', dependencies=['ghost']),
+        'caller': _component('caller', dependencies=['shared', 'ghost', 'phantom']),
+    }
+    G = graph_from_components(components)
+    # Index order decides between services that share a name
+    assert set(G.successors('caller')) == {'first'}
+    assert G.graph['name_resolution'] == {
+        'ambiguous': {'shared': ['first', 'second']},
+        'unresolved': {'ghost': ['caller', 'second'], 'phantom': ['caller']},
+    }
+    captured = capsys.readouterr()
+    assert "Ambiguous service name 'shared'" in captured.err
+    assert '2 dependency names did not match' in captured.err
+    assert 'Warning' not in captured.out
+
+
+def _assert_same_graph(G, H):
+    assert list(G.nodes(data=True)) == list(H.nodes(data=True))
+    assert list(G.edges(data=True)) == list(H.edges(data=True))
+    assert G.graph == H.graph
+
+
+@pytest.mark.parametrize('lean', [False, True])
+def test_views_of_one_load_equal_per_level_builds(tmp_path, lean):
+    components = make_synthetic_components(120, seed=8, schema_fields=2)
+    components['svc_5']['dependencies'].append('no_such_service')
+    components['svc_6']['service_name'] = components['svc_7']['service_name']
+    index_path = write_system(str(tmp_path), components)
+    index = load_service_architecture_index(index_path)
+    directory = os.path.dirname(index_path)
+
+    full = build_system_graph(index, None, directory, lean=lean)
+    for levels in VIEW_LEVELS:
+        _assert_same_graph(filter_graph_levels(full, levels), build_system_graph(index, levels, directory, lean=lean))
+
+
+def test_lean_nodes_drop_raw_but_keep_what_analysis_reads(tmp_path, capsys):
+    components = make_synthetic_components(80, seed=9, schema_fields=2)
+    index_path = write_system(str(tmp_path), components)
+    index = load_service_architecture_index(index_path)
+    full = build_system_graph(index, None, str(tmp_path))
+    lean = build_system_graph(index, None, str(tmp_path), lean=True)
+
+    assert list(lean.edges(data=True)) == list(full.edges(data=True))
+    for node in full:
+        assert 'raw' not in lean.nodes[node] and os.path.isfile(lean.nodes[node]['source'])
+        for accessor in (node_has_auth, node_implementation_status, node_parent_system):
+            assert accessor(lean, node) == accessor(full, node)
+        assert load_node_document(lean, node) == components[node]
+    assert detect_architectural_issues(lean) == detect_architectural_issues(full)
+
+    out_path = str(tmp_path / 'graph.json')
+    export_graph_json(lean, out_path)
+    with open(out_path) as f:
+        exported = nx.node_link_graph(json.load(f))
+    assert list(exported.nodes(data=True)) == list(lean.nodes(data=True))
+    assert list(exported.edges) == list(lean.edges)
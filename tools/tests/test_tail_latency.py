@@ -0,0 +1,65 @@
+from statistics import NormalDist
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from issue_report import PERCENTILES
+from tail_latency import tail_latency_report
+
+MEAN_MS = 10.0
+FIXED_MS = 5.0
+
+
+def exponential_chain(seed: int = 0) -> nx.DiGraph:
+    """gateway -> a -> b: gateway takes 2 ms, the call to a is exponential with mean MEAN_MS, the call to b 3 ms."""
+    measured = np.random.default_rng(seed).exponential(MEAN_MS, 400_000).tolist()
+    C = nx.DiGraph()
+    C.add_node('gateway', label='gateway', latency_ms=2.0, latency_source='default', latency_samples=None)
+    for node in 'ab':
+        C.add_node(node, label=node, latency_ms=None, latency_source='default', latency_samples=None)
+    C.add_edge('gateway', 'a', pattern='synchronous', latency_ms=MEAN_MS, latency_source='observed',
+               latency_samples=measured)
+    C.add_edge('a', 'b', pattern='synchronous', latency_ms=3.0, latency_source='default', latency_samples=None)
+    return C
+
+
+def test_chain_percentiles_match_exponential_quantiles():
+    report = tail_latency_report(exponential_chain(), samples=200_000, batch_size=50_000, seed=1)
+    [entry] = report['entry_points']
+    assert entry['entry'] == 'gateway' and entry['samples'] == 200_000 and entry['services_reached'] == 3
+    latency = entry['latency_ms']
+    values = [latency[f'p{p:g}'.replace('.', '')] for p in PERCENTILES]
+    assert values == sorted(values)
+    for p, value in zip(PERCENTILES, values):
+        expected = FIXED_MS - MEAN_MS * np.log(1 - p / 100)
+        assert value == pytest.approx(expected, rel=0.05 if p > 99 else 0.03), p
+    assert entry['mean_latency_ms'] == pytest.approx(FIXED_MS + MEAN_MS, rel=0.02)
+    # The exponential call makes the tail; the fixed hops add their own latency
+    [first, *_] = entry['tail']['contributions']
+    assert first['service'] == 'a' and first['on_slow_chain'] == 1.0
+
+
+def test_observed_latency_is_lognormal_with_that_mean():
+    C = exponential_chain()
+    C.edges['gateway', 'a'].update(latency_ms=20.0, latency_samples=None)
+    sigma = 0.5
+    [entry] = tail_latency_report(C, samples=200_000, sigma=sigma, seed=2)['entry_points']
+    mu = np.log(20.0) - sigma * sigma / 2
+    for p in PERCENTILES:
+        expected = FIXED_MS + np.exp(mu + sigma * NormalDist().inv_cdf(p / 100))
+        assert entry['latency_ms'][f'p{p:g}'.replace('.', '')] == pytest.approx(expected, rel=0.03), p
+    assert entry['mean_latency_ms'] == pytest.approx(FIXED_MS + 20.0, rel=0.01)
+
+
+def test_a_seed_gives_the_same_report():
+    C = exponential_chain()
+    first = tail_latency_report(C, samples=20_000, batch_size=5000, seed=3)
+    assert first == tail_latency_report(C, samples=20_000, batch_size=5000, seed=3)
+    assert first != tail_latency_report(C, samples=20_000, batch_size=5000, seed=4)
+
+
+def test_no_samples_gives_empty_percentiles():
+    [entry] = tail_latency_report(exponential_chain(), samples=0)['entry_points']
+    assert entry['samples'] == 0 and entry['mean_latency_ms'] is None
+    assert set(entry['latency_ms'].values()) == {None}
@@ -2,14 +2,26 @@
 
 import json
 import sys
+import argparse
 from pathlib import Path
 from datetime import datetime
 import networkx as nx
 from typing import Dict, List, Set, Tuple
 
+from component_loader import ComponentCache, load_components
+from component_bundle import ComponentBundle
+from compact_graph import DEFAULT_MAX_CYCLE_LENGTH, DEFAULT_MAX_CYCLES, CompactGraph
+
 class ArchitectureValidator:
-    def __init__(self, system_path: Path):
+    def __init__(self, system_path: Path, use_cache: bool = True, rebuild_cache: bool = False,
+                 bundle_path: Path = None, max_cycle_length: int = DEFAULT_MAX_CYCLE_LENGTH,
+                 max_cycles: int = DEFAULT_MAX_CYCLES):
         self.system_path = Path(system_path)
+        self.bundle_path = bundle_path
+        self.max_cycle_length = max_cycle_length
+        self.max_cycles = max_cycles
+        self.cache = ComponentCache.for_index(self.system_path / "index.json", rebuild=rebuild_cache) if use_cache and not bundle_path else None
+        self._services = None
         self.working_memory = self.load_working_memory()
         self.validation_results = {
             "timestamp": datetime.now().isoformat(),
@@ -26,11 +38,17 @@ class ArchitectureValidator:
         return {}
 
     def load_service_files(self) -> Dict[str, dict]:
-        services = {}
-        for service_file in self.system_path.rglob("service_architecture.json"):
-            with open(service_file) as f:
-                services[service_file.parent.name] = json.load(f)
-        return services
+        """Load every service_architecture.json under the system path, or from the bundle (once per validator)"""
+        if self._services is None and self.bundle_path:
+            # Components packed with component_bundle.py; keyed like the files they came from
+            with ComponentBundle(self.bundle_path) as bundle:
+                self._services = {Path(bundle.sources.get(sid, sid)).parent.name or sid: bundle[sid] for sid in bundle}
+        if self._services is None:
+            index = {}
+            for service_file in self.system_path.rglob("service_architecture.json"):
+                index[service_file.parent.name] = str(service_file.relative_to(self.system_path))
+            self._services = load_components(index, str(self.system_path), cache=self.cache)
+        return self._services
 
     def validate_interface_consistency(self) -> List[dict]:
         """Check interface consistency across services"""
@@ -106,19 +124,16 @@ class ArchitectureValidator:
             for dep in service.get("dependencies", []):
                 G.add_edge(service_name, dep)
 
-        # Find cycles
-        try:
-            cycles = list(nx.simple_cycles(G))
-            for cycle in cycles:
-                issues.append({
-                    "type": "circular_dependency",
-                    "cycle": cycle,
-                    "severity": "high"
-                })
-        except Exception as e:
+        # One issue per strongly connected component, with a few shortest cycles rather than all of them
+        compact = CompactGraph.from_networkx(G)
+        for members in compact.cyclic_components():
+            found, truncated = compact.representative_cycles(members, self.max_cycle_length, self.max_cycles)
             issues.append({
-                "type": "graph_analysis_error",
-                "error": str(e),
+                "type": "circular_dependency",
+                "services": [compact.nodes[i] for i in members],
+                "cycle": [compact.nodes[i] for i in found[0]] if found else [],
+                "cycles": [[compact.nodes[i] for i in cycle] for cycle in found],
+                "truncated": truncated,
                 "severity": "high"
             })
 
@@ -226,21 +241,32 @@ class ArchitectureValidator:
             json.dump(self.working_memory, f, indent=2)
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: validate_architecture.py <system_path>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Validate a system architecture directory")
+    parser.add_argument('system_path', help='Path to the system directory')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the parsed-component cache')
+    parser.add_argument('--rebuild-cache', action='store_true', help='Discard and rebuild the parsed-component cache')
+    parser.add_argument('--bundle', help='Read components from a packed bundle (component_bundle.py pack) instead of the files')
+    parser.add_argument('--max-cycle-length', type=int, default=DEFAULT_MAX_CYCLE_LENGTH,
+                        help='Longest cycle (in services) reported for a circular dependency')
+    parser.add_argument('--max-cycles', type=int, default=DEFAULT_MAX_CYCLES,
+                        help='Representative cycles reported per circular dependency')
+    args = parser.parse_args()
 
-    system_path = Path(sys.argv[1])
+    system_path = Path(args.system_path)
     if not system_path.exists():
         print(f"Error: System path {system_path} does not exist")
         sys.exit(1)
 
-    validator = ArchitectureValidator(system_path)
+    validator = ArchitectureValidator(system_path, use_cache=not args.no_cache, rebuild_cache=args.rebuild_cache,
+                                      bundle_path=args.bundle, max_cycle_length=args.max_cycle_length,
+                                      max_cycles=args.max_cycles)
     results = validator.run_all_validations()
     validator.update_working_memory()
 
     # Output results
     print(json.dumps(results, indent=2))
+    if validator.cache is not None:
+        print(validator.cache.summary(), file=sys.stderr)
 
     # Exit with status code
     sys.exit(1 if results["issues"] else 0)